@@ -0,0 +1,41 @@
+"""Drop content columns from entries
+
+Revision ID: 0c7b3f9e5a21
+Revises: 8e2a4c61f0d9
+Create Date: 2026-10-19 14:52:37.904113
+
+Tiešsaistes migrācijas otrais solis: izpildāms, kad vecā versija vairs nedarbojas.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision: str = '0c7b3f9e5a21'
+down_revision: Union[str, None] = '8e2a4c61f0d9'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.execute("DROP TRIGGER IF EXISTS entries_copy_content ON entries")
+    op.execute("DROP FUNCTION IF EXISTS entries_copy_content()")
+
+    op.drop_column('entries', 'entry_metadata')
+    op.drop_column('entries', 'content')
+    op.drop_column('entries', 'summary')
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.add_column('entries', sa.Column('summary', sa.Text(), nullable=True))
+    op.add_column('entries', sa.Column('content', sa.Text(), nullable=True))
+    op.add_column('entries', sa.Column('entry_metadata', postgresql.JSONB(astext_type=sa.Text()), nullable=True))
+    op.execute("""
+        UPDATE entries SET summary = c.summary, content = c.content, entry_metadata = c.entry_metadata
+        FROM entry_content AS c
+        WHERE c.entry_id = entries.id
+    """)
@@ -0,0 +1,34 @@
+"""Add feed high water mark
+
+Revision ID: 3d7e51b0c9a4
+Revises: fa9c2ef2ce77
+Create Date: 2026-10-19 12:41:05.318274
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision: str = '3d7e51b0c9a4'
+down_revision: Union[str, None] = 'fa9c2ef2ce77'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('rss_feeds', sa.Column('last_seen_id', sa.String(length=512), nullable=True))
+    op.add_column('rss_feeds', sa.Column('last_seen_published', sa.DateTime(), nullable=True))
+    op.add_column('rss_feeds', sa.Column('recent_ids', postgresql.JSONB(astext_type=sa.Text()), nullable=True))
+    op.add_column('rss_feeds', sa.Column('fetches_since_full_scan', sa.Integer(), server_default='0', nullable=False))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('rss_feeds', 'fetches_since_full_scan')
+    op.drop_column('rss_feeds', 'recent_ids')
+    op.drop_column('rss_feeds', 'last_seen_published')
+    op.drop_column('rss_feeds', 'last_seen_id')
@@ -0,0 +1,48 @@
+"""Use lz4 TOAST compression for entries
+
+Revision ID: 5b9d2e7f13ac
+Revises: c41f08a6d2b7
+Create Date: 2026-10-19 14:02:51.667390
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = '5b9d2e7f13ac'
+down_revision: Union[str, None] = 'c41f08a6d2b7'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Lielās ierakstu kolonnas, kuras PostgreSQL glabā TOAST tabulā
+COMPRESSED_COLUMNS = ('summary', 'content', 'entry_metadata')
+
+
+def _lz4_available() -> bool:
+    # Kolonnu kompresija ir pieejama no PostgreSQL 14, ja serveris būvēts ar lz4
+    bind = op.get_bind()
+    return bool(bind.execute(sa.text(
+        "SELECT 'lz4' = ANY(enumvals) FROM pg_settings WHERE name = 'default_toast_compression'"
+    )).scalar())
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    if not _lz4_available():
+        return
+
+    # Attiecas uz jaunām vērtībām; esošās paliek pglz, līdz tiek pārrakstītas
+    # vai izdzēstas pēc glabāšanas perioda (cleanup_old_entries)
+    for column in COMPRESSED_COLUMNS:
+        op.execute(f"ALTER TABLE entries ALTER COLUMN {column} SET COMPRESSION lz4")
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    if not _lz4_available():
+        return
+
+    for column in COMPRESSED_COLUMNS:
+        op.execute(f"ALTER TABLE entries ALTER COLUMN {column} SET COMPRESSION pglz")
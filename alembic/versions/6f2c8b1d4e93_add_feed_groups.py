@@ -0,0 +1,54 @@
+"""Add feed groups and entries feed index
+
+Revision ID: 6f2c8b1d4e93
+Revises: d3a9f7c21e58
+Create Date: 2026-10-19 21:04:12.381554
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = '6f2c8b1d4e93'
+down_revision: Union[str, None] = 'd3a9f7c21e58'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('feed_groups',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('name', sa.String(length=100), nullable=False),
+    sa.Column('description', sa.Text(), nullable=True),
+    sa.Column('created_at', sa.DateTime(), nullable=True),
+    sa.Column('updated_at', sa.DateTime(), nullable=True),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_feed_groups_id'), 'feed_groups', ['id'], unique=False)
+    op.create_index(op.f('ix_feed_groups_name'), 'feed_groups', ['name'], unique=True)
+    op.create_table('feed_group_feed',
+    sa.Column('group_id', sa.Integer(), nullable=False),
+    sa.Column('feed_id', sa.Integer(), nullable=False),
+    sa.ForeignKeyConstraint(['feed_id'], ['rss_feeds.id'], ondelete='CASCADE'),
+    sa.ForeignKeyConstraint(['group_id'], ['feed_groups.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('group_id', 'feed_id')
+    )
+    op.create_index(op.f('ix_feed_group_feed_feed_id'), 'feed_group_feed', ['feed_id'], unique=False)
+
+    # entries ir liela tabula - indekss tiek veidots bez rakstīšanas bloķēšanas
+    with op.get_context().autocommit_block():
+        op.create_index('ix_entries_feed_id_published', 'entries', ['feed_id', 'published'], unique=False,
+                        postgresql_concurrently=True)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_entries_feed_id_published', table_name='entries')
+    op.drop_index(op.f('ix_feed_group_feed_feed_id'), table_name='feed_group_feed')
+    op.drop_table('feed_group_feed')
+    op.drop_index(op.f('ix_feed_groups_name'), table_name='feed_groups')
+    op.drop_index(op.f('ix_feed_groups_id'), table_name='feed_groups')
+    op.drop_table('feed_groups')
@@ -0,0 +1,101 @@
+"""Add entry_content table
+
+Revision ID: 8e2a4c61f0d9
+Revises: 5b9d2e7f13ac
+Create Date: 2026-10-19 14:48:09.215806
+
+Tiešsaistes migrācijas pirmais solis. Izveido entry_content tabulu, trigeri,
+kas kopē vecās versijas ierakstīto saturu, un pa porcijām pārnes esošos datus
+(katra porcija savā transakcijā, tāpēc entries tabula netiek ilgstoši bloķēta).
+Pēc tam, kad visi API un Celery procesi darbojas ar jauno versiju, jāizpilda
+nākamā migrācija (0c7b3f9e5a21), kas dzēš vecās kolonnas:
+
+    alembic upgrade 8e2a4c61f0d9   # pirms jaunās versijas izvietošanas
+    alembic upgrade head           # pēc tam
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision: str = '8e2a4c61f0d9'
+down_revision: Union[str, None] = '5b9d2e7f13ac'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+BACKFILL_BATCH_SIZE = 5000
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('entry_content',
+    sa.Column('entry_id', sa.String(), nullable=False),
+    sa.Column('summary', sa.Text(), nullable=True),
+    sa.Column('content', sa.Text(), nullable=True),
+    sa.Column('entry_metadata', postgresql.JSONB(astext_type=sa.Text()), nullable=True),
+    sa.Column('updated_at', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['entry_id'], ['entries.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('entry_id')
+    )
+
+    bind = op.get_bind()
+    lz4_available = bind.execute(sa.text(
+        "SELECT 'lz4' = ANY(enumvals) FROM pg_settings WHERE name = 'default_toast_compression'"
+    )).scalar()
+    if lz4_available:
+        for column in ('summary', 'content', 'entry_metadata'):
+            op.execute(f"ALTER TABLE entry_content ALTER COLUMN {column} SET COMPRESSION lz4")
+
+    # Kamēr vēl darbojas vecā versija, tās ierakstītais saturs tiek kopēts uz entry_content.
+    # Jaunā versija vecās kolonnas neaizpilda, tāpēc trigeris tai neizpildās.
+    op.execute("""
+        CREATE OR REPLACE FUNCTION entries_copy_content() RETURNS trigger AS $$
+        BEGIN
+            INSERT INTO entry_content (entry_id, summary, content, entry_metadata, updated_at)
+            VALUES (NEW.id, NEW.summary, NEW.content, NEW.entry_metadata, now() AT TIME ZONE 'utc')
+            ON CONFLICT (entry_id) DO UPDATE
+            SET summary = EXCLUDED.summary,
+                content = EXCLUDED.content,
+                entry_metadata = EXCLUDED.entry_metadata,
+                updated_at = EXCLUDED.updated_at;
+            RETURN NEW;
+        END
+        $$ LANGUAGE plpgsql
+    """)
+    op.execute("""
+        CREATE TRIGGER entries_copy_content
+        AFTER INSERT OR UPDATE OF summary, content, entry_metadata ON entries
+        FOR EACH ROW
+        WHEN (NEW.summary IS NOT NULL OR NEW.content IS NOT NULL OR NEW.entry_metadata IS NOT NULL)
+        EXECUTE FUNCTION entries_copy_content()
+    """)
+
+    # Esošo datu pārnese pa porcijām pēc secības numura
+    with op.get_context().autocommit_block():
+        after = 0
+        while True:
+            after = bind.execute(sa.text("""
+                WITH batch AS (
+                    SELECT id, seq, summary, content, entry_metadata, updated_at
+                    FROM entries
+                    WHERE seq > :after
+                    ORDER BY seq
+                    LIMIT :batch_size
+                ), copied AS (
+                    INSERT INTO entry_content (entry_id, summary, content, entry_metadata, updated_at)
+                    SELECT id, summary, content, entry_metadata, updated_at FROM batch
+                    ON CONFLICT (entry_id) DO NOTHING
+                )
+                SELECT max(seq) FROM batch
+            """), {"after": after, "batch_size": BACKFILL_BATCH_SIZE}).scalar()
+            if after is None:
+                break
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.execute("DROP TRIGGER IF EXISTS entries_copy_content ON entries")
+    op.execute("DROP FUNCTION IF EXISTS entries_copy_content()")
+    op.drop_table('entry_content')
@@ -0,0 +1,52 @@
+"""Add change feed sequence to entries
+
+Revision ID: 914df6fdae45
+Revises: a6aeee8ed8ee
+Create Date: 2026-10-19 09:12:41.204317
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '914df6fdae45'
+down_revision: Union[str, None] = 'a6aeee8ed8ee'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.execute("CREATE SEQUENCE IF NOT EXISTS entries_seq_seq")
+    op.add_column('entries', sa.Column('seq', sa.BigInteger(), nullable=True))
+
+    # Esošajiem ierakstiem piešķiram numurus to izveides secībā
+    op.execute("""
+        UPDATE entries SET seq = numbered.n
+        FROM (
+            SELECT ordered.id, nextval('entries_seq_seq') AS n
+            FROM (SELECT id FROM entries ORDER BY created_at, id) AS ordered
+        ) AS numbered
+        WHERE entries.id = numbered.id
+    """)
+
+    # Jauniem ierakstiem numurs tiek piešķirts pēc commit (app.services.change_feed.assign_change_seq),
+    # tāpēc kolonnai nav noklusētās vērtības
+    op.execute("ALTER SEQUENCE entries_seq_seq OWNED BY entries.seq")
+    op.create_index(op.f('ix_entries_seq'), 'entries', ['seq'], unique=True)
+
+    # entries ir liela tabula - indekss tiek veidots bez rakstīšanas bloķēšanas
+    with op.get_context().autocommit_block():
+        op.create_index('ix_entries_seq_pending', 'entries', ['created_at', 'id'], unique=False,
+                        postgresql_where=sa.text('seq IS NULL'), postgresql_concurrently=True)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_entries_seq_pending', table_name='entries')
+    op.drop_index(op.f('ix_entries_seq'), table_name='entries')
+    op.drop_column('entries', 'seq')
+    op.execute("DROP SEQUENCE IF EXISTS entries_seq_seq")
@@ -0,0 +1,39 @@
+"""Add feed websub subscription
+
+Revision ID: b7d04e6a3f15
+Revises: e5f18a2c9b47
+Create Date: 2026-10-19 19:56:31.208847
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = 'b7d04e6a3f15'
+down_revision: Union[str, None] = 'e5f18a2c9b47'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('rss_feeds', sa.Column('websub_hub', sa.String(length=512), nullable=True))
+    op.add_column('rss_feeds', sa.Column('websub_topic', sa.String(length=512), nullable=True))
+    op.add_column('rss_feeds', sa.Column('websub_secret', sa.String(length=64), nullable=True))
+    op.add_column('rss_feeds', sa.Column('websub_state', sa.String(length=12), server_default='none', nullable=False))
+    op.add_column('rss_feeds', sa.Column('websub_lease_expires', sa.DateTime(), nullable=True))
+    op.add_column('rss_feeds', sa.Column('last_pushed', sa.DateTime(), nullable=True))
+    op.create_index(op.f('ix_rss_feeds_websub_lease_expires'), 'rss_feeds', ['websub_lease_expires'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f('ix_rss_feeds_websub_lease_expires'), table_name='rss_feeds')
+    op.drop_column('rss_feeds', 'last_pushed')
+    op.drop_column('rss_feeds', 'websub_lease_expires')
+    op.drop_column('rss_feeds', 'websub_state')
+    op.drop_column('rss_feeds', 'websub_secret')
+    op.drop_column('rss_feeds', 'websub_topic')
+    op.drop_column('rss_feeds', 'websub_hub')
@@ -0,0 +1,57 @@
+"""Add feed circuit breaker
+
+Revision ID: c41f08a6d2b7
+Revises: 3d7e51b0c9a4
+Create Date: 2026-10-19 13:27:44.081532
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = 'c41f08a6d2b7'
+down_revision: Union[str, None] = '3d7e51b0c9a4'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('feed_hosts',
+    sa.Column('host', sa.String(length=255), nullable=False),
+    sa.Column('circuit_state', sa.String(length=10), nullable=False),
+    sa.Column('failure_count', sa.Integer(), nullable=False),
+    sa.Column('open_until', sa.DateTime(), nullable=True),
+    sa.Column('last_error', sa.Text(), nullable=True),
+    sa.Column('updated_at', sa.DateTime(), nullable=True),
+    sa.PrimaryKeyConstraint('host')
+    )
+    op.add_column('rss_feeds', sa.Column('host', sa.String(length=255), nullable=True))
+    op.add_column('rss_feeds', sa.Column('circuit_state', sa.String(length=10), server_default='closed', nullable=False))
+    op.add_column('rss_feeds', sa.Column('circuit_open_until', sa.DateTime(), nullable=True))
+
+    # Saimniekdators no URL: starp "://" un nākamo "/"
+    op.execute("UPDATE rss_feeds SET host = lower(split_part(split_part(url, '://', 2), '/', 1))")
+
+    # Barotnes, kas iepriekš tika automātiski deaktivizētas pēc 5 kļūdām, atgriežam
+    # half-open stāvoklī - nākamais cikls veiks vienu pārbaudes mēģinājumu
+    op.execute("""
+        UPDATE rss_feeds
+        SET active = true, circuit_state = 'open', circuit_open_until = now() AT TIME ZONE 'utc'
+        WHERE active = false AND error_count >= 5
+    """)
+
+    op.create_index(op.f('ix_rss_feeds_host'), 'rss_feeds', ['host'], unique=False)
+    op.create_index(op.f('ix_rss_feeds_circuit_open_until'), 'rss_feeds', ['circuit_open_until'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f('ix_rss_feeds_circuit_open_until'), table_name='rss_feeds')
+    op.drop_index(op.f('ix_rss_feeds_host'), table_name='rss_feeds')
+    op.drop_column('rss_feeds', 'circuit_open_until')
+    op.drop_column('rss_feeds', 'circuit_state')
+    op.drop_column('rss_feeds', 'host')
+    op.drop_table('feed_hosts')
@@ -0,0 +1,79 @@
+"""Add tag key and usage count
+
+Revision ID: d3a9f7c21e58
+Revises: b7d04e6a3f15
+Create Date: 2026-10-19 20:31:47.662190
+
+"""
+import re
+import unicodedata
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = 'd3a9f7c21e58'
+down_revision: Union[str, None] = 'b7d04e6a3f15'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+TAG_MAX_LENGTH = 100
+
+
+def _tag_name(raw: str) -> str:
+    # Tāpat kā app.services.tags.tag_name migrācijas brīdī
+    return re.sub(r"\s+", " ", unicodedata.normalize("NFKC", raw or "")).strip()[:TAG_MAX_LENGTH]
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('tags', sa.Column('key', sa.String(length=100), nullable=True))
+    op.add_column('tags', sa.Column('usage_count', sa.Integer(), server_default='0', nullable=False))
+
+    # Tagi ar vienādu normalizēto atslēgu tiek apvienoti tagā ar mazāko ID
+    bind = op.get_bind()
+    groups = {}
+    for tag_id, name in bind.execute(sa.text("SELECT id, name FROM tags ORDER BY id")):
+        name = _tag_name(name)
+        groups.setdefault(name.casefold()[:TAG_MAX_LENGTH], []).append((tag_id, name))
+
+    updates = []
+    for key, tags in groups.items():
+        keep_id, keep_name = tags[0]
+        duplicates = [tag_id for tag_id, _ in tags[1:]]
+        if duplicates:
+            bind.execute(sa.text("""
+                INSERT INTO entry_tag (entry_id, tag_id)
+                SELECT entry_id, :keep_id FROM entry_tag WHERE tag_id = ANY(:duplicates)
+                ON CONFLICT DO NOTHING
+            """), {"keep_id": keep_id, "duplicates": duplicates})
+            bind.execute(sa.text("DELETE FROM entry_tag WHERE tag_id = ANY(:duplicates)"), {"duplicates": duplicates})
+            bind.execute(sa.text("DELETE FROM tags WHERE id = ANY(:duplicates)"), {"duplicates": duplicates})
+        updates.append({"id": keep_id, "name": keep_name, "key": key})
+    if updates:
+        bind.execute(sa.text("UPDATE tags SET name = :name, key = :key WHERE id = :id"), updates)
+
+    op.execute("""
+        UPDATE tags SET usage_count = counts.usage_count
+        FROM (SELECT tag_id, count(*) AS usage_count FROM entry_tag GROUP BY tag_id) AS counts
+        WHERE tags.id = counts.tag_id
+    """)
+
+    op.alter_column('tags', 'key', existing_type=sa.String(length=100), nullable=False)
+    op.create_index(op.f('ix_tags_key'), 'tags', ['key'], unique=True)
+    op.create_index('ix_tags_usage_count_id', 'tags', ['usage_count', 'id'], unique=False)
+
+    # entry_tag ir liela tabula - indekss tiek veidots bez rakstīšanas bloķēšanas
+    with op.get_context().autocommit_block():
+        op.create_index('ix_entry_tag_tag_id_entry_id', 'entry_tag', ['tag_id', 'entry_id'], unique=False,
+                        postgresql_concurrently=True)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_entry_tag_tag_id_entry_id', table_name='entry_tag')
+    op.drop_index('ix_tags_usage_count_id', table_name='tags')
+    op.drop_index(op.f('ix_tags_key'), table_name='tags')
+    op.drop_column('tags', 'usage_count')
+    op.drop_column('tags', 'key')
@@ -0,0 +1,77 @@
+"""Add feed url key and duplicate reference
+
+Revision ID: e5f18a2c9b47
+Revises: 0c7b3f9e5a21
+Create Date: 2026-10-19 18:42:09.517304
+
+"""
+import re
+from typing import Sequence, Union
+from urllib.parse import urlsplit
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = 'e5f18a2c9b47'
+down_revision: Union[str, None] = '0c7b3f9e5a21'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+_DEFAULT_PORTS = {"http": 80, "https": 443}
+_TRACKING_PARAM = re.compile(r"^(utm_\w+|fbclid|gclid|mc_cid|mc_eid)$", re.IGNORECASE)
+
+
+def _url_key(url: str) -> str:
+    # Tāpat kā app.services.feed_urls.url_key migrācijas brīdī
+    parts = urlsplit(url.strip())
+    host = (parts.hostname or "").rstrip(".")
+    netloc = f"[{host}]" if ":" in host else host
+    if parts.port and _DEFAULT_PORTS.get(parts.scheme.lower()) != parts.port:
+        netloc = f"{netloc}:{parts.port}"
+    if parts.username:
+        userinfo = parts.username + (f":{parts.password}" if parts.password else "")
+        netloc = f"{userinfo}@{netloc}"
+    netloc = netloc.lower()
+    if netloc.startswith("www."):
+        netloc = netloc[4:]
+    query = "&".join(
+        pair for pair in parts.query.split("&")
+        if pair and not _TRACKING_PARAM.match(pair.split("=", 1)[0])
+    )
+    key = netloc + (parts.path or "/").rstrip("/")
+    return f"{key}?{query}" if query else key
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('rss_feeds', sa.Column('url_key', sa.Text(), nullable=True))
+    op.add_column('rss_feeds', sa.Column('duplicate_of_id', sa.Integer(), nullable=True))
+    op.create_foreign_key(op.f('fk_rss_feeds_duplicate_of_id_rss_feeds'), 'rss_feeds', 'rss_feeds', ['duplicate_of_id'], ['id'], ondelete='SET NULL')
+
+    bind = op.get_bind()
+    updates = [
+        {"id": feed_id, "url_key": _url_key(url)}
+        for feed_id, url in bind.execute(sa.text("SELECT id, url FROM rss_feeds"))
+    ]
+    if updates:
+        bind.execute(sa.text("UPDATE rss_feeds SET url_key = :url_key WHERE id = :id"), updates)
+
+    # Esošās barotnes var dublēties (piem. http un https). Paliek vecākā; pārējās tiek
+    # atzīmētas kā tās dublikāti un deaktivizētas.
+    op.execute("""
+        UPDATE rss_feeds
+        SET duplicate_of_id = keep.id, active = false, url_key = NULL
+        FROM (SELECT url_key, min(id) AS id FROM rss_feeds WHERE url_key IS NOT NULL GROUP BY url_key) AS keep
+        WHERE rss_feeds.url_key = keep.url_key AND rss_feeds.id <> keep.id
+    """)
+
+    op.create_index(op.f('ix_rss_feeds_url_key'), 'rss_feeds', ['url_key'], unique=True)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f('ix_rss_feeds_url_key'), table_name='rss_feeds')
+    op.drop_constraint(op.f('fk_rss_feeds_duplicate_of_id_rss_feeds'), 'rss_feeds', type_='foreignkey')
+    op.drop_column('rss_feeds', 'duplicate_of_id')
+    op.drop_column('rss_feeds', 'url_key')
@@ -0,0 +1,40 @@
+"""Add feed fetch profiles
+
+Revision ID: fa9c2ef2ce77
+Revises: 914df6fdae45
+Create Date: 2026-10-19 11:03:17.552910
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision: str = 'fa9c2ef2ce77'
+down_revision: Union[str, None] = '914df6fdae45'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('feed_fetch_profiles',
+    sa.Column('id', sa.BigInteger(), nullable=False),
+    sa.Column('feed_id', sa.Integer(), nullable=False),
+    sa.Column('created_at', sa.DateTime(), nullable=False),
+    sa.Column('success', sa.Boolean(), nullable=False),
+    sa.Column('new_entries', sa.Integer(), nullable=True),
+    sa.Column('total_ms', sa.Float(), nullable=False),
+    sa.Column('stages', postgresql.JSONB(astext_type=sa.Text()), nullable=False),
+    sa.ForeignKeyConstraint(['feed_id'], ['rss_feeds.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('ix_feed_fetch_profiles_feed_id_created_at', 'feed_fetch_profiles', ['feed_id', 'created_at'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_feed_fetch_profiles_feed_id_created_at', table_name='feed_fetch_profiles')
+    op.drop_table('feed_fetch_profiles')
@@ -1,20 +1,30 @@
-from fastapi import APIRouter, Depends, HTTPException, Query
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
+from fastapi.responses import StreamingResponse
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session, joinedload, selectinload
 from typing import List, Optional
 from pydantic import BaseModel
 from datetime import datetime
-from sqlalchemy import desc, and_
+from sqlalchemy import desc, and_, any_, delete, exists, func, literal, or_, select, update, Integer, String
+from sqlalchemy.dialects.postgresql import ARRAY
 
-from app.models.database import get_db
-from app.models.models import Entry, RssFeed, Tag, entry_tag
+from app.config import settings
+from app.models.database import get_db, get_async_db, AsyncSessionLocal
+from app.models.models import Entry, EntryContent, RssFeed, Tag, entry_tag, feed_group_feed
+from app.services.change_feed import get_async_redis
+from app.services.tags import tag_key
 
 router = APIRouter()
 
+# Cik feed_id vai tag vērtību atļauts vienā pieprasījumā
+FILTER_MAX_VALUES = 100
+
 
 # Shēmas
 class TagResponse(BaseModel):
     id: int
     name: str
+    usage_count: int = 0
 
     class Config:
         from_attributes = True
@@ -31,6 +41,7 @@ class EntryBase(BaseModel):
 
 class EntryInDB(EntryBase):
     id: str
+    seq: Optional[int] = None
     feed_id: int
     feed_title: Optional[str] = None
     created_at: datetime
@@ -40,42 +51,117 @@ class EntryInDB(EntryBase):
         from_attributes = True
 
 
+class EntryChanges(BaseModel):
+    entries: List[EntryInDB]
+    next_cursor: int
+
+
+def _entry_response(entry: Entry, feed_title: Optional[str]) -> EntryInDB:
+    """
+    Izveido ieraksta atbildi ar pievienoto barotnes nosaukumu
+    """
+    return EntryInDB(
+        id=entry.id,
+        seq=entry.seq,
+        feed_id=entry.feed_id,
+        feed_title=feed_title,
+        title=entry.title,
+        link=entry.link,
+        published=entry.published,
+        summary=entry.summary,
+        content=entry.content,
+        author=entry.author,
+        created_at=entry.created_at,
+        tags=entry.tags,
+    )
+
+
+async def _load_changes(db: AsyncSession, after: int, limit: int) -> List[EntryInDB]:
+    """
+    Nolasa ierakstus, kuru secības numurs ir lielāks par kursoru
+    """
+    query = select(Entry, RssFeed.title)\
+        .join(RssFeed, Entry.feed_id == RssFeed.id)\
+        .options(selectinload(Entry.tags), selectinload(Entry.body))\
+        .where(Entry.seq > after)\
+        .order_by(Entry.seq)\
+        .limit(limit)
+    results = (await db.execute(query)).all()
+    return [_entry_response(entry, feed_title) for entry, feed_title in results]
+
+
+def _has_any_tag(keys: List[str]):
+    """
+    EXISTS semi-join: ierakstam ir vismaz viens no tagiem (pēc normalizētās atslēgas)
+    """
+    return exists().where(
+        entry_tag.c.entry_id == Entry.id,
+        entry_tag.c.tag_id == Tag.id,
+        Tag.key == any_(literal(keys, ARRAY(String))),
+    )
+
+
 @router.get("/", response_model=List[EntryInDB])
-def read_entries(
+async def read_entries(
     skip: int = 0,
     limit: int = 20,
-    feed_id: Optional[int] = None,
+    feed_id: Optional[List[int]] = Query(None, description="Viena vai vairākas barotnes: ?feed_id=1&feed_id=2"),
+    group_id: Optional[int] = Query(None, description="Barotņu grupa (GET /groups)"),
     search: Optional[str] = None,
-    tag: Optional[str] = None,
+    tag: Optional[List[str]] = Query(None, description="Viens vai vairāki tagi: ?tag=a&tag=b"),
+    tag_mode: str = Query("any", description='"any" - jebkurš no tagiem, "all" - visi tagi'),
     from_date: Optional[datetime] = None,
     to_date: Optional[datetime] = None,
     sort_by: str = "published",
     sort_desc: bool = True,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
-    Atgriež RSS ierakstu sarakstu ar filtrēšanu un meklēšanu
+    Atgriež RSS ierakstu sarakstu ar filtrēšanu un meklēšanu. Vairākas barotnes,
+    grupa un vairāki tagi tiek apstrādāti vienā vaicājumā.
     """
+    if len(feed_id or []) > FILTER_MAX_VALUES or len(tag or []) > FILTER_MAX_VALUES:
+        raise HTTPException(status_code=400, detail=f"Filtrā atļautas ne vairāk kā {FILTER_MAX_VALUES} vērtības")
+    if tag_mode not in ("any", "all"):
+        raise HTTPException(status_code=400, detail='tag_mode jābūt "any" vai "all"')
+    
     # Veidojam bāzes vaicājumu ar pievienoto barotnes nosaukumu
-    query = db.query(Entry, RssFeed.title.label("feed_title"))\
-        .join(RssFeed, Entry.feed_id == RssFeed.id)
+    # Tagus un saturu (entry_content) ielādējam ar vienu papildu vaicājumu katram tikai
+    # lapas ierakstiem (asinhronajā sesijā nav slinkās ielādes)
+    query = select(Entry, RssFeed.title.label("feed_title"))\
+        .join(RssFeed, Entry.feed_id == RssFeed.id)\
+        .options(selectinload(Entry.tags), selectinload(Entry.body))
     
     # Pievienojam filtrus
     filters = []
     
     if feed_id:
-        filters.append(Entry.feed_id == feed_id)
+        # Viens masīva parametrs: feed_id = ANY(:ids)
+        filters.append(Entry.feed_id == any_(literal(feed_id, ARRAY(Integer))))
+    
+    if group_id is not None:
+        # Grupas sastāvs pēc primārās atslēgas (group_id, feed_id)
+        filters.append(exists().where(
+            feed_group_feed.c.group_id == group_id,
+            feed_group_feed.c.feed_id == Entry.feed_id,
+        ))
     
     if search:
         search_term = f"%{search}%"
-        filters.append(
-            (Entry.title.ilike(search_term) | 
-             Entry.summary.ilike(search_term) | 
-             Entry.content.ilike(search_term))
+        body_matches = exists().where(
+            EntryContent.entry_id == Entry.id,
+            or_(EntryContent.summary.ilike(search_term), EntryContent.content.ilike(search_term))
         )
+        filters.append(or_(Entry.title.ilike(search_term), body_matches))
     
     if tag:
-        query = query.join(Entry.tags).filter(Tag.name == tag)
+        # Tagi pēc normalizētās atslēgas; "all" - atsevišķs semi-join katram tagam,
+        # tāpēc rezultāta rindas netiek pavairotas kā ar JOIN
+        keys = sorted({tag_key(value) for value in tag})
+        if tag_mode == "all":
+            filters.extend(_has_any_tag([key]) for key in keys)
+        else:
+            filters.append(_has_any_tag(keys))
     
     if from_date:
         filters.append(Entry.published >= from_date)
@@ -84,7 +170,7 @@ def read_entries(
         filters.append(Entry.published <= to_date)
     
     if filters:
-        query = query.filter(and_(*filters))
+        query = query.where(and_(*filters))
     
     # Šķirošana
     if sort_by == "published":
@@ -100,92 +186,118 @@ def read_entries(
         query = query.order_by(order_col)
     
     # Limitējam rezultātus
-    results = query.offset(skip).limit(limit).all()
+    results = (await db.execute(query.offset(skip).limit(limit))).all()
     
     # Veidojam atbildi
-    entries = []
-    for entry, feed_title in results:
-        # Iegūstam Entry objektu ar papildu feed_title lauku
-        entry_dict = {
-            "id": entry.id,
-            "feed_id": entry.feed_id,
-            "feed_title": feed_title,
-            "title": entry.title,
-            "link": entry.link,
-            "published": entry.published,
-            "summary": entry.summary,
-            "content": entry.content,
-            "author": entry.author,
-            "created_at": entry.created_at,
-            "tags": entry.tags
-        }
-        entries.append(EntryInDB(**entry_dict))
-    
-    return entries
+    return [_entry_response(entry, feed_title) for entry, feed_title in results]
 
 
-@router.get("/{entry_id}", response_model=EntryInDB)
-def read_entry(entry_id: str, db: Session = Depends(get_db)):
+@router.get("/changes", response_model=EntryChanges)
+async def read_entry_changes(
+    after: int = Query(0, ge=0, description="Pēdējais saņemtais secības numurs (kursors)"),
+    limit: int = Query(100, ge=1, le=1000),
+    db: AsyncSession = Depends(get_async_db)
+):
     """
-    Atgriež konkrēta RSS ieraksta informāciju
+    Atgriež ierakstus, kas pievienoti pēc norādītā kursora, secības numura kārtībā.
+    Nākamajā pieprasījumā jāizmanto atgrieztais `next_cursor`.
     """
-    entry = db.query(Entry).filter(Entry.id == entry_id).first()
-    
-    if entry is None:
-        raise HTTPException(status_code=404, detail="Ieraksts nav atrasts")
-    
-    # Iegūstam barotnes nosaukumu
-    feed = db.query(RssFeed).filter(RssFeed.id == entry.feed_id).first()
-    feed_title = feed.title if feed else None
-    
-    # Pievienojam feed_title atbildei
-    entry_dict = {
-        "id": entry.id,
-        "feed_id": entry.feed_id,
-        "feed_title": feed_title,
-        "title": entry.title,
-        "link": entry.link,
-        "published": entry.published,
-        "summary": entry.summary,
-        "content": entry.content,
-        "author": entry.author,
-        "created_at": entry.created_at,
-        "tags": entry.tags
-    }
-    
-    return EntryInDB(**entry_dict)
+    entries = await _load_changes(db, after, limit)
+    next_cursor = entries[-1].seq if entries else after
+    return EntryChanges(entries=entries, next_cursor=next_cursor)
 
 
-@router.get("/tags/", response_model=List[TagResponse])
-def read_tags(
-    limit: int = 50,
-    db: Session = Depends(get_db)
+@router.get("/stream")
+async def stream_entry_changes(
+    request: Request,
+    after: Optional[int] = Query(None, ge=0, description="Sākuma kursors; pēc noklusējuma tikai jauni ieraksti"),
+):
+    """
+    Server-Sent Events plūsma ar jaunajiem ierakstiem.
+
+    Kolektors pēc katras saglabāšanas publicē paziņojumu Redis kanālā; saņemot to,
+    plūsma nolasa ierakstus pēc sava kursora. Pēc atvienošanās klients var turpināt
+    ar `Last-Event-ID` galveni.
+    """
+    last_event_id = request.headers.get("last-event-id")
+    if last_event_id and last_event_id.isdigit():
+        after = int(last_event_id)
+    batch_size = 100
+
+    async def event_stream():
+        cursor = after
+        if cursor is None:
+            async with AsyncSessionLocal() as db:
+                cursor = (await db.execute(select(func.max(Entry.seq)))).scalar() or 0
+
+        client = get_async_redis()
+        pubsub = client.pubsub()
+        await pubsub.subscribe(settings.CHANGE_FEED_CHANNEL)
+        try:
+            while not await request.is_disconnected():
+                # Vispirms izsūtām visu, kas uzkrājies kopš kursora.
+                # Sesiju neturam atvērtu, kamēr gaidām paziņojumu
+                async with AsyncSessionLocal() as db:
+                    entries = await _load_changes(db, cursor, batch_size)
+                for entry in entries:
+                    cursor = entry.seq
+                    yield f"id: {entry.seq}\nevent: entry\ndata: {entry.model_dump_json()}\n\n"
+                if len(entries) == batch_size:
+                    continue
+
+                # Gaidām nākamo paziņojumu vai nosūtām keepalive
+                message = await pubsub.get_message(
+                    ignore_subscribe_messages=True,
+                    timeout=settings.CHANGE_FEED_HEARTBEAT,
+                )
+                if message is None:
+                    yield ": keepalive\n\n"
+        finally:
+            await pubsub.unsubscribe(settings.CHANGE_FEED_CHANNEL)
+            await pubsub.aclose()
+            await client.aclose()
+
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+@router.get("/tags", response_model=List[TagResponse])
+@router.get("/tags/", response_model=List[TagResponse], include_in_schema=False)
+async def read_tags(
+    limit: int = Query(50, ge=1, le=1000),
+    sort: str = "name",
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
-    Atgriež visus pieejamos tagus
+    Atgriež tagus alfabētiskā secībā vai, ja sort=popular, pēc ierakstu skaita (tagu mākonim)
     """
-    tags = db.query(Tag).limit(limit).all()
+    query = select(Tag)
+    if sort == "popular":
+        query = query.where(Tag.usage_count > 0).order_by(Tag.usage_count.desc(), Tag.id.desc())
+    else:
+        query = query.order_by(Tag.name)
+    tags = (await db.execute(query.limit(limit))).scalars().all()
     return tags
 
 
 @router.get("/stats/sources", response_model=dict)
-def get_sources_stats(db: Session = Depends(get_db)):
+async def get_sources_stats(db: AsyncSession = Depends(get_async_db)):
     """
     Atgriež statistiku par ziņu avotiem
     """
-    # Importējam sqlalchemy funkcijas
-    from sqlalchemy import func
-    
     # Iegūstam kopējo ierakstu skaitu katrai barotnei
-    results = db.query(
+    query = select(
         RssFeed.id,
         RssFeed.title,
         RssFeed.url,
         func.count(Entry.id).label("entry_count")
     ).outerjoin(Entry, RssFeed.id == Entry.feed_id)\
      .group_by(RssFeed.id)\
-     .order_by(func.count(Entry.id).desc())\
-     .all()
+     .order_by(func.count(Entry.id).desc())
+    results = (await db.execute(query)).all()
     
     stats = {}
     for feed_id, title, url, count in results:
@@ -197,6 +309,27 @@ def get_sources_stats(db: Session = Depends(get_db)):
     
     return stats
 
+
+# Jāpaliek aiz visiem burtiskajiem ceļiem (/tags u.c.), citādi tos pārtver šis maršruts
+@router.get("/{entry_id}", response_model=EntryInDB)
+async def read_entry(entry_id: str, db: AsyncSession = Depends(get_async_db)):
+    """
+    Atgriež konkrēta RSS ieraksta informāciju
+    """
+    # Ierakstu un barotnes nosaukumu iegūstam vienā vaicājumā
+    query = select(Entry, RssFeed.title)\
+        .outerjoin(RssFeed, Entry.feed_id == RssFeed.id)\
+        .options(selectinload(Entry.tags), joinedload(Entry.body))\
+        .where(Entry.id == entry_id)
+    row = (await db.execute(query)).first()
+    
+    if row is None:
+        raise HTTPException(status_code=404, detail="Ieraksts nav atrasts")
+    
+    # Pievienojam feed_title atbildei
+    entry, feed_title = row
+    return _entry_response(entry, feed_title)
+
 @router.delete("/", status_code=200)
 def delete_all_entries(
     confirm: bool = Query(False, description="Apstiprināt visas dzēšanas operācijas"),
@@ -213,7 +346,8 @@ def delete_all_entries(
     
     try:
         # Vispirms jāattīra ieraksti no tagiem (many-to-many saites)
-        db.execute("""DELETE FROM entry_tag""")
+        db.execute(delete(entry_tag))
+        db.execute(update(Tag).values(usage_count=0))
         
         # Tad varam dzēst pašus ierakstus
         entries_count = db.query(Entry).delete()
@@ -283,7 +417,7 @@ def delete_all_tags_with_relations(
     
     try:
         # Vispirms dzēšam saites starp tagiem un ierakstiem
-        db.execute("""DELETE FROM entry_tag""")
+        db.execute(delete(entry_tag))
         
         # Tad dzēšam pašus tagus
         tags_count = db.query(Tag).delete()
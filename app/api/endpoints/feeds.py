@@ -1,12 +1,22 @@
-from fastapi import APIRouter, Depends, HTTPException, BackgroundTasks
+from fastapi import APIRouter, Body, Depends, HTTPException, BackgroundTasks, Query, Response
+from sqlalchemy import desc, func, select
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
-from typing import List, Optional
+from typing import Dict, List, Optional
 from pydantic import BaseModel, HttpUrl
 from datetime import datetime
+import uuid
 
-from app.models.database import get_db
-from app.models.models import RssFeed
-from app.tasks.celery_tasks import collect_single_rss_feed
+from app.config import settings
+from app.models.database import get_db, get_async_db
+from app.models.models import Entry, RssFeed, FeedFetchProfile
+from app.services.feed_import import OpmlError, import_feeds, parse_opml, render_opml
+from app.services.feed_urls import canonicalize_url, url_key
+from app.services.profiling import percentile
+from app.services.tags import unlink_entries
+from app.services.task_status import QUEUED, set_task_status
+from app.tasks.dispatch import send_task
 
 router = APIRouter()
 
@@ -22,6 +32,31 @@ class RssFeedCreate(RssFeedBase):
     pass
 
 
+class RssFeedBulkItem(BaseModel):
+    # URL tiek pārbaudīts importā, lai viens nederīgs URL nenoraidītu visu sarakstu
+    url: str
+    name: Optional[str] = None
+
+
+class RssFeedBulkCreate(BaseModel):
+    feeds: List[RssFeedBulkItem]
+    active: bool = True
+    fetch: bool = True
+
+
+class InvalidFeed(BaseModel):
+    url: str
+    error: str
+
+
+class BulkImportResult(BaseModel):
+    created: int
+    existing: int
+    invalid: List[InvalidFeed]
+    feed_ids: List[int]
+    fetch_tasks: int
+
+
 class RssFeedUpdate(BaseModel):
     url: Optional[HttpUrl] = None
     name: Optional[str] = None
@@ -41,6 +76,9 @@ class RssFeedInDB(RssFeedBase):
     last_fetched: Optional[datetime] = None
     error_count: int
     last_error: Optional[str] = None
+    circuit_state: str = "closed"
+    circuit_open_until: Optional[datetime] = None
+    duplicate_of_id: Optional[int] = None
     created_at: datetime
     updated_at: datetime
 
@@ -48,22 +86,65 @@ class RssFeedInDB(RssFeedBase):
         from_attributes = True
 
 
+class FetchProfileSample(BaseModel):
+    created_at: datetime
+    success: bool
+    new_entries: Optional[int] = None
+    total_ms: float
+    stages: Dict[str, float]
+
+    class Config:
+        from_attributes = True
+
+
+class StageStats(BaseModel):
+    p50_ms: float
+    p95_ms: float
+    max_ms: float
+
+
+class FeedProfile(BaseModel):
+    feed_id: int
+    samples: int
+    total: StageStats
+    stages: Dict[str, StageStats]
+    recent: List[FetchProfileSample]
+
+
+class SlowFeed(BaseModel):
+    feed_id: int
+    url: str
+    title: Optional[str] = None
+    samples: int
+    p50_ms: float
+    p95_ms: float
+    error_rate: float
+
+
+def _stage_stats(values: List[float]) -> StageStats:
+    return StageStats(
+        p50_ms=round(percentile(values, 0.5), 3),
+        p95_ms=round(percentile(values, 0.95), 3),
+        max_ms=round(max(values), 3) if values else 0.0,
+    )
+
+
 @router.get("/", response_model=List[RssFeedInDB])
-def read_feeds(
+async def read_feeds(
     skip: int = 0,
     limit: int = 100,
     active_only: bool = False,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     Atgriež visu RSS barotņu sarakstu ar filtrēšanu
     """
-    query = db.query(RssFeed)
+    query = select(RssFeed)
     
     if active_only:
-        query = query.filter(RssFeed.active == True)
+        query = query.where(RssFeed.active == True)
     
-    feeds = query.offset(skip).limit(limit).all()
+    feeds = (await db.execute(query.offset(skip).limit(limit))).scalars().all()
     return feeds
 
 
@@ -76,39 +157,166 @@ def create_feed(
     """
     Pievieno jaunu RSS barotni
     """
-    # Pārbaudām, vai barotne ar šādu URL jau eksistē
-    existing_feed = db.query(RssFeed).filter(RssFeed.url == str(feed.url)).first()
+    # Pārbaudām, vai barotne ar šādu URL jau eksistē (arī http/https vai "/" beigās)
+    url = canonicalize_url(str(feed.url))
+    existing_feed = db.query(RssFeed.id).filter(RssFeed.url_key == url_key(url)).first()
     if existing_feed:
         raise HTTPException(status_code=400, detail="RSS barotne ar šādu URL jau eksistē")
     
     # Izveidojam jaunu barotni
     db_feed = RssFeed(
-        url=str(feed.url),
+        url=url,
         name=str(feed.name),
         active=feed.active
     )
     
     db.add(db_feed)
-    db.commit()
+    try:
+        db.commit()
+    except IntegrityError:
+        # Paralēls pieprasījums pievienoja barotni ar to pašu url_key
+        db.rollback()
+        raise HTTPException(status_code=400, detail="RSS barotne ar šādu URL jau eksistē")
     db.refresh(db_feed)
     
     # Palaižam barotnes ievākšanu fonā
-    background_tasks.add_task(collect_single_rss_feed.delay, db_feed.id)
+    background_tasks.add_task(send_task, 'collect_single_rss_feed', db_feed.id)
     
     return db_feed
 
 
+@router.post("/bulk", response_model=BulkImportResult)
+def create_feeds_bulk(bulk: RssFeedBulkCreate, db: Session = Depends(get_db)):
+    """
+    Pievieno barotnes masveidā; esošie un dublētie URL tiek izlaisti
+    """
+    if len(bulk.feeds) > settings.FEEDS_BULK_MAX:
+        raise HTTPException(status_code=413, detail=f"Vienā pieprasījumā atļautas ne vairāk kā {settings.FEEDS_BULK_MAX} barotnes")
+    items = [(item.url, item.name) for item in bulk.feeds]
+    return import_feeds(db, items, active=bulk.active, fetch=bulk.fetch)
+
+
+@router.post("/opml", response_model=BulkImportResult)
+def import_opml(
+    opml: bytes = Body(..., media_type="text/x-opml"),
+    fetch: bool = True,
+    db: Session = Depends(get_db)
+):
+    """
+    Importē barotnes no OPML dokumenta (pieprasījuma saturs)
+    """
+    try:
+        items = parse_opml(opml)
+    except OpmlError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    if len(items) > settings.FEEDS_BULK_MAX:
+        raise HTTPException(status_code=413, detail=f"Vienā pieprasījumā atļautas ne vairāk kā {settings.FEEDS_BULK_MAX} barotnes")
+    return import_feeds(db, items, fetch=fetch)
+
+
+@router.get("/opml")
+async def export_opml(active_only: bool = False, db: AsyncSession = Depends(get_async_db)):
+    """
+    Eksportē barotņu sarakstu OPML formātā
+    """
+    query = select(RssFeed.url, RssFeed.name, RssFeed.title, RssFeed.site_url).order_by(RssFeed.id)
+    if active_only:
+        query = query.where(RssFeed.active == True)
+    feeds = (await db.execute(query)).all()
+    return Response(
+        content=render_opml(feeds, settings.APP_NAME),
+        media_type="text/x-opml",
+        headers={"Content-Disposition": 'attachment; filename="feeds.opml"'},
+    )
+
+
+@router.get("/slowest", response_model=List[SlowFeed])
+async def read_slowest_feeds(
+    limit: int = Query(20, ge=1, le=500),
+    min_samples: int = Query(3, ge=1),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """
+    Atgriež barotnes, sakārtotas pēc kopējā ievākšanas laika p95 (pēdējo profilu logā)
+    """
+    p95 = func.percentile_cont(0.95).within_group(FeedFetchProfile.total_ms)
+    p50 = func.percentile_cont(0.5).within_group(FeedFetchProfile.total_ms)
+    samples = func.count(FeedFetchProfile.id)
+    errors = func.count(FeedFetchProfile.id).filter(FeedFetchProfile.success == False)
+    
+    query = select(
+        FeedFetchProfile.feed_id,
+        RssFeed.url,
+        RssFeed.title,
+        samples.label("samples"),
+        p50.label("p50_ms"),
+        p95.label("p95_ms"),
+        errors.label("errors"),
+    ).join(RssFeed, RssFeed.id == FeedFetchProfile.feed_id)\
+     .group_by(FeedFetchProfile.feed_id, RssFeed.url, RssFeed.title)\
+     .having(samples >= min_samples)\
+     .order_by(desc("p95_ms"))\
+     .limit(limit)
+    rows = (await db.execute(query)).all()
+    
+    return [
+        SlowFeed(
+            feed_id=row.feed_id,
+            url=row.url,
+            title=row.title,
+            samples=row.samples,
+            p50_ms=round(row.p50_ms, 3),
+            p95_ms=round(row.p95_ms, 3),
+            error_rate=round(row.errors / row.samples, 3),
+        )
+        for row in rows
+    ]
+
+
 @router.get("/{feed_id}", response_model=RssFeedInDB)
-def read_feed(feed_id: int, db: Session = Depends(get_db)):
+async def read_feed(feed_id: int, db: AsyncSession = Depends(get_async_db)):
     """
     Atgriež konkrētas RSS barotnes informāciju
     """
-    feed = db.query(RssFeed).filter(RssFeed.id == feed_id).first()
+    feed = await db.get(RssFeed, feed_id)
     if feed is None:
         raise HTTPException(status_code=404, detail="RSS barotne nav atrasta")
     return feed
 
 
+@router.get("/{feed_id}/profile", response_model=FeedProfile)
+async def read_feed_profile(
+    feed_id: int,
+    recent: int = Query(10, ge=0, le=100),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """
+    Atgriež barotnes ievākšanas laika profilu: procentiles katram posmam un pēdējos mērījumus
+    """
+    if await db.get(RssFeed, feed_id) is None:
+        raise HTTPException(status_code=404, detail="RSS barotne nav atrasta")
+    
+    query = select(FeedFetchProfile)\
+        .where(FeedFetchProfile.feed_id == feed_id)\
+        .order_by(FeedFetchProfile.created_at.desc())
+    profiles = (await db.execute(query)).scalars().all()
+    
+    # Posmi, kas konkrētajā mērījumā netika sasniegti, tiek skaitīti kā 0
+    stage_names = sorted({name for profile in profiles for name in profile.stages})
+    stages = {
+        name: _stage_stats([profile.stages.get(name, 0.0) for profile in profiles])
+        for name in stage_names
+    }
+    
+    return FeedProfile(
+        feed_id=feed_id,
+        samples=len(profiles),
+        total=_stage_stats([profile.total_ms for profile in profiles]),
+        stages=stages,
+        recent=profiles[:recent],
+    )
+
+
 @router.put("/{feed_id}", response_model=RssFeedInDB)
 def update_feed(
     feed_id: int,
@@ -124,10 +332,21 @@ def update_feed(
     
     # Atjauninām tikai norādītos laukus
     update_data = feed_update.model_dump(exclude_unset=True)
+    if update_data.get("url") is not None:
+        update_data["url"] = canonicalize_url(str(update_data["url"]))
+        duplicate = db.query(RssFeed.id).filter(
+            RssFeed.url_key == url_key(update_data["url"]), RssFeed.id != feed_id
+        ).first()
+        if duplicate:
+            raise HTTPException(status_code=400, detail="RSS barotne ar šādu URL jau eksistē")
     for key, value in update_data.items():
         setattr(db_feed, key, value)
     
-    db.commit()
+    try:
+        db.commit()
+    except IntegrityError:
+        db.rollback()
+        raise HTTPException(status_code=400, detail="RSS barotne ar šādu URL jau eksistē")
     db.refresh(db_feed)
     return db_feed
 
@@ -141,6 +360,8 @@ def delete_feed(feed_id: int, db: Session = Depends(get_db)):
     if db_feed is None:
         raise HTTPException(status_code=404, detail="RSS barotne nav atrasta")
     
+    # Tagu saites dzēšam pirms kaskādes, lai samazinātu tagu usage_count
+    unlink_entries(db, select(Entry.id).where(Entry.feed_id == feed_id))
     db.delete(db_feed)
     db.commit()
     return None
@@ -155,7 +376,12 @@ def fetch_feed(feed_id: int, db: Session = Depends(get_db)):
     if feed is None:
         raise HTTPException(status_code=404, detail="RSS barotne nav atrasta")
     
+    # Statuss tiek ierakstīts pirms uzdevuma nosūtīšanas, lai darbinieka "running"
+    # netiktu pārrakstīts ar "queued"
+    task_id = str(uuid.uuid4())
+    set_task_status(task_id, QUEUED, task='collect_single_rss_feed', feed_id=feed_id)
+    
     # Palaižam ievākšanas uzdevumu Celery
-    task = collect_single_rss_feed.delay(feed_id)
+    send_task('collect_single_rss_feed', feed_id, task_id=task_id)
     
-    return {"task_id": task.id, "status": "accepted"}
\ No newline at end of file
+    return {"task_id": task_id, "status": "accepted"}
\ No newline at end of file
@@ -0,0 +1,153 @@
+from fastapi import APIRouter, Depends, HTTPException
+from sqlalchemy import delete, insert, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+from typing import Dict, List, Optional
+from pydantic import BaseModel
+from datetime import datetime
+
+from app.models.database import get_db, get_async_db
+from app.models.models import FeedGroup, RssFeed, feed_group_feed
+
+router = APIRouter()
+
+
+# Shēmas
+class FeedGroupBase(BaseModel):
+    name: str
+    description: Optional[str] = None
+
+
+class FeedGroupCreate(FeedGroupBase):
+    feed_ids: List[int] = []
+
+
+class FeedGroupUpdate(BaseModel):
+    name: Optional[str] = None
+    description: Optional[str] = None
+    feed_ids: Optional[List[int]] = None  # aizstāj visu grupas sastāvu
+
+
+class FeedGroupInDB(FeedGroupBase):
+    id: int
+    feed_ids: List[int] = []
+    created_at: datetime
+    updated_at: datetime
+
+
+def _group_response(group: FeedGroup, feed_ids: List[int]) -> FeedGroupInDB:
+    return FeedGroupInDB(
+        id=group.id,
+        name=group.name,
+        description=group.description,
+        feed_ids=sorted(feed_ids),
+        created_at=group.created_at,
+        updated_at=group.updated_at,
+    )
+
+
+def _set_group_feeds(db: Session, group_id: int, feed_ids: List[int]) -> List[int]:
+    """
+    Aizstāj grupas sastāvu; neeksistējošas barotnes tiek noraidītas ar 400
+    """
+    feed_ids = sorted(set(feed_ids))
+    found = set(db.execute(select(RssFeed.id).where(RssFeed.id.in_(feed_ids))).scalars()) if feed_ids else set()
+    missing = [feed_id for feed_id in feed_ids if feed_id not in found]
+    if missing:
+        raise HTTPException(status_code=400, detail=f"Barotnes nav atrastas: {missing}")
+    
+    db.execute(delete(feed_group_feed).where(feed_group_feed.c.group_id == group_id))
+    if feed_ids:
+        db.execute(insert(feed_group_feed), [{"group_id": group_id, "feed_id": feed_id} for feed_id in feed_ids])
+    return feed_ids
+
+
+@router.get("/", response_model=List[FeedGroupInDB])
+async def read_groups(db: AsyncSession = Depends(get_async_db)):
+    """
+    Atgriež visas barotņu grupas ar to barotņu ID
+    """
+    groups = (await db.execute(select(FeedGroup).order_by(FeedGroup.name))).scalars().all()
+    members: Dict[int, List[int]] = {}
+    for group_id, feed_id in await db.execute(select(feed_group_feed.c.group_id, feed_group_feed.c.feed_id)):
+        members.setdefault(group_id, []).append(feed_id)
+    return [_group_response(group, members.get(group.id, [])) for group in groups]
+
+
+@router.post("/", response_model=FeedGroupInDB)
+def create_group(group: FeedGroupCreate, db: Session = Depends(get_db)):
+    """
+    Izveido barotņu grupu (piem. "Sports"), ko var izmantot GET /entries/?group_id=...
+    """
+    if db.query(FeedGroup.id).filter(FeedGroup.name == group.name).first():
+        raise HTTPException(status_code=400, detail="Grupa ar šādu nosaukumu jau eksistē")
+    
+    db_group = FeedGroup(name=group.name, description=group.description)
+    db.add(db_group)
+    db.flush()
+    feed_ids = _set_group_feeds(db, db_group.id, group.feed_ids)
+    db.commit()
+    db.refresh(db_group)
+    return _group_response(db_group, feed_ids)
+
+
+@router.get("/{group_id}", response_model=FeedGroupInDB)
+async def read_group(group_id: int, db: AsyncSession = Depends(get_async_db)):
+    """
+    Atgriež barotņu grupu pēc ID
+    """
+    group = await db.get(FeedGroup, group_id)
+    if group is None:
+        raise HTTPException(status_code=404, detail="Grupa nav atrasta")
+    
+    feed_ids = (await db.execute(
+        select(feed_group_feed.c.feed_id).where(feed_group_feed.c.group_id == group_id)
+    )).scalars().all()
+    return _group_response(group, list(feed_ids))
+
+
+@router.put("/{group_id}", response_model=FeedGroupInDB)
+def update_group(group_id: int, group_update: FeedGroupUpdate, db: Session = Depends(get_db)):
+    """
+    Atjaunina grupas nosaukumu, aprakstu vai sastāvu
+    """
+    db_group = db.query(FeedGroup).filter(FeedGroup.id == group_id).first()
+    if db_group is None:
+        raise HTTPException(status_code=404, detail="Grupa nav atrasta")
+    
+    update_data = group_update.model_dump(exclude_unset=True)
+    feed_ids = update_data.pop("feed_ids", None)
+    if update_data.get("name") is not None:
+        duplicate = db.query(FeedGroup.id).filter(
+            FeedGroup.name == update_data["name"], FeedGroup.id != group_id
+        ).first()
+        if duplicate:
+            raise HTTPException(status_code=400, detail="Grupa ar šādu nosaukumu jau eksistē")
+    for key, value in update_data.items():
+        setattr(db_group, key, value)
+    
+    if feed_ids is not None:
+        feed_ids = _set_group_feeds(db, group_id, feed_ids)
+        db_group.updated_at = datetime.utcnow()
+    else:
+        feed_ids = list(db.execute(
+            select(feed_group_feed.c.feed_id).where(feed_group_feed.c.group_id == group_id)
+        ).scalars())
+    
+    db.commit()
+    db.refresh(db_group)
+    return _group_response(db_group, feed_ids)
+
+
+@router.delete("/{group_id}", status_code=204)
+def delete_group(group_id: int, db: Session = Depends(get_db)):
+    """
+    Dzēš barotņu grupu (barotnes paliek)
+    """
+    db_group = db.query(FeedGroup).filter(FeedGroup.id == group_id).first()
+    if db_group is None:
+        raise HTTPException(status_code=404, detail="Grupa nav atrasta")
+    
+    db.delete(db_group)
+    db.commit()
+    return None
@@ -0,0 +1,31 @@
+from fastapi import APIRouter, HTTPException
+from typing import Optional
+from pydantic import BaseModel
+from datetime import datetime
+
+from app.services.task_status import get_task_status
+
+router = APIRouter()
+
+
+# Shēmas
+class TaskStatus(BaseModel):
+    task_id: str
+    state: str
+    task: Optional[str] = None
+    feed_id: Optional[int] = None
+    new_entries: Optional[int] = None
+    error: Optional[str] = None
+    updated_at: Optional[datetime] = None
+
+
+@router.get("/{task_id}", response_model=TaskStatus)
+def read_task_status(task_id: str):
+    """
+    Atgriež uzdevuma statusu (queued, running, success, failure), piem. pēc
+    POST /feeds/{feed_id}/fetch. Statuss glabājas TASK_STATUS_TTL sekundes.
+    """
+    status = get_task_status(task_id)
+    if status is None:
+        raise HTTPException(status_code=404, detail="Uzdevums nav atrasts vai tā statuss ir novecojis")
+    return TaskStatus(task_id=task_id, **status)
@@ -0,0 +1,109 @@
+import logging
+from datetime import datetime, timedelta
+from typing import Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import PlainTextResponse
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from app.config import settings
+from app.models.database import get_db, get_async_db
+from app.models.models import RssFeed
+from app.services import websub
+from app.services.payloads import store_payload
+from app.tasks.dispatch import send_task
+
+# Konfigurējam žurnalēšanu
+logger = logging.getLogger(__name__)
+
+router = APIRouter()
+
+
+@router.get("/{feed_id}", response_class=PlainTextResponse)
+def verify_subscription(
+    feed_id: int,
+    hub_mode: str = Query(..., alias="hub.mode"),
+    hub_topic: str = Query(..., alias="hub.topic"),
+    hub_challenge: Optional[str] = Query(None, alias="hub.challenge"),
+    hub_lease_seconds: Optional[int] = Query(None, alias="hub.lease_seconds"),
+    hub_reason: Optional[str] = Query(None, alias="hub.reason"),
+    db: Session = Depends(get_db)
+):
+    """
+    WebSub centrmezgla abonementa apstiprināšana: atbildē jāatgriež hub.challenge.
+    Tiek apstiprināts (vai noraidīts) tikai tas režīms, kuru pieprasījām paši un
+    uz kura apstiprinājumu vēl gaidām.
+    """
+    if hub_mode not in ("subscribe", "unsubscribe", "denied"):
+        raise HTTPException(status_code=400, detail="Nezināms hub.mode")
+
+    feed = db.query(RssFeed).filter(RssFeed.id == feed_id).first()
+    if feed is None or not feed.websub_hub or hub_topic != (feed.websub_topic or feed.url):
+        raise HTTPException(status_code=404, detail="Abonements nav atrasts")
+
+    requested_mode = websub.PENDING_MODES.get(feed.websub_state)
+    # Noraidījums attiecas tikai uz gaidošu abonēšanas pieprasījumu
+    allowed = {requested_mode, "denied"} if requested_mode == "subscribe" else {requested_mode}
+    if requested_mode is None or hub_mode not in allowed:
+        raise HTTPException(status_code=404, detail="Abonements nav pieprasīts")
+
+    if hub_mode == "denied":
+        logger.warning(f"WebSub centrmezgls noraidīja barotnes {feed.url} abonementu: {hub_reason}")
+        feed.websub_state = websub.NONE
+        feed.websub_lease_expires = None
+        db.commit()
+        return ""
+
+    if not hub_challenge:
+        raise HTTPException(status_code=400, detail="Trūkst hub.challenge")
+
+    if hub_mode == "subscribe":
+        if not feed.active:
+            raise HTTPException(status_code=404, detail="Abonements nav pieprasīts")
+        lease = hub_lease_seconds or settings.WEBSUB_LEASE_SECONDS
+        feed.websub_state = websub.SUBSCRIBED
+        feed.websub_lease_expires = datetime.utcnow() + timedelta(seconds=lease)
+        logger.info(f"WebSub abonements barotnei {feed.url} apstiprināts uz {lease} s")
+    else:
+        feed.websub_state = websub.NONE
+        feed.websub_lease_expires = None
+        logger.info(f"WebSub atteikšanās barotnei {feed.url} apstiprināta")
+
+    db.commit()
+    return hub_challenge
+
+
+@router.post("/{feed_id}", status_code=202)
+async def receive_push(feed_id: int, request: Request, db: AsyncSession = Depends(get_async_db)):
+    """
+    WebSub satura piegāde. Saturs tiek saglabāts Celery uzdevumā ar to pašu
+    parsēšanas un saglabāšanas ceļu kā regulārā ievākšana.
+    """
+    feed = await db.get(RssFeed, feed_id)
+    if feed is None or feed.websub_state == websub.NONE:
+        raise HTTPException(status_code=404, detail="Abonements nav atrasts")
+
+    # Izmērs tiek pārbaudīts pirms lasīšanas un lasīšanas laikā - ķermenis netiek
+    # buferēts atmiņā pilnībā, ja tas pārsniedz RSS_MAX_FEED_BYTES
+    limit = settings.RSS_MAX_FEED_BYTES
+    content_length = request.headers.get("content-length", "")
+    if content_length.isdigit() and int(content_length) > limit:
+        raise HTTPException(status_code=413, detail="Saturs pārsniedz atļauto izmēru")
+    body = bytearray()
+    async for chunk in request.stream():
+        body.extend(chunk)
+        if len(body) > limit:
+            raise HTTPException(status_code=413, detail="Saturs pārsniedz atļauto izmēru")
+    body = bytes(body)
+
+    # Nederīgs paraksts: saskaņā ar specifikāciju atbildam ar 2xx, bet saturu ignorējam
+    if not websub.verify_signature(feed.websub_secret, body, request.headers.get("X-Hub-Signature")):
+        logger.warning(f"WebSub piegāde barotnei {feed_id} ar nederīgu parakstu ignorēta")
+        return Response(status_code=202)
+
+    # Ķermenis tiek glabāts Redis ar īsu derīgumu; brokera rindā ir tikai atslēga
+    key = await run_in_threadpool(store_payload, body)
+    send_task('ingest_websub_push', feed_id, key)
+    return Response(status_code=202)
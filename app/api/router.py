@@ -1,8 +1,11 @@
 from fastapi import APIRouter
-from app.api.endpoints import feeds, entries
+from app.api.endpoints import feeds, entries, groups, tasks, websub
 
 api_router = APIRouter()
 
 # Pievienojam maršrutus no atsevišķiem galapunktiem
 api_router.include_router(feeds.router, prefix="/feeds", tags=["feeds"])
-api_router.include_router(entries.router, prefix="/entries", tags=["entries"])
\ No newline at end of file
+api_router.include_router(entries.router, prefix="/entries", tags=["entries"])
+api_router.include_router(groups.router, prefix="/groups", tags=["groups"])
+api_router.include_router(tasks.router, prefix="/tasks", tags=["tasks"])
+api_router.include_router(websub.router, prefix="/websub", tags=["websub"])
@@ -16,14 +16,90 @@ class Settings(BaseSettings):
     POSTGRES_HOST: str
     POSTGRES_DB: str
     
+    # Datubāzes savienojumu pūla konfigurācija (API procesiem)
+    DB_POOL_SIZE: int = 5          # pastāvīgo savienojumu skaits pūlā
+    DB_MAX_OVERFLOW: int = 10      # papildu savienojumi slodzes maksimumā
+    DB_POOL_TIMEOUT: int = 30      # cik sekundes gaidīt brīvu savienojumu
+    DB_POOL_RECYCLE: int = 3600    # savienojumu atjaunošana sekundēs
+    DB_PGBOUNCER: bool = False     # PgBouncer transaction režīms - bez servera puses prepared statements
+    # API starta režīms: "check" - tikai salīdzina Alembic versiju (brīdina), "strict" - neatbilstības
+    # gadījumā neļauj startēt, "create_all" - veido trūkstošās tabulas (izstrādei), "skip" - nepārbauda
+    DB_STARTUP_MODE: str = "check"
+    
+    # Celery darbinieku datubāzes profils: "null" (bez pūla, drošs aiz PgBouncer) vai "queue"
+    CELERY_DB_POOL_MODE: str = "null"
+    CELERY_DB_POOL_SIZE: int = 2
+    CELERY_DB_MAX_OVERFLOW: int = 2
+    
     # Celery konfigurācija
     CELERY_BROKER_URL: str
     CELERY_RESULT_BACKEND: str
+    CELERY_METRICS_PORT: Optional[int] = None  # Prometheus eksporta ports Celery darbiniekam
+    CELERY_IO_CONCURRENCY: int = 32    # pavedieni tīkla rindu (content) darbiniekā
+    CELERY_CPU_CONCURRENCY: Optional[int] = None  # procesi feeds darbiniekā; pēc noklusējuma - CPU kodolu skaits
+    CELERY_RESULT_EXPIRES: int = 3600  # sekundes, cik ilgi glabājas uzdevumu rezultāti, kas netiek ignorēti
+    TASK_STATUS_REDIS_URL: Optional[str] = None  # ja nav norādīts, tiek izmantots CELERY_BROKER_URL
+    TASK_STATUS_TTL: int = 3600        # sekundes, cik ilgi pieejams GET /tasks/{task_id} statuss
     
     # RSS ievākšanas konfigurācija
     RSS_COLLECTION_INTERVAL: int = 2  # minūtes
     RSS_CONCURRENT_REQUESTS: int = 2   # vienlaicīgo pieprasījumu skaits
     RSS_REQUEST_TIMEOUT: int = 10      # pieprasījuma noilgums sekundēs
+    RSS_BATCH_COMMIT_SIZE: int = 50    # pēc cik barotnēm apstiprināt partijas transakciju
+    RSS_PROFILE_HISTORY: int = 50      # cik pēdējos laika profilus glabāt katrai barotnei
+    RSS_STALE_AFTER: int = 3600        # pēc cik sekundēm bez ievākšanas barotne skaitās novecojusi (metrika)
+    RSS_MAX_FEED_BYTES: int = 10 * 1024 * 1024  # maksimālais barotnes atbildes izmērs baitos
+    RSS_FETCH_DEADLINE: int = 30       # kopējais lejupielādes laika limits sekundēs
+    RSS_KNOWN_ITEMS_STOP: int = 5      # pēc cik secīgiem jau zināmiem ierakstiem pārtraukt lasīšanu
+    RSS_FULL_SCAN_EVERY: int = 12      # ik pēc cik ievākšanām pārbaudīt visu barotni
+    RSS_RECENT_IDS: int = 100          # cik pēdējo ierakstu ID glabāt barotnei
+    FEEDS_BULK_MAX: int = 10000        # maksimālais barotņu skaits vienā masveida importā
+    FEEDS_BULK_FETCH_CHUNK: int = 50   # barotnes vienā pirmās ievākšanas uzdevumā
+    FEEDS_BULK_FETCH_STAGGER: int = 30 # sekundes starp pirmās ievākšanas porcijām
+    
+    # Ķēdes pārtraucēja (circuit breaker) konfigurācija
+    CIRCUIT_FAILURE_THRESHOLD: int = 3  # pēc cik secīgām kļūdām atvērt barotnes vai saimniekdatora ķēdi
+    CIRCUIT_HOST_TRIP_FEEDS: int = 3    # cik barotņu kļūdas vienā ciklā uzreiz atver saimniekdatora ķēdi
+    CIRCUIT_BASE_DELAY: int = 300       # pirmā atkārtotā mēģinājuma aizture sekundēs
+    CIRCUIT_MAX_DELAY: int = 86400      # maksimālā aizture sekundēs
+    
+    # DNS keša konfigurācija (TTL sekundēs)
+    DNS_CACHE_DEFAULT_TTL: int = 300    # ja atrisinātājs TTL neatgriež (bez dnspython)
+    DNS_CACHE_MIN_TTL: int = 30
+    DNS_CACHE_MAX_TTL: int = 3600
+    DNS_CACHE_NEGATIVE_TTL: int = 60    # cik ilgi atcerēties neatrisināmus vārdus
+    DNS_CACHE_RESOLVE_TIMEOUT: float = 5.0
+    DNS_HOSTS_FILE: str = "/etc/hosts"  # tiek pārbaudīts pirms DNS vaicājuma
+    HTTP_CONNECT_ATTEMPT_TIMEOUT: float = 2.0  # savienojuma mēģinājums vienai adresei, ja vārdam ir vairākas
+    
+    # Pilnā raksta satura iegūšanas konfigurācija
+    CONTENT_EXTRACTION_POLICY: str = "skip_if_full"  # "always", "skip_if_full" vai "never"
+    CONTENT_FULL_MIN_LENGTH: int = 1500  # no cik simboliem barotnes saturs tiek uzskatīts par pilnu rakstu
+    CONTENT_RATE_PER_DOMAIN: float = 1.0  # raksta pieprasījumi sekundē vienam domēnam (visi darbinieki kopā); 0 - bez limita
+    CONTENT_RATE_BURST: int = 5
+    CONTENT_RATE_LIMIT_REDIS_URL: Optional[str] = None  # ja nav norādīts, tiek izmantots CELERY_BROKER_URL
+    CONTENT_RATE_LIMIT_REDIS_TIMEOUT: float = 2.0  # Redis savienojuma un atbildes noilgums sekundēs
+    # content rindu izpilda pavedienu pūls, kurā task_time_limit nedarbojas - raksta
+    # lejupielādi ierobežo šie limiti un RSS_REQUEST_TIMEOUT katrai lasīšanai
+    ARTICLE_FETCH_DEADLINE: int = 30    # kopējais raksta lejupielādes laika limits sekundēs
+    ARTICLE_MAX_BYTES: int = 5 * 1024 * 1024  # maksimālais raksta atbildes izmērs baitos
+    ARTICLE_EXTRACT_TIME_LIMIT: int = 60  # teksta izgūšanas (extract rinda, prefork) soft time limit sekundēs
+    CHARSET_SNIFF_BYTES: int = 8192     # kur meklēt <meta charset>, ja HTTP galvenē kodējuma nav
+    CHARSET_DETECT_BYTES: int = 32768   # cik baitus analizēt kodējuma noteikšanai (domēna rezultāts tiek kešots)
+    ARTICLE_RULES_FILE: Optional[str] = None  # JSON ar domēnu izgūšanas noteikumiem (satura selektors, dzēšamie elementi)
+    
+    # WebSub (PubSubHubbub) konfigurācija
+    WEBSUB_CALLBACK_BASE: Optional[str] = None  # servisa publiskā adrese, piem. https://rss.example.com; bez tās WebSub ir izslēgts
+    WEBSUB_LEASE_SECONDS: int = 864000  # pieprasītais abonementa ilgums (10 dienas)
+    WEBSUB_RENEW_BEFORE: int = 86400    # cik sekundes pirms abonementa beigām to atjaunot
+    WEBSUB_FALLBACK_POLL: int = 21600   # abonētās barotnes papildus ievāc tikai reizi 6 stundās
+    PAYLOAD_REDIS_URL: Optional[str] = None  # uzdevumu datu (piegāžu ķermeņu) glabātuve; ja nav norādīts, tiek izmantots CELERY_BROKER_URL
+    PAYLOAD_TTL: int = 3600             # sekundes, cik ilgi uzdevuma dati gaida apstrādi
+    
+    # Izmaiņu plūsmas (change feed) konfigurācija
+    CHANGE_FEED_REDIS_URL: Optional[str] = None  # ja nav norādīts, tiek izmantots CELERY_BROKER_URL
+    CHANGE_FEED_CHANNEL: str = "rss:new_entries"
+    CHANGE_FEED_HEARTBEAT: int = 15    # sekundes starp SSE keepalive ziņām
     
     # Izveidojam datubāzes URL no komponentēm
     @property
@@ -36,6 +112,17 @@ class Settings(BaseSettings):
             path=self.POSTGRES_DB,
         )
     
+    # Asinhronā (asyncpg) datubāzes URL API lasīšanas ceļam
+    @property
+    def SQLALCHEMY_ASYNC_DATABASE_URI(self) -> PostgresDsn:
+        return PostgresDsn.build(
+            scheme="postgresql+asyncpg",
+            username=self.POSTGRES_USER,
+            password=self.POSTGRES_PASSWORD,
+            host=self.POSTGRES_HOST,
+            path=self.POSTGRES_DB,
+        )
+    
     class Config:
         env_file = ".env"
         case_sensitive = True
@@ -1,11 +1,20 @@
-from fastapi import FastAPI, Depends
-from fastapi.middleware.cors import CORSMiddleware
-import logging
-from contextlib import asynccontextmanager
+import time
 
-from app.api.router import api_router
-from app.config import settings
-from app.models.database import Base, engine
+# Importu ilgums tiek mērīts no šīs vietas (sk. rss_app_startup_seconds)
+_import_started = time.perf_counter()
+
+from fastapi import FastAPI, Depends, Request, Response  # noqa: E402
+from fastapi.middleware.cors import CORSMiddleware  # noqa: E402
+import logging  # noqa: E402
+from contextlib import asynccontextmanager  # noqa: E402
+
+from app.api.router import api_router  # noqa: E402
+from app.config import settings  # noqa: E402
+from app.metrics import APP_STARTUP_SECONDS, HTTP_REQUEST_SECONDS, render_latest  # noqa: E402
+from app.models.database import Base, async_engine, get_engine  # noqa: E402
+from app.models.schema_check import verify_schema  # noqa: E402
+
+IMPORT_SECONDS = time.perf_counter() - _import_started
 
 # Konfigurējam žurnalēšanu
 logging.basicConfig(
@@ -22,18 +31,31 @@ async def lifespan(app: FastAPI):
     """
     # Kods, kas tiek izpildīts, kad aplikācija tiek palaista
     logger.info("RSS Collection Service startējas")
+    started = time.perf_counter()
+    mode = settings.DB_STARTUP_MODE
     try:
-        # Izveidojam datubāzes tabulasn ja tās vēl nav izveidotas
-        # Produkcijā labāk izmantot Alembic migrācijasn bet attīstības vidē var izmantot šo
-        Base.metadata.create_all(bind=engine)
-        logger.info("Datubāzes tabulas izveidotas/pārbaudītas")
+        if mode == "create_all":
+            # Izveidojam datubāzes tabulas, ja tās vēl nav izveidotas (tikai izstrādes vidē -
+            # katrai tabulai tiek veikta atsevišķa pārbaude, un tas var sacensties ar Alembic)
+            Base.metadata.create_all(bind=get_engine())
+            logger.info("Datubāzes tabulas izveidotas/pārbaudītas")
+        elif mode in ("check", "strict"):
+            # Viens vaicājums: alembic_version pret migrāciju head
+            await verify_schema(async_engine, strict=mode == "strict")
     except Exception as e:
         logger.error(f"Kļūda inicializējot datubāzi: {e}")
         raise
     
+    startup_seconds = time.perf_counter() - started
+    APP_STARTUP_SECONDS.labels("import").set(IMPORT_SECONDS)
+    APP_STARTUP_SECONDS.labels("startup").set(startup_seconds)
+    logger.info(f"Starta laiks: imports {IMPORT_SECONDS * 1000:.0f} ms, "
+                f"datubāzes pārbaude ({mode}) {startup_seconds * 1000:.0f} ms")
+    
     yield  # Aplikācija darbojas
     
     # Kods, kas tiek izpildīts, kad aplikācija tiek apturēta
+    await async_engine.dispose()
     logger.info("RSS Collection Service beidz darbu")
 
 
@@ -54,6 +76,25 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+
+@app.middleware("http")
+async def record_request_latency(request: Request, call_next):
+    """
+    Mēra pieprasījumu ilgumu katram maršrutam (pēc maršruta šablona, nevis faktiskā URL)
+    """
+    start = time.perf_counter()
+    status = 500
+    try:
+        response = await call_next(request)
+        status = response.status_code
+        return response
+    finally:
+        route = request.scope.get("route")
+        route_path = route.path if route is not None else "unmatched"
+        HTTP_REQUEST_SECONDS.labels(request.method, route_path, str(status)).observe(
+            time.perf_counter() - start
+        )
+
 # Pievienojam API maršrutus
 app.include_router(api_router, prefix=settings.API_PREFIX)
 
@@ -79,6 +120,26 @@ def health_check():
     return {"status": "healthy"}
 
 
+@app.get("/metrics", include_in_schema=False)
+def metrics():
+    """
+    Prometheus metriku eksports
+    """
+    data, content_type = render_latest()
+    return Response(content=data, media_type=content_type)
+
+
+@app.get("/health/db")
+def db_pool_status():
+    """
+    Datubāzes savienojumu pūla stāvoklis pūla izmēru pielāgošanai
+    """
+    return {
+        "sync_pool": get_engine().pool.status(),
+        "async_pool": async_engine.pool.status(),
+    }
+
+
 if __name__ == "__main__":
     import uvicorn
     uvicorn.run("app.main:app", host="0.0.0.0", port=8000, reload=True)
\ No newline at end of file
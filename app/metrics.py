@@ -0,0 +1,167 @@
+import os
+
+from prometheus_client import (
+    CONTENT_TYPE_LATEST,
+    REGISTRY,
+    CollectorRegistry,
+    Counter,
+    Gauge,
+    Histogram,
+    generate_latest,
+    multiprocess,
+)
+
+# Datubāzes savienojumu pūla metrikas
+DB_POOL_CHECKOUTS = Counter(
+    "rss_db_pool_checkouts_total",
+    "Savienojumu izņemšanas reizes no pūla",
+    ["profile"],
+)
+DB_POOL_CHECKOUT_WAIT = Histogram(
+    "rss_db_pool_checkout_wait_seconds",
+    "Laiks, kas pavadīts gaidot savienojumu no pūla",
+    ["profile"],
+    buckets=(0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1, 2.5, 5, 10, 30),
+)
+DB_POOL_CONNECTIONS_IN_USE = Gauge(
+    "rss_db_pool_connections_in_use",
+    "Šobrīd izņemto savienojumu skaits",
+    ["profile"],
+    multiprocess_mode="livesum",
+)
+DB_POOL_CONNECTS = Counter(
+    "rss_db_pool_connects_total",
+    "Jaunu fizisko datubāzes savienojumu skaits",
+    ["profile"],
+)
+
+# RSS kolektora metrikas
+FEED_FETCH_SECONDS = Histogram(
+    "rss_feed_fetch_seconds",
+    "Barotnes lejupielādes ilgums (līdz pilnai atbildei)",
+    buckets=(0.05, 0.1, 0.25, 0.5, 1, 2, 5, 10, 20, 30),
+)
+# Katras barotnes laiki ir datubāzē (GET /feeds/slowest), metrikās - tikai kopsumma
+FEEDS_STALE = Gauge(
+    "rss_feeds_stale",
+    "Aktīvās barotnes, kas nav ievāktas ilgāk par RSS_STALE_AFTER, pēc ķēdes stāvokļa",
+    ["circuit_state"],
+    multiprocess_mode="mostrecent",
+)
+FEED_BYTES_DOWNLOADED = Counter(
+    "rss_feed_bytes_downloaded_total",
+    "Lejupielādēto barotņu baitu skaits (pēc atspiešanas)",
+)
+HTTP_RESPONSE_BYTES = Counter(
+    "rss_http_response_bytes_total",
+    "HTTP atbilžu baiti: wire - saņemtie (saspiesti), decoded - pēc atspiešanas",
+    ["source", "kind", "encoding"],
+)
+FEED_REDIRECTS = Counter(
+    "rss_feed_redirects_total",
+    "Barotņu novirzīšanas (updated - saglabāta jaunā adrese, duplicate - sakrīt ar citu barotni, temporary)",
+    ["result"],
+)
+FEED_PARSE_SECONDS = Histogram(
+    "rss_feed_parse_seconds",
+    "Barotnes parsēšanas ilgums",
+    buckets=(0.001, 0.005, 0.01, 0.05, 0.1, 0.25, 0.5, 1, 2.5),
+)
+FEED_FETCH_ERRORS = Counter(
+    "rss_feed_fetch_errors_total",
+    "Neveiksmīgi barotņu ievākšanas mēģinājumi",
+)
+ENTRIES_INSERTED = Counter(
+    "rss_entries_inserted_total",
+    "Saglabātie jaunie ieraksti",
+)
+ENTRIES_DUPLICATE = Counter(
+    "rss_entries_duplicate_total",
+    "Izlaistie ieraksti, kas jau bija datubāzē",
+)
+DEDUP_QUERY_SECONDS = Histogram(
+    "rss_dedup_query_seconds",
+    "Dublikātu pārbaudes vaicājuma ilgums",
+    buckets=(0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1),
+)
+DATE_PARSE_TOTAL = Counter(
+    "rss_date_parse_total",
+    "Ierakstu datumu parsēšana pēc izmantotās metodes",
+    ["method"],
+)
+
+# DNS keša metrikas
+DNS_CACHE_LOOKUPS = Counter(
+    "rss_dns_cache_lookups_total",
+    "DNS keša uzmeklējumi (hit, miss, negative_hit)",
+    ["result"],
+)
+DNS_RESOLVE_SECONDS = Histogram(
+    "rss_dns_resolve_seconds",
+    "DNS atrisināšanas ilgums keša kļūdas gadījumā",
+    buckets=(0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5),
+)
+
+# Pilnā raksta satura iegūšanas metrikas
+ARTICLE_EXTRACTION_SECONDS = Histogram(
+    "rss_article_extraction_seconds",
+    "Raksta teksta izgūšanas (lxml koks, readability vai domēna noteikums) ilgums",
+    buckets=(0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5),
+)
+CHARSET_DETECTION_SECONDS = Histogram(
+    "rss_charset_detection_seconds",
+    "Raksta kodējuma noteikšanas ilgums pēc avota (header, bom, meta, cache, detected, default)",
+    ["source"],
+    buckets=(0.00001, 0.0001, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1),
+)
+CONTENT_TASKS_DISPATCHED = Counter(
+    "rss_content_tasks_total",
+    "Jauno ierakstu pilnā satura uzdevumi (dispatched, skipped_full, skipped_policy)",
+    ["result"],
+)
+CONTENT_RATE_LIMIT_TOTAL = Counter(
+    "rss_content_rate_limit_total",
+    "Domēna ātruma ierobežojuma pārbaudes (allowed, throttled, error)",
+    ["result"],
+)
+
+# Celery uzdevumu metrikas
+CELERY_TASK_SECONDS = Histogram(
+    "rss_celery_task_seconds",
+    "Celery uzdevumu izpildes ilgums",
+    ["task", "queue", "state"],
+    buckets=(0.01, 0.05, 0.1, 0.5, 1, 5, 10, 30, 60, 120, 300, 600),
+)
+
+# HTTP API metrikas
+HTTP_REQUEST_SECONDS = Histogram(
+    "rss_http_request_seconds",
+    "API pieprasījumu apstrādes ilgums",
+    ["method", "route", "status"],
+    buckets=(0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10),
+)
+APP_STARTUP_SECONDS = Gauge(
+    "rss_app_startup_seconds",
+    "API procesa starta ilgums: import - app.main moduļu imports, startup - lifespan (shēmas pārbaude)",
+    ["phase"],
+    multiprocess_mode="max",
+)
+
+
+def get_registry():
+    """
+    Atgriež reģistru eksportam. Ja iestatīts PROMETHEUS_MULTIPROC_DIR (Celery prefork,
+    vairāki uvicorn darbinieki), metrikas tiek apkopotas no visiem procesiem.
+    """
+    if os.environ.get("PROMETHEUS_MULTIPROC_DIR"):
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+        return registry
+    return REGISTRY
+
+
+def render_latest():
+    """
+    Atgriež metriku tekstu un tā satura tipu
+    """
+    return generate_latest(get_registry()), CONTENT_TYPE_LATEST
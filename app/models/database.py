@@ -1,27 +1,157 @@
-from sqlalchemy import create_engine
+import time
+import uuid
+
+from sqlalchemy import create_engine, event
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import AsyncAdaptedQueuePool, NullPool, QueuePool
 
 from app.config import settings
+from app.metrics import (
+    DB_POOL_CHECKOUTS,
+    DB_POOL_CHECKOUT_WAIT,
+    DB_POOL_CONNECTIONS_IN_USE,
+    DB_POOL_CONNECTS,
+)
+
+
+def _timed_pool_class(base, profile: str):
+    """
+    Izveido pūla klasi, kas mēra, cik ilgi tiek gaidīts brīvs savienojums
+    """
+    def _do_get(self):
+        start = time.perf_counter()
+        try:
+            return base._do_get(self)
+        finally:
+            DB_POOL_CHECKOUT_WAIT.labels(profile).observe(time.perf_counter() - start)
+
+    return type(f"Timed{base.__name__}", (base,), {"_do_get": _do_get})
+
+
+def _instrument_engine(engine, profile: str):
+    """
+    Pievieno pūla notikumu klausītājus metriku uzskaitei
+    """
+    @event.listens_for(engine, "connect")
+    def _on_connect(dbapi_connection, connection_record):
+        DB_POOL_CONNECTS.labels(profile).inc()
+
+    @event.listens_for(engine, "checkout")
+    def _on_checkout(dbapi_connection, connection_record, connection_proxy):
+        DB_POOL_CHECKOUTS.labels(profile).inc()
+        DB_POOL_CONNECTIONS_IN_USE.labels(profile).inc()
+
+    @event.listens_for(engine, "checkin")
+    def _on_checkin(dbapi_connection, connection_record):
+        DB_POOL_CONNECTIONS_IN_USE.labels(profile).dec()
+
+    return engine
+
+
+def create_db_engine(profile: str = "api"):
+    """
+    Izveido sinhrono datubāzes dzinēju norādītajam profilam.
+
+    "api" izmanto konfigurējamu QueuePool, "celery" - CELERY_DB_POOL_MODE:
+    "null" atver savienojumu katrai sesijai un uzreiz to atdod, kas ir drošs
+    aiz PgBouncer transaction pooling režīmā un neaizņem savienojumus starp uzdevumiem.
+    """
+    options = {
+        "pool_pre_ping": True,  # Pārbauda savienojumu pirms tā izmantošanas
+    }
+
+    if profile == "celery" and settings.CELERY_DB_POOL_MODE == "null":
+        options["poolclass"] = NullPool
+    else:
+        if profile == "celery":
+            pool_size, max_overflow = settings.CELERY_DB_POOL_SIZE, settings.CELERY_DB_MAX_OVERFLOW
+        else:
+            pool_size, max_overflow = settings.DB_POOL_SIZE, settings.DB_MAX_OVERFLOW
+        options.update(
+            poolclass=_timed_pool_class(QueuePool, profile),
+            pool_size=pool_size,
+            max_overflow=max_overflow,
+            pool_timeout=settings.DB_POOL_TIMEOUT,
+            pool_recycle=settings.DB_POOL_RECYCLE,  # Atjauno savienojumus pēc noteikta laika
+        )
+
+    return _instrument_engine(create_engine(str(settings.SQLALCHEMY_DATABASE_URI), **options), profile)
+
+
+def create_async_db_engine():
+    """
+    Izveido asinhrono (asyncpg) dzinēju API lasīšanas galapunktiem
+    """
+    connect_args = {}
+    if settings.DB_PGBOUNCER:
+        # PgBouncer transaction režīmā prepared statements nedrīkst kešot uz servera, un
+        # to nosaukumiem jābūt unikāliem, jo nākamā transakcija var nonākt citā savienojumā
+        connect_args = {
+            "statement_cache_size": 0,
+            "prepared_statement_cache_size": 0,
+            "prepared_statement_name_func": lambda: f"__asyncpg_{uuid.uuid4()}__",
+        }
+
+    engine = create_async_engine(
+        str(settings.SQLALCHEMY_ASYNC_DATABASE_URI),
+        poolclass=_timed_pool_class(AsyncAdaptedQueuePool, "api_async"),
+        pool_pre_ping=True,
+        pool_size=settings.DB_POOL_SIZE,
+        max_overflow=settings.DB_MAX_OVERFLOW,
+        pool_timeout=settings.DB_POOL_TIMEOUT,
+        pool_recycle=settings.DB_POOL_RECYCLE,
+        connect_args=connect_args,
+    )
+    _instrument_engine(engine.sync_engine, "api_async")
+    return engine
+
 
 # Izveidojam datubāzes dzinēju
-engine = create_engine(
-    str(settings.SQLALCHEMY_DATABASE_URI),
-    pool_pre_ping=True,  # Pārbauda savienojumu pirms tā izmantošanas
-    pool_recycle=3600,   # Atjauno savienojumus pēc stundas
-)
+engine = create_db_engine("api")
 
 # Izveidojam sesijas fabriku
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+# Asinhronais dzinējs un sesijas API lasīšanas galapunktiem
+async_engine = create_async_db_engine()
+AsyncSessionLocal = async_sessionmaker(async_engine, autoflush=False, expire_on_commit=False)
+
 # Izveidojam bāzes modeli
 Base = declarative_base()
 
 
+def get_engine():
+    """
+    Sinhronais dzinējs, ar kuru pašlaik strādā SessionLocal (Celery darbiniekā -
+    darbinieka profils). Moduļa `engine` vienmēr ir API profila dzinējs.
+    """
+    return SessionLocal.kw["bind"]
+
+
+def configure_worker_engine():
+    """
+    Pārslēdz SessionLocal uz Celery darbinieku dzinēja profilu.
+    Jāizsauc katrā darbinieka procesā (pēc fork), pirms tiek atvērtas sesijas.
+    """
+    # Savienojumus, kas mantoti no vecākprocesa, nedrīkst izmantot bērnprocesā
+    get_engine().dispose(close=False)
+    worker_engine = create_db_engine("celery")
+    SessionLocal.configure(bind=worker_engine)
+    return worker_engine
+
+
 # Utilitātes funkcija, lai iegūtu datubāzes sesiju
 def get_db():
     db = SessionLocal()
     try:
         yield db
     finally:
-        db.close()
\ No newline at end of file
+        db.close()
+
+
+# Asinhronā versija FastAPI atkarībām
+async def get_async_db():
+    async with AsyncSessionLocal() as db:
+        yield db
@@ -1,10 +1,16 @@
-from sqlalchemy import Column, String, Integer, DateTime, Text, ForeignKey, Table, Boolean
-from sqlalchemy.orm import relationship
+from sqlalchemy import Column, String, Integer, BigInteger, DateTime, Text, ForeignKey, Table, Boolean, Sequence, Float, Index, text
+from sqlalchemy.ext.associationproxy import association_proxy
+from sqlalchemy.orm import relationship, validates
 from sqlalchemy.dialects.postgresql import JSONB
 from datetime import datetime
+from urllib.parse import urlparse
 import uuid
 
 from app.models.database import Base
+from app.services.feed_urls import url_key as make_url_key
+
+# Izmaiņu plūsmas secība (Entry.seq)
+ENTRY_SEQ = Sequence("entries_seq_seq", metadata=Base.metadata)
 
 # Asociācijas tabula "daudzi ar daudziem" starp ierakstiem un tagiem
 entry_tag = Table(
@@ -12,6 +18,16 @@ entry_tag = Table(
     Base.metadata,
     Column("entry_id", String, ForeignKey("entries.id"), primary_key=True),
     Column("tag_id", Integer, ForeignKey("tags.id"), primary_key=True),
+    # Primārā atslēga sākas ar entry_id; filtrēšanai pēc taga vajadzīgs indekss ar tag_id sākumā
+    Index("ix_entry_tag_tag_id_entry_id", "tag_id", "entry_id"),
+)
+
+# Barotņu grupu sastāvs (piem. visas sporta barotnes vienam paneļa vaicājumam)
+feed_group_feed = Table(
+    "feed_group_feed",
+    Base.metadata,
+    Column("group_id", Integer, ForeignKey("feed_groups.id", ondelete="CASCADE"), primary_key=True),
+    Column("feed_id", Integer, ForeignKey("rss_feeds.id", ondelete="CASCADE"), primary_key=True, index=True),
 )
 
 
@@ -22,6 +38,9 @@ class RssFeed(Base):
     id = Column(Integer, primary_key=True, index=True)
     name = Column(String(100), nullable=True)
     url = Column(String(255), unique=True, index=True, nullable=False)
+    host = Column(String(255), index=True, nullable=True)  # saimniekdators ķēdes pārtraucējam
+    url_key = Column(Text, unique=True, index=True, nullable=True)  # dublikātu atslēga (sk. app.services.feed_urls)
+    duplicate_of_id = Column(Integer, ForeignKey("rss_feeds.id", ondelete="SET NULL"), nullable=True)
     title = Column(String(255), nullable=True)
     description = Column(Text, nullable=True)
     site_url = Column(String(255), nullable=True)
@@ -30,11 +49,33 @@ class RssFeed(Base):
     active = Column(Boolean, default=True)
     error_count = Column(Integer, default=0)
     last_error = Column(Text, nullable=True)
+    # Augstākā ūdens atzīme: jaunākais redzētais ieraksts un pēdējo ierakstu ID
+    last_seen_id = Column(String(512), nullable=True)
+    last_seen_published = Column(DateTime, nullable=True)
+    recent_ids = Column(JSONB, nullable=True)
+    fetches_since_full_scan = Column(Integer, default=0, server_default="0", nullable=False)
+    # Ķēdes pārtraucējs: atvērtu barotni neievāc līdz circuit_open_until
+    circuit_state = Column(String(10), default="closed", server_default="closed", nullable=False)
+    circuit_open_until = Column(DateTime, nullable=True, index=True)
+    # WebSub: centrmezgls, tēmas URL un abonementa stāvoklis (none, pending, subscribed, leaving)
+    websub_hub = Column(String(512), nullable=True)
+    websub_topic = Column(String(512), nullable=True)
+    websub_secret = Column(String(64), nullable=True)
+    websub_state = Column(String(12), default="none", server_default="none", nullable=False)
+    websub_lease_expires = Column(DateTime, nullable=True, index=True)  # pending stāvoklī - apstiprinājuma termiņš
+    last_pushed = Column(DateTime, nullable=True)
     created_at = Column(DateTime, default=datetime.utcnow)
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
     
     # Relācijas
     entries = relationship("Entry", back_populates="feed", cascade="all, delete-orphan")
+    profiles = relationship("FeedFetchProfile", cascade="all, delete-orphan", passive_deletes=True)
+    
+    @validates("url")
+    def _set_host(self, key, url):
+        self.host = urlparse(url).netloc.lower() if url else None
+        self.url_key = make_url_key(url) if url else None
+        return url
     
     def __repr__(self):
         return f"<RssFeed {self.title} ({self.url})>"
@@ -43,38 +84,128 @@ class RssFeed(Base):
 class Entry(Base):
     """RSS ieraksta modelis"""
     __tablename__ = "entries"
+    __table_args__ = (
+        # Barotnes (vai barotņu kopas, feed_id = ANY(...)) ieraksti jaunākie vispirms
+        Index("ix_entries_feed_id_published", "feed_id", "published"),
+        # Ieraksti, kuriem vēl nav piešķirts secības numurs (sk. assign_change_seq)
+        Index("ix_entries_seq_pending", "created_at", "id", postgresql_where=text("seq IS NULL")),
+    )
     
     id = Column(String, primary_key=True, index=True, default=lambda: str(uuid.uuid4()))
+    # Monotoni augošs secības numurs izmaiņu plūsmai (GET /entries/changes); tiek
+    # piešķirts pēc commit (app.services.change_feed.assign_change_seq), līdz tam NULL
+    seq = Column(BigInteger, unique=True, index=True)
     feed_id = Column(Integer, ForeignKey("rss_feeds.id"), nullable=False)
     title = Column(String(255), nullable=False)
     link = Column(String(512), nullable=False, index=True)
     published = Column(DateTime, nullable=True, index=True)
-    summary = Column(Text, nullable=True)
-    content = Column(Text, nullable=True)
     author = Column(String(255), nullable=True)
     original_id = Column(String(512), nullable=True)
-    entry_metadata = Column(JSONB, nullable=True)  # Papildu dati JSON formātā
     created_at = Column(DateTime, default=datetime.utcnow)
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
     
     # Relācijas
     feed = relationship("RssFeed", back_populates="entries")
     tags = relationship("Tag", secondary=entry_tag, back_populates="entries")
+    # Lielie lauki ir atsevišķā tabulā un tiek ielādēti tikai tad, kad vajadzīgi
+    body = relationship("EntryContent", uselist=False, cascade="all, delete-orphan", passive_deletes=True)
+    
+    # Piekļuve lielajiem laukiem caur body; piešķirot vērtību, body tiek izveidots automātiski
+    summary = association_proxy("body", "summary", creator=lambda value: EntryContent(summary=value))
+    content = association_proxy("body", "content", creator=lambda value: EntryContent(content=value))
+    entry_metadata = association_proxy("body", "entry_metadata", creator=lambda value: EntryContent(entry_metadata=value))
     
     def __repr__(self):
         return f"<Entry {self.title}>"
 
 
+class EntryContent(Base):
+    """Ieraksta apraksts, pilnais saturs un metadati (atdalīti no saraksta kolonnām)"""
+    __tablename__ = "entry_content"
+    
+    entry_id = Column(String, ForeignKey("entries.id", ondelete="CASCADE"), primary_key=True)
+    summary = Column(Text, nullable=True)
+    content = Column(Text, nullable=True)  # PostgreSQL 14+ glabā ar lz4 TOAST kompresiju
+    entry_metadata = Column(JSONB, nullable=True)  # Papildu dati JSON formātā
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    
+    def __repr__(self):
+        return f"<EntryContent {self.entry_id}>"
+
+
 class Tag(Base):
     """Tagu modelis"""
     __tablename__ = "tags"
+    __table_args__ = (
+        # Populārāko tagu saraksts: ORDER BY usage_count DESC, id DESC
+        Index("ix_tags_usage_count_id", "usage_count", "id"),
+    )
     
     id = Column(Integer, primary_key=True, index=True)
     name = Column(String(100), unique=True, index=True, nullable=False)
+    key = Column(String(100), unique=True, index=True, nullable=False)  # normalizēts nosaukums (sk. app.services.tags)
+    usage_count = Column(Integer, nullable=False, default=0, server_default="0")  # ierakstu skaits ar šo tagu
     created_at = Column(DateTime, default=datetime.utcnow)
     
     # Relācijas
     entries = relationship("Entry", secondary=entry_tag, back_populates="tags")
     
+    @validates("name")
+    def _set_key(self, key, name):
+        from app.services.tags import tag_key, tag_name
+        self.key = tag_key(name)
+        return tag_name(name)
+    
+    def __repr__(self):
+        return f"<Tag {self.name}>"
+
+
+class FeedGroup(Base):
+    """Barotņu grupas (kolekcijas) modelis"""
+    __tablename__ = "feed_groups"
+    
+    id = Column(Integer, primary_key=True, index=True)
+    name = Column(String(100), unique=True, index=True, nullable=False)
+    description = Column(Text, nullable=True)
+    created_at = Column(DateTime, default=datetime.utcnow)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    
+    # Relācijas
+    feeds = relationship("RssFeed", secondary=feed_group_feed, passive_deletes=True)
+    
+    def __repr__(self):
+        return f"<FeedGroup {self.name}>"
+
+
+class FeedFetchProfile(Base):
+    """Barotnes ievākšanas posmu laika profils (slīdošais logs katrai barotnei)"""
+    __tablename__ = "feed_fetch_profiles"
+    __table_args__ = (
+        Index("ix_feed_fetch_profiles_feed_id_created_at", "feed_id", "created_at"),
+    )
+    
+    id = Column(BigInteger().with_variant(Integer, "sqlite"), primary_key=True)
+    feed_id = Column(Integer, ForeignKey("rss_feeds.id", ondelete="CASCADE"), nullable=False)
+    created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+    success = Column(Boolean, nullable=False)
+    new_entries = Column(Integer, default=0)
+    total_ms = Column(Float, nullable=False)
+    stages = Column(JSONB, nullable=False)  # posma nosaukums -> milisekundes
+    
+    def __repr__(self):
+        return f"<FeedFetchProfile {self.feed_id} {self.total_ms}ms>"
+
+
+class FeedHost(Base):
+    """Saimniekdatora ķēdes pārtraucēja stāvoklis (kopīgs visām tā barotnēm)"""
+    __tablename__ = "feed_hosts"
+    
+    host = Column(String(255), primary_key=True)
+    circuit_state = Column(String(10), default="closed", nullable=False)
+    failure_count = Column(Integer, default=0, nullable=False)
+    open_until = Column(DateTime, nullable=True)
+    last_error = Column(Text, nullable=True)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    
     def __repr__(self):
-        return f"<Tag {self.name}>"
\ No newline at end of file
+        return f"<FeedHost {self.host} {self.circuit_state}>"
@@ -0,0 +1,53 @@
+import logging
+from pathlib import Path
+from typing import Set
+
+from sqlalchemy import text
+from sqlalchemy.exc import DBAPIError
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+# Konfigurējam žurnalēšanu
+logger = logging.getLogger(__name__)
+
+_ALEMBIC_DIR = Path(__file__).resolve().parents[2] / "alembic"
+
+
+def expected_heads() -> Set[str]:
+    """
+    Alembic head versijas no migrāciju direktorijas (bez datubāzes)
+    """
+    from alembic.script import ScriptDirectory
+    return set(ScriptDirectory(str(_ALEMBIC_DIR)).get_heads())
+
+
+async def current_revisions(engine: AsyncEngine) -> Set[str]:
+    """
+    Datubāzes Alembic versijas ar vienu vaicājumu; tukša kopa, ja migrācijas nav veiktas
+    """
+    try:
+        async with engine.connect() as connection:
+            rows = await connection.execute(text("SELECT version_num FROM alembic_version"))
+            return {row[0] for row in rows}
+    except DBAPIError as e:
+        if "alembic_version" not in str(e):
+            raise
+        return set()
+
+
+async def verify_schema(engine: AsyncEngine, strict: bool = False) -> bool:
+    """
+    Salīdzina datubāzes versiju ar Alembic head. Atšķirība ir sagaidāma izvietošanas
+    laikā (sk. README - migrācija divos soļos), tāpēc pēc noklusējuma tikai brīdina.
+    """
+    heads = expected_heads()
+    revisions = await current_revisions(engine)
+    if revisions == heads:
+        logger.info(f"Datubāzes shēma atbilst Alembic head {', '.join(sorted(heads))}")
+        return True
+    
+    message = (f"Datubāzes Alembic versija {', '.join(sorted(revisions)) or 'nav'} neatbilst "
+               f"head {', '.join(sorted(heads))}; izpildiet 'alembic upgrade head'")
+    if strict:
+        raise RuntimeError(message)
+    logger.warning(message)
+    return False
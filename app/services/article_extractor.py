@@ -0,0 +1,149 @@
+import json
+import logging
+import re
+import threading
+from typing import Dict, List, Optional
+
+import lxml.html
+from lxml import etree
+from lxml.cssselect import CSSSelector
+from readability import Document
+
+from app.config import settings
+
+# Konfigurējam žurnalēšanu
+logger = logging.getLogger(__name__)
+
+# lxml nepieņem teksta (str) dokumentu ar XML kodējuma deklarāciju
+_XML_DECLARATION = re.compile(r"^\s*<\?xml[^>]*\?>")
+
+# Elementi, kas nekad nav raksta teksts
+_UNWANTED_XPATH = etree.XPath(
+    "descendant-or-self::script | descendant-or-self::style | descendant-or-self::iframe"
+    " | descendant-or-self::noscript | descendant-or-self::aside | descendant-or-self::comment()"
+)
+# Reklāmu un sānjoslu bloki pēc klases (apakšvirkne, kā iepriekšējā BeautifulSoup filtrā)
+_UNWANTED_CLASS_XPATH = etree.XPath(
+    "descendant-or-self::*[contains(@class, 'ads') or contains(@class, 'piano') or contains(@class, 'sidebar')]"
+)
+
+
+class ExtractionRule:
+    """
+    Domēna izgūšanas noteikums ar kompilētiem selektoriem. Ja norādīts `content`
+    un tas lapā atrod elementus, readability netiek izmantots.
+    """
+    
+    def __init__(self, content: Optional[str] = None, remove: Optional[List[str]] = None):
+        self.content = _compile(content) if content else None
+        self.remove = [_compile(selector) for selector in remove or []]
+
+
+def _compile(selector: str):
+    """
+    Selektors sākas ar "/" vai "(" - XPath, citādi CSS
+    """
+    if selector.startswith(("/", "(")):
+        return etree.XPath(selector)
+    return CSSSelector(selector, translator="html")
+
+
+class ArticleExtractor:
+    """
+    Raksta teksta izgūšana ar lxml. Ja domēnam ir satura selektors, teksts tiek
+    ņemts tieši no lxml koka un readability netiek izmantots, citādi - no
+    readability rezultāta. Noteikumi tiek kompilēti vienreiz katrā procesā.
+    
+    Noteikumu fails (ARTICLE_RULES_FILE) ir JSON objekts:
+        {"lsm.lv": {"content": "article .article__body", "remove": [".related", "figure"]}}
+    Noteikums attiecas arī uz apakšdomēniem (www.lsm.lv).
+    """
+    
+    def __init__(self, rules: Optional[Dict[str, dict]] = None):
+        self._lock = threading.Lock()
+        self._raw_rules = rules
+        self._rules: Optional[Dict[str, ExtractionRule]] = None
+        self._by_host: Dict[str, Optional[ExtractionRule]] = {}
+    
+    def extract(self, html: str, host: str = "") -> str:
+        """
+        Atgriež raksta tekstu rindkopās, atdalītu ar jaunu rindu.
+        `html` jau ir atkodēts (sk. app.services.charset).
+        """
+        html = _XML_DECLARATION.sub("", html, count=1)
+        rule = self.rule_for(host)
+        
+        nodes = []
+        if rule and rule.content is not None:
+            nodes = rule.content(lxml.html.document_fromstring(html))
+        if not nodes:
+            # readability-lxml pieņem tikai tekstu (ne lxml koku) un rezultātu atgriež kā HTML
+            nodes = [lxml.html.fragment_fromstring(Document(html).summary(html_partial=True), create_parent="div")]
+        
+        lines: List[str] = []
+        for node in nodes:
+            self._clean(node, rule)
+            lines.extend(line.strip() for line in "\n\n".join(node.itertext()).split("\n"))
+        return "\n".join(line for line in lines if line)
+    
+    def rule_for(self, host: str) -> Optional[ExtractionRule]:
+        """
+        Domēna noteikums (keša rezultāts arī tad, ja noteikuma nav)
+        """
+        host = host.lower().split(":")[0]
+        if host in self._by_host:
+            return self._by_host[host]
+        rules = self._load_rules()
+        labels = host.split(".")
+        rule = None
+        for index in range(len(labels)):
+            rule = rules.get(".".join(labels[index:]))
+            if rule is not None:
+                break
+        self._by_host[host] = rule
+        return rule
+    
+    def _clean(self, node, rule: Optional[ExtractionRule]) -> None:
+        selectors = [_UNWANTED_XPATH, _UNWANTED_CLASS_XPATH] + (rule.remove if rule else [])
+        for selector in selectors:
+            for unwanted in selector(node):
+                if unwanted is node or unwanted.getparent() is None:
+                    continue
+                unwanted.drop_tree()
+    
+    def _load_rules(self) -> Dict[str, ExtractionRule]:
+        if self._rules is not None:
+            return self._rules
+        with self._lock:
+            if self._rules is None:
+                raw = self._raw_rules
+                if raw is None:
+                    raw = _read_rules_file(settings.ARTICLE_RULES_FILE)
+                self._rules = _compile_rules(raw)
+        return self._rules
+
+
+def _read_rules_file(path: Optional[str]) -> Dict[str, dict]:
+    if not path:
+        return {}
+    try:
+        with open(path, encoding="utf-8") as rules_file:
+            return json.load(rules_file)
+    except (OSError, ValueError) as e:
+        logger.error(f"Neizdevās nolasīt izgūšanas noteikumus no {path}: {e}")
+        return {}
+
+
+def _compile_rules(raw: Dict[str, dict]) -> Dict[str, ExtractionRule]:
+    rules: Dict[str, ExtractionRule] = {}
+    for domain, spec in raw.items():
+        try:
+            rules[domain.lower()] = ExtractionRule(spec.get("content"), spec.get("remove"))
+        except Exception as e:
+            # Kļūdains selektors atslēdz tikai konkrētā domēna noteikumu
+            logger.error(f"Nederīgs izgūšanas noteikums domēnam {domain}: {e}")
+    return rules
+
+
+# Viens izgūšanas dzinējs katrā darbinieka procesā
+article_extractor = ArticleExtractor()
@@ -0,0 +1,107 @@
+import json
+import logging
+from typing import Dict, Optional
+
+import redis
+from sqlalchemy import func, select, update
+from sqlalchemy.orm import Session
+
+from app.config import settings
+from app.models.models import ENTRY_SEQ, Entry
+
+# Konfigurējam žurnalēšanu
+logger = logging.getLogger(__name__)
+
+_redis_client: Optional[redis.Redis] = None
+
+# pg_advisory_xact_lock atslēga, kas serializē secības numuru piešķiršanu
+CHANGE_SEQ_LOCK_ID = 0x72737365  # "rsse"
+
+# Cik ierakstiem secības numurus piešķir vienā transakcijā
+CHANGE_SEQ_BATCH = 1000
+
+
+def _redis_url() -> str:
+    return settings.CHANGE_FEED_REDIS_URL or settings.CELERY_BROKER_URL
+
+
+def _get_redis() -> redis.Redis:
+    """
+    Atgriež koplietojamu Redis klientu paziņojumu publicēšanai
+    """
+    global _redis_client
+    if _redis_client is None:
+        _redis_client = redis.Redis.from_url(_redis_url())
+    return _redis_client
+
+
+def get_async_redis():
+    """
+    Izveido asinhronu Redis klientu SSE abonentiem
+    """
+    import redis.asyncio as aioredis
+    return aioredis.Redis.from_url(_redis_url())
+
+
+def publish_new_entries(feed_id: int, count: int) -> None:
+    """
+    Paziņo abonentiem, ka barotnei ir saglabāti jauni ieraksti.
+    
+    Paziņojums satur tikai barotnes ID un skaitu - abonenti paši nolasa
+    ierakstus no datubāzes pēc sava kursora, tāpēc pazaudēts paziņojums
+    nenozīmē pazaudētus ierakstus.
+    """
+    try:
+        payload = json.dumps({"feed_id": feed_id, "count": count})
+        _get_redis().publish(settings.CHANGE_FEED_CHANNEL, payload)
+    except Exception as e:
+        # Paziņojuma kļūda nedrīkst ietekmēt ievākšanu
+        logger.warning(f"Neizdevās publicēt izmaiņu paziņojumu barotnei {feed_id}: {e}")
+
+
+def assign_change_seq(db: Session) -> int:
+    """
+    Piešķir secības numurus apstiprinātiem ierakstiem, kuriem to vēl nav.
+    
+    Numurs netiek ņemts INSERT brīdī, jo paralēlas transakcijas tiek apstiprinātas
+    citā secībā, nekā tās saņēmušas numurus, un klients, kura kursors jau pārgājis
+    pāri N+1, nekad neredzētu vēlāk apstiprināto N. Šeit numuri tiek piešķirti pēc
+    commit zem transakcijas advisory lock: nākamā piešķiršana sākas tikai pēc
+    iepriekšējās apstiprināšanas, tāpēc numuri kļūst redzami augošā secībā.
+    Jāizsauc pēc ierakstu commit; atgriež numurēto ierakstu skaitu.
+    """
+    assigned = 0
+    while True:
+        db.execute(select(func.pg_advisory_xact_lock(CHANGE_SEQ_LOCK_ID)))
+        pending = select(Entry.id)\
+            .where(Entry.seq.is_(None))\
+            .order_by(Entry.created_at, Entry.id)\
+            .limit(CHANGE_SEQ_BATCH)\
+            .subquery()
+        numbered = select(pending.c.id, ENTRY_SEQ.next_value().label("seq")).subquery()
+        # updated_at netiek mainīts - numura piešķiršana nav ieraksta izmaiņa
+        numbering = update(Entry)\
+            .where(Entry.id == numbered.c.id)\
+            .values(seq=numbered.c.seq, updated_at=Entry.updated_at)
+        count = db.execute(numbering, execution_options={"synchronize_session": False}).rowcount
+        db.commit()
+        assigned += count
+        if count < CHANGE_SEQ_BATCH:
+            return assigned
+
+
+def publish_changes(db: Session, new_counts: Dict[int, int]) -> None:
+    """
+    Pēc ierakstu commit piešķir secības numurus un paziņo abonentiem. Ja piešķiršana
+    neizdodas, ieraksti tiek numurēti nākamajā izsaukumā (jebkurai barotnei).
+    """
+    if not new_counts:
+        return
+    try:
+        assign_change_seq(db)
+    except Exception as e:
+        db.rollback()
+        logger.warning(f"Neizdevās piešķirt izmaiņu plūsmas secības numurus: {e}")
+        return
+    for feed_id, count in new_counts.items():
+        publish_new_entries(feed_id, count)
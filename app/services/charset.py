@@ -0,0 +1,97 @@
+import codecs
+import logging
+import re
+import threading
+import time
+from typing import Dict, Optional, Tuple
+
+from charset_normalizer import from_bytes
+
+from app.config import settings
+from app.metrics import CHARSET_DETECTION_SECONDS
+
+# Konfigurējam žurnalēšanu
+logger = logging.getLogger(__name__)
+
+_HEADER_CHARSET = re.compile(r"""charset\s*=\s*["']?([\w.:-]+)""", re.IGNORECASE)
+# <meta charset="..."> un <meta http-equiv="Content-Type" content="text/html; charset=...">
+_META_CHARSET = re.compile(rb"""<meta[^>]+charset\s*=\s*["']?([\w.:-]+)""", re.IGNORECASE)
+_XML_ENCODING = re.compile(rb"""^\s*<\?xml[^>]*encoding\s*=\s*["']([\w.:-]+)""", re.IGNORECASE)
+
+_BOMS = (
+    (codecs.BOM_UTF8, "utf-8-sig"),
+    (codecs.BOM_UTF16_LE, "utf-16"),
+    (codecs.BOM_UTF16_BE, "utf-16"),
+)
+
+
+def _normalize(name: Optional[str]) -> Optional[str]:
+    """
+    Kodeka kanoniskais nosaukums vai None, ja Python to nepazīst
+    """
+    if not name:
+        return None
+    try:
+        encoding = codecs.lookup(name.decode("ascii", "ignore") if isinstance(name, bytes) else name).name
+    except LookupError:
+        return None
+    # Pārlūki latin-1 deklarāciju interpretē kā windows-1252
+    return "cp1252" if encoding in ("latin-1", "iso8859-1") else encoding
+
+
+class CharsetDetector:
+    """
+    HTML kodējuma noteikšana no baitiem: HTTP galvene, BOM, <meta charset>
+    pirmajos baitos, domēna kešs un tikai tad statistiskā noteikšana
+    ierobežotam sākuma fragmentam (nevis visai lapai kā response.text).
+    """
+    
+    def __init__(self, max_entries: int = 10000):
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._by_host: Dict[str, str] = {}
+    
+    def detect(self, body: bytes, content_type: Optional[str] = None, host: str = "") -> Tuple[str, str]:
+        """
+        Atgriež (kodējums, avots); avots ir header, bom, meta, cache, detected vai default
+        """
+        start = time.perf_counter()
+        encoding, source = self._detect(body, content_type, host.lower())
+        CHARSET_DETECTION_SECONDS.labels(source).observe(time.perf_counter() - start)
+        return encoding, source
+    
+    def _detect(self, body: bytes, content_type: Optional[str], host: str) -> Tuple[str, str]:
+        match = _HEADER_CHARSET.search(content_type or "")
+        encoding = _normalize(match.group(1)) if match else None
+        if encoding:
+            return encoding, "header"
+        
+        for bom, name in _BOMS:
+            if body.startswith(bom):
+                return name, "bom"
+        
+        head = body[:settings.CHARSET_SNIFF_BYTES]
+        match = _META_CHARSET.search(head) or _XML_ENCODING.search(head)
+        encoding = _normalize(match.group(1)) if match else None
+        if encoding:
+            # Ja deklarāciju var nolasīt kā ASCII, dokuments nav UTF-16
+            return ("utf-8" if encoding.startswith("utf-16") else encoding), "meta"
+        
+        encoding = self._by_host.get(host)
+        if encoding:
+            return encoding, "cache"
+        
+        best = from_bytes(body[:settings.CHARSET_DETECT_BYTES]).best()
+        encoding = _normalize(best.encoding) if best is not None else None
+        if not encoding:
+            return "utf-8", "default"
+        if host:
+            with self._lock:
+                if len(self._by_host) >= self.max_entries:
+                    self._by_host.pop(next(iter(self._by_host)))
+                self._by_host[host] = encoding
+        return encoding, "detected"
+
+
+# Viens detektors procesā - domēnu kešs tiek koplietots starp uzdevumiem
+charset_detector = CharsetDetector()
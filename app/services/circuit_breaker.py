@@ -0,0 +1,102 @@
+import logging
+import random
+import threading
+from datetime import datetime, timedelta
+from typing import Dict, Optional, Set
+from urllib.parse import urlparse
+
+import requests
+
+from app.config import settings
+
+# Konfigurējam žurnalēšanu
+logger = logging.getLogger(__name__)
+
+# Ķēdes stāvokļi. Half-open netiek glabāts atsevišķi: tā ir atvērta ķēde, kuras
+# open_until jau pagājis, un nākamā ievākšana ir pārbaudes mēģinājums.
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+
+class HostCircuitOpen(Exception):
+    """Saimniekdators šajā ievākšanas ciklā jau atzīts par nepieejamu"""
+
+
+def host_of(url: str) -> str:
+    """
+    Saimniekdators (ar portu), pēc kura tiek grupētas barotnes
+    """
+    return urlparse(url).netloc.lower()
+
+
+def circuit_state(state: Optional[str], open_until: Optional[datetime], now: Optional[datetime] = None) -> str:
+    """
+    Faktiskais ķēdes stāvoklis, ņemot vērā laiku
+    """
+    if state != OPEN:
+        return CLOSED
+    now = now or datetime.utcnow()
+    if open_until is not None and open_until <= now:
+        return HALF_OPEN
+    return OPEN
+
+
+def backoff_delay(failures: int) -> timedelta:
+    """
+    Eksponenciāla aizture ar nejaušību (equal jitter): puse aiztures ir fiksēta,
+    otra puse nejauša, lai daudzas barotnes vienlaikus neatgrieztos pie resursdatora.
+    """
+    exponent = max(0, failures - 1)
+    delay = min(settings.CIRCUIT_MAX_DELAY, settings.CIRCUIT_BASE_DELAY * (2 ** min(exponent, 20)))
+    return timedelta(seconds=delay / 2 + random.uniform(0, delay / 2))
+
+
+def is_host_failure(exc: Exception) -> bool:
+    """
+    Kļūdas, kas norāda uz saimniekdatora (nevis konkrētas barotnes) problēmu:
+    DNS/savienojuma kļūdas, noilgumi un 5xx atbildes
+    """
+    if isinstance(exc, (requests.ConnectionError, requests.Timeout)):
+        return True
+    if isinstance(exc, requests.HTTPError) and exc.response is not None:
+        return exc.response.status_code >= 500
+    return False
+
+
+class HostCircuitTracker:
+    """
+    Viena ievākšanas cikla saimniekdatoru uzskaite. Drīkst izmantot no vairākiem
+    pavedieniem: kad saimniekdatoram šajā ciklā ir CIRCUIT_HOST_TRIP_FEEDS
+    saimniekdatora kļūdas un neviena veiksmīga atbilde, pārējās tā barotnes
+    tiek izlaistas bez tīkla pieprasījuma.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.successes: Dict[str, int] = {}
+        self.failures: Dict[str, int] = {}
+        self.last_errors: Dict[str, str] = {}
+        self._tripped: Set[str] = set()
+
+    def check(self, host: str) -> None:
+        if host in self._tripped:
+            raise HostCircuitOpen(f"Saimniekdators {host} šajā ciklā nav pieejams")
+
+    def record_success(self, host: str) -> None:
+        with self._lock:
+            self.successes[host] = self.successes.get(host, 0) + 1
+
+    def record_failure(self, host: str, exc: Exception) -> None:
+        if isinstance(exc, HostCircuitOpen) or not is_host_failure(exc):
+            return
+        with self._lock:
+            self.failures[host] = self.failures.get(host, 0) + 1
+            self.last_errors[host] = str(exc)
+            if not self.successes.get(host) and self.failures[host] >= settings.CIRCUIT_HOST_TRIP_FEEDS:
+                if host not in self._tripped:
+                    logger.warning(f"Saimniekdators {host} nav pieejams, atlikušās tā barotnes šajā ciklā tiek izlaistas")
+                self._tripped.add(host)
+
+    def hosts(self) -> Set[str]:
+        return set(self.successes) | set(self.failures)
@@ -0,0 +1,178 @@
+import logging
+import threading
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from typing import Dict, Optional
+
+from dateutil import parser as dateutil_parser
+
+from app.metrics import DATE_PARSE_TOTAL
+
+# Konfigurējam žurnalēšanu
+logger = logging.getLogger(__name__)
+
+# Barotnēs sastopamie nestandarta formāti, kurus nepārklāj RFC 822 un ISO 8601
+KNOWN_FORMATS = (
+    "%Y-%m-%d %H:%M:%S",
+    "%Y-%m-%d %H:%M:%S%z",
+    "%Y-%m-%d %H:%M:%S %z",
+    "%Y-%m-%d %H:%M",
+    "%Y/%m/%d %H:%M:%S",
+    "%d.%m.%Y %H:%M:%S",
+    "%d.%m.%Y %H:%M",
+    "%d.%m.%Y. %H:%M",
+    "%d.%m.%Y",
+    "%d/%m/%Y %H:%M:%S",
+    "%m/%d/%Y %H:%M:%S",
+    "%m/%d/%Y %I:%M:%S %p",
+    "%d %B %Y %H:%M:%S %z",
+    "%d %b %Y %H:%M %z",
+    "%a, %d %b %Y %H:%M:%S.%f %z",
+    "%A, %d %B %Y %H:%M:%S %z",
+    "%A, %B %d, %Y - %H:%M",
+    "%B %d, %Y %H:%M:%S",
+    "%B %d, %Y",
+    "%Y%m%dT%H%M%SZ",
+)
+
+# Laika joslu saīsinājumi, kurus neatpazīst email.utils (tas tos uzskatītu par UTC)
+TZ_ABBREVIATIONS = {
+    "EET": "+0200",
+    "EEST": "+0300",
+    "CET": "+0100",
+    "CEST": "+0200",
+    "WET": "+0000",
+    "WEST": "+0100",
+    "BST": "+0100",
+    "MSK": "+0300",
+    "IST": "+0530",
+    "AEST": "+1000",
+    "AEDT": "+1100",
+    "Z": "+0000",
+}
+
+# Cik barotņu formātus glabāt atmiņā
+MAX_CACHED_FEEDS = 10000
+
+
+def to_utc(value: datetime) -> datetime:
+    """
+    Pārvērš datumu par naivu UTC datumu (tā tiek glabāts datubāzē).
+    Datums bez laika joslas tiek uzskatīts par UTC.
+    """
+    if value.tzinfo is None:
+        return value
+    return value.astimezone(timezone.utc).replace(tzinfo=None)
+
+
+def _parse_rfc822(value: str) -> Optional[datetime]:
+    # Ātrā pārbaude: RFC 822 datums sākas ar dienas nosaukumu vai dienas numuru, nevis gadu
+    if len(value) < 4 or value[:4].isdigit():
+        return None
+    head, _, zone = value.rpartition(" ")
+    if zone.upper() in TZ_ABBREVIATIONS:
+        value = f"{head} {TZ_ABBREVIATIONS[zone.upper()]}"
+    try:
+        return parsedate_to_datetime(value)
+    except (TypeError, ValueError, IndexError):
+        return None
+
+
+def _parse_iso8601(value: str) -> Optional[datetime]:
+    if len(value) < 10 or not value[:4].isdigit() or value[4] != "-":
+        return None
+    try:
+        return datetime.fromisoformat(value)
+    except ValueError:
+        return None
+
+
+class DateNormalizer:
+    """
+    Barotņu datumu parsētājs. Vispirms tiek mēģināts RFC 822 un ISO 8601, tad
+    barotnei iepriekš veiksmīgais strptime formāts, tad zināmie formāti (veiksmīgais
+    tiek saglabāts barotnei), un tikai pēc tam dateutil. Rezultāts ir naivs UTC datums.
+    """
+    
+    def __init__(self):
+        self._formats: Dict[int, str] = {}
+        self._lock = threading.Lock()
+    
+    def parse(self, value: Optional[str], feed_id: Optional[int] = None) -> Optional[datetime]:
+        if not value:
+            return None
+        value = value.strip()
+        
+        result = _parse_rfc822(value)
+        if result is not None:
+            DATE_PARSE_TOTAL.labels("rfc822").inc()
+            return to_utc(result)
+        
+        result = _parse_iso8601(value)
+        if result is not None:
+            DATE_PARSE_TOTAL.labels("iso8601").inc()
+            return to_utc(result)
+        
+        cached_format = self._formats.get(feed_id) if feed_id is not None else None
+        if cached_format:
+            try:
+                result = datetime.strptime(value, cached_format)
+                DATE_PARSE_TOTAL.labels("cached_format").inc()
+                return to_utc(result)
+            except ValueError:
+                # Barotne mainījusi formātu
+                self._forget(feed_id)
+        
+        for date_format in KNOWN_FORMATS:
+            if date_format == cached_format:
+                continue
+            try:
+                result = datetime.strptime(value, date_format)
+            except ValueError:
+                continue
+            self._remember(feed_id, date_format)
+            DATE_PARSE_TOTAL.labels("known_format").inc()
+            return to_utc(result)
+        
+        try:
+            result = dateutil_parser.parse(value)
+        except (ValueError, OverflowError) as e:
+            DATE_PARSE_TOTAL.labels("failed").inc()
+            logger.warning(f"Neizdevās parsēt datumu '{value}': {e}")
+            return None
+        DATE_PARSE_TOTAL.labels("dateutil").inc()
+        return to_utc(result)
+    
+    def entry_date(self, entry, feed_id: Optional[int] = None) -> Optional[datetime]:
+        """
+        Ieraksta publicēšanas datums naivā UTC laikā. feedparser published_parsed
+        jau ir UTC; pārējiem ierakstiem rezultāts tiek saglabāts published_parsed,
+        lai tas pats ieraksts netiktu parsēts atkārtoti.
+        """
+        published_parsed = entry.get('published_parsed')
+        if published_parsed:
+            try:
+                return datetime(*published_parsed[0:6])
+            except (TypeError, ValueError):
+                pass
+        
+        result = self.parse(entry.get('published') or entry.get('updated'), feed_id)
+        if result is not None:
+            entry['published_parsed'] = result.timetuple()
+        return result
+    
+    def _remember(self, feed_id: Optional[int], date_format: str) -> None:
+        if feed_id is None:
+            return
+        with self._lock:
+            if len(self._formats) >= MAX_CACHED_FEEDS:
+                self._formats.clear()
+            self._formats[feed_id] = date_format
+    
+    def _forget(self, feed_id: int) -> None:
+        with self._lock:
+            self._formats.pop(feed_id, None)
+
+
+# Viena instance procesā, lai apgūtie formāti saglabātos starp ievākšanas cikliem
+date_normalizer = DateNormalizer()
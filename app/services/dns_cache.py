@@ -0,0 +1,214 @@
+import ipaddress
+import logging
+import os
+import socket
+import threading
+import time
+from typing import Callable, Dict, List, Optional, Tuple
+
+from app.config import settings
+from app.metrics import DNS_CACHE_LOOKUPS, DNS_RESOLVE_SECONDS
+
+try:
+    import dns.exception
+    import dns.resolver
+except ImportError:  # dnspython nav obligāts - bez tā TTL tiek aizstāts ar DNS_CACHE_DEFAULT_TTL
+    dns = None
+
+# Konfigurējam žurnalēšanu
+logger = logging.getLogger(__name__)
+
+# Adrese: (adrešu saime, IP)
+Address = Tuple[int, str]
+# Atrisinātājs atgriež adreses un to derīguma laiku sekundēs
+Resolver = Callable[[str], Tuple[List[Address], float]]
+
+
+def system_resolver(host: str) -> Tuple[List[Address], float]:
+    """
+    Sistēmas atrisinātājs (ievēro /etc/hosts), TTL nav zināms
+    """
+    infos = socket.getaddrinfo(host, None, type=socket.SOCK_STREAM)
+    addresses: List[Address] = []
+    for family, _, _, _, sockaddr in infos:
+        address = (family, sockaddr[0])
+        if address not in addresses:
+            addresses.append(address)
+    return addresses, settings.DNS_CACHE_DEFAULT_TTL
+
+
+class HostsFile:
+    """
+    hosts faila ieraksti; fails tiek pārlasīts, ja mainījies tā mtime
+    """
+    
+    def __init__(self, path: Optional[str] = None):
+        self.path = path or settings.DNS_HOSTS_FILE
+        self._lock = threading.Lock()
+        self._mtime: Optional[float] = None
+        self._hosts: Dict[str, List[Address]] = {}
+    
+    def lookup(self, host: str) -> List[Address]:
+        try:
+            mtime = os.stat(self.path).st_mtime
+        except OSError:
+            return []
+        with self._lock:
+            if mtime != self._mtime:
+                self._hosts = self._parse()
+                self._mtime = mtime
+            return list(self._hosts.get(host.lower().rstrip("."), []))
+    
+    def _parse(self) -> Dict[str, List[Address]]:
+        hosts: Dict[str, List[Address]] = {}
+        try:
+            with open(self.path, encoding="utf-8", errors="replace") as f:
+                for line in f:
+                    fields = line.split("#", 1)[0].split()
+                    address = _ip_literal(fields[0]) if fields else None
+                    if address is None:
+                        continue
+                    for name in fields[1:]:
+                        addresses = hosts.setdefault(name.lower().rstrip("."), [])
+                        if address not in addresses:
+                            addresses.append(address)
+        except OSError as e:
+            logger.warning(f"Neizdevās nolasīt {self.path}: {e}")
+        return hosts
+
+
+hosts_file = HostsFile()
+
+
+def dnspython_resolver(host: str) -> Tuple[List[Address], float]:
+    """
+    DNS vaicājums ar dnspython, kas atgriež arī ieraksta TTL. Vispirms tiek
+    pārbaudīts hosts fails. Īsi vārdi tiek meklēti resolv.conf search domēnos
+    (ievērojot ndots), kā to dara getaddrinfo - piem. Kubernetes "svc.namespace";
+    NXDOMAIN visiem variantiem ir galīga atbilde. Sistēmas atrisinātājs
+    tiek izmantots tikai tad, ja DNS nav sasniedzams vai adrešu ierakstu nav
+    (piem. vārdi no citiem NSS avotiem).
+    """
+    addresses = hosts_file.lookup(host)
+    if addresses:
+        return addresses, settings.DNS_CACHE_DEFAULT_TTL
+    
+    ttls: List[float] = []
+    for record_type, family in (("A", socket.AF_INET), ("AAAA", socket.AF_INET6)):
+        try:
+            answer = dns.resolver.resolve(host, record_type, lifetime=settings.DNS_CACHE_RESOLVE_TIMEOUT,
+                                          search=True)
+        except dns.resolver.NXDOMAIN as e:
+            # Vārds neeksistē nevienam ieraksta tipam
+            raise socket.gaierror(socket.EAI_NONAME, f"Vārds {host} neeksistē") from e
+        except (dns.resolver.NoAnswer, dns.resolver.NoNameservers):
+            continue
+        except dns.exception.Timeout:
+            break
+        ttls.append(answer.rrset.ttl)
+        addresses.extend((family, record.address) for record in answer)
+    if not addresses:
+        return system_resolver(host)
+    return addresses, min(ttls)
+
+
+def default_resolver() -> Resolver:
+    return dnspython_resolver if dns is not None else system_resolver
+
+
+class DnsCache:
+    """
+    Procesa DNS kešs ar TTL un negatīvo kešošanu. Vienlaicīgi pieprasījumi uz
+    vienu un to pašu vārdu gaida vienu atrisināšanu (single-flight).
+    Atrisinātāju var aizstāt, piem. ar lokālu testa atrisinātāju.
+    """
+    
+    def __init__(self, resolver: Optional[Resolver] = None, max_entries: int = 10000):
+        self.resolver = resolver or default_resolver()
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        # vārds -> (beigu laiks, adreses vai None, kļūda)
+        self._entries: Dict[str, Tuple[float, Optional[List[Address]], Optional[socket.gaierror]]] = {}
+        self._inflight: Dict[str, threading.Lock] = {}
+    
+    def resolve(self, host: str) -> List[Address]:
+        """
+        Atgriež vārda IP adreses; neatrisināmam vārdam izmet socket.gaierror
+        """
+        host = host.lower().rstrip(".")
+        literal = _ip_literal(host)
+        if literal is not None:
+            return [literal]
+        
+        cached = self._lookup(host)
+        if cached is not None:
+            return cached
+        
+        # Tikai viens pavediens atrisina konkrēto vārdu, pārējie izmanto tā rezultātu
+        with self._lock:
+            host_lock = self._inflight.setdefault(host, threading.Lock())
+        with host_lock:
+            cached = self._lookup(host)
+            if cached is not None:
+                return cached
+            try:
+                return self._resolve(host)
+            finally:
+                with self._lock:
+                    self._inflight.pop(host, None)
+    
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+    
+    def _lookup(self, host: str) -> Optional[List[Address]]:
+        entry = self._entries.get(host)
+        if entry is None or entry[0] <= time.monotonic():
+            return None
+        _, addresses, error = entry
+        if error is not None:
+            DNS_CACHE_LOOKUPS.labels("negative_hit").inc()
+            raise socket.gaierror(*error.args)
+        DNS_CACHE_LOOKUPS.labels("hit").inc()
+        return addresses
+    
+    def _resolve(self, host: str) -> List[Address]:
+        DNS_CACHE_LOOKUPS.labels("miss").inc()
+        start = time.perf_counter()
+        try:
+            addresses, ttl = self.resolver(host)
+            if not addresses:
+                raise socket.gaierror(socket.EAI_NONAME, f"Vārdam {host} nav adrešu")
+        except socket.gaierror as e:
+            self._store(host, settings.DNS_CACHE_NEGATIVE_TTL, None, e)
+            raise
+        finally:
+            DNS_RESOLVE_SECONDS.observe(time.perf_counter() - start)
+        
+        ttl = min(max(ttl, settings.DNS_CACHE_MIN_TTL), settings.DNS_CACHE_MAX_TTL)
+        self._store(host, ttl, addresses, None)
+        return addresses
+    
+    def _store(self, host: str, ttl: float, addresses: Optional[List[Address]],
+               error: Optional[socket.gaierror]) -> None:
+        now = time.monotonic()
+        with self._lock:
+            if len(self._entries) >= self.max_entries:
+                # Vispirms izmetam novecojušos ierakstus, tad vecākos
+                self._entries = {key: value for key, value in self._entries.items() if value[0] > now}
+                while len(self._entries) >= self.max_entries:
+                    self._entries.pop(next(iter(self._entries)))
+            self._entries[host] = (now + ttl, addresses, error)
+
+
+def _ip_literal(host: str) -> Optional[Address]:
+    try:
+        address = ipaddress.ip_address(host.strip("[]"))
+    except ValueError:
+        return None
+    family = socket.AF_INET6 if address.version == 6 else socket.AF_INET
+    return family, str(address)
+
+
+# Viens kešs procesā - to izmanto visas app.services.http_client sesijas
+dns_cache = DnsCache()
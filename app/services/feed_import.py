@@ -0,0 +1,166 @@
+import logging
+from datetime import datetime
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from pydantic import HttpUrl, TypeAdapter, ValidationError
+from sqlalchemy import select
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.orm import Session
+
+from app.config import settings
+from app.models.models import RssFeed
+from app.services.circuit_breaker import host_of
+from app.services.feed_urls import canonicalize_url, url_key
+from app.tasks.dispatch import send_task
+
+# Konfigurējam žurnalēšanu
+logger = logging.getLogger(__name__)
+
+_URL_ADAPTER = TypeAdapter(HttpUrl)
+_URL_MAX_LENGTH = RssFeed.__table__.c.url.type.length
+_NAME_MAX_LENGTH = RssFeed.__table__.c.name.type.length
+# Rindas vienā INSERT (PostgreSQL pieļauj līdz 65535 parametriem vaicājumā)
+_INSERT_CHUNK = 5000
+
+# (url, nosaukums)
+FeedItem = Tuple[str, Optional[str]]
+
+
+class OpmlError(ValueError):
+    """OPML dokumentu nevar nolasīt"""
+
+
+def parse_opml(document: bytes) -> List[FeedItem]:
+    """
+    Atgriež visu OPML outline elementu ar xmlUrl barotnes (arī ligzdotās kategorijās)
+    """
+    from lxml import etree
+    parser = etree.XMLParser(resolve_entities=False, no_network=True, remove_comments=True)
+    try:
+        root = etree.fromstring(document, parser)
+    except etree.XMLSyntaxError as e:
+        raise OpmlError(f"Nederīgs OPML: {e}") from e
+    if root.tag != "opml":
+        raise OpmlError("Dokuments nav OPML")
+    return [
+        (outline.get("xmlUrl").strip(), outline.get("title") or outline.get("text"))
+        for outline in root.iter("outline")
+        if outline.get("xmlUrl")
+    ]
+
+
+def render_opml(feeds: Iterable, title: str) -> bytes:
+    """
+    Barotņu saraksts OPML 2.0 formātā (barotnes vai rindas ar url, name, title, site_url)
+    """
+    from lxml import etree
+    root = etree.Element("opml", version="2.0")
+    head = etree.SubElement(root, "head")
+    etree.SubElement(head, "title").text = title
+    etree.SubElement(head, "dateCreated").text = datetime.utcnow().strftime("%a, %d %b %Y %H:%M:%S GMT")
+    body = etree.SubElement(root, "body")
+    for feed in feeds:
+        name = feed.name or feed.title or feed.url
+        outline = etree.SubElement(body, "outline", type="rss", text=name, title=name, xmlUrl=feed.url)
+        if feed.site_url:
+            outline.set("htmlUrl", feed.site_url)
+    return etree.tostring(root, xml_declaration=True, encoding="utf-8", pretty_print=True)
+
+
+def validate_feed_items(items: Iterable[FeedItem]) -> Tuple[Dict[str, Optional[str]], List[Dict[str, str]]]:
+    """
+    Pārbauda un normalizē URL. Atgriež unikālos kanoniskos URL (ar nosaukumu)
+    pievienošanas secībā un nederīgo URL sarakstu ar kļūdu. Adreses ar vienādu
+    url_key (piem. http/https, ar vai bez "/" beigās) tiek uzskatītas par vienu.
+    """
+    valid: Dict[str, Optional[str]] = {}
+    invalid: List[Dict[str, str]] = []
+    keys = set()
+    for url, name in items:
+        try:
+            normalized = canonicalize_url(str(_URL_ADAPTER.validate_python(url)))
+        except ValidationError as e:
+            invalid.append({"url": url, "error": e.errors()[0]["msg"]})
+            continue
+        if len(normalized) > _URL_MAX_LENGTH:
+            invalid.append({"url": url, "error": f"URL garāks par {_URL_MAX_LENGTH} simboliem"})
+            continue
+        key = url_key(normalized)
+        if key not in keys:
+            keys.add(key)
+            valid[normalized] = name[:_NAME_MAX_LENGTH] if name else None
+    return valid, invalid
+
+
+def import_feeds(db: Session, items: Iterable[FeedItem], active: bool = True, fetch: bool = True) -> Dict[str, Any]:
+    """
+    Pievieno barotnes masveidā: esošie URL tiek atrasti ar vienu vaicājumu, jaunās
+    barotnes ievietotas ar vienu INSERT (katrām _INSERT_CHUNK rindām), un pirmā
+    ievākšana tiek ieplānota porcijās ar laika nobīdi, nevis visas uzreiz.
+    """
+    valid, invalid = validate_feed_items(items)
+    
+    existing = set()
+    if valid:
+        keys = {url_key(url): url for url in valid}
+        existing_keys = db.execute(select(RssFeed.url_key).where(RssFeed.url_key.in_(list(keys)))).scalars()
+        existing = {keys[key] for key in existing_keys}
+    
+    now = datetime.utcnow()
+    rows = [
+        {
+            "url": url,
+            "name": name,
+            "host": host_of(url),
+            "url_key": url_key(url),
+            "active": active,
+            "error_count": 0,
+            "created_at": now,
+            "updated_at": now,
+        }
+        for url, name in valid.items()
+        if url not in existing
+    ]
+    
+    feed_ids: List[int] = []
+    for offset in range(0, len(rows), _INSERT_CHUNK):
+        # Paralēls pieprasījums var pievienot to pašu barotni (arī ar citu URL formu,
+        # piem. http/https) starp SELECT un INSERT - dublikātus nosaka unikālais url_key
+        statement = insert(RssFeed).values(rows[offset:offset + _INSERT_CHUNK])\
+            .on_conflict_do_nothing(index_elements=[RssFeed.url_key])\
+            .returning(RssFeed.id)
+        feed_ids.extend(db.execute(statement).scalars())
+    db.commit()
+    
+    # Rindas, kuras INSERT izlaida konflikta dēļ, arī ir jau esošas barotnes
+    conflicts = len(rows) - len(feed_ids)
+    tasks = schedule_initial_fetch(feed_ids) if fetch and active else 0
+    logger.info(f"Masveida imports: {len(feed_ids)} jaunas barotnes, {len(existing) + conflicts} jau eksistē "
+                f"(no tām {conflicts} pievienotas paralēli), {len(invalid)} nederīgas, {tasks} ievākšanas uzdevumi")
+    return {
+        "created": len(feed_ids),
+        "existing": len(existing) + conflicts,
+        "invalid": invalid,
+        "feed_ids": feed_ids,
+        "fetch_tasks": tasks,
+    }
+
+
+def schedule_initial_fetch(feed_ids: List[int]) -> int:
+    """
+    Izsauc jauno barotņu pirmo ievākšanu porcijās pa FEEDS_BULK_FETCH_CHUNK
+    barotnēm; katra nākamā porcija sākas FEEDS_BULK_FETCH_STAGGER sekundes vēlāk
+    """
+    chunk_size = max(1, settings.FEEDS_BULK_FETCH_CHUNK)
+    tasks = 0
+    for index, offset in enumerate(range(0, len(feed_ids), chunk_size)):
+        try:
+            send_task(
+                'collect_rss_feed_batch',
+                feed_ids[offset:offset + chunk_size],
+                countdown=index * settings.FEEDS_BULK_FETCH_STAGGER,
+            )
+            tasks += 1
+        except Exception as e:
+            logger.error(f"Neizdevās ieplānot barotņu porcijas ievākšanu: {str(e)}")
+    return tasks
@@ -0,0 +1,293 @@
+import time
+import logging
+from typing import Callable, Iterable, Iterator, List, Optional
+
+import feedparser
+from feedparser import FeedParserDict
+from lxml import etree
+
+# Konfigurējam žurnalēšanu
+logger = logging.getLogger(__name__)
+
+ATOM_NS = "http://www.w3.org/2005/Atom"
+RSS1_NS = "http://purl.org/rss/1.0/"
+CONTENT_NS = "http://purl.org/rss/1.0/modules/content/"
+DC_NS = "http://purl.org/dc/elements/1.1/"
+MEDIA_NS = "http://search.yahoo.com/mrss/"
+XML_LANG = "{http://www.w3.org/XML/1998/namespace}lang"
+
+ITEM_TAGS = {"item", f"{{{RSS1_NS}}}item", f"{{{ATOM_NS}}}entry"}
+CHANNEL_TAGS = {"channel", f"{{{RSS1_NS}}}channel", f"{{{ATOM_NS}}}feed"}
+
+
+class FeedTooLarge(Exception):
+    """Barotnes atbilde pārsniedz atļauto izmēru"""
+
+
+class FeedDeadlineExceeded(Exception):
+    """Barotnes lejupielāde nepabeidzās atļautajā kopējā laikā"""
+
+
+class ParsedFeed:
+    """
+    Parsētas barotnes rezultāts ar tādu pašu saskarni, kādu izmanto kolektors
+    no feedparser rezultāta (feed, entries, bozo, bozo_exception).
+    """
+
+    def __init__(self, feed, entries, bozo: bool = False, bozo_exception: Optional[Exception] = None,
+                 truncated: bool = False, permanent_url: Optional[str] = None):
+        self.feed = feed
+        self.entries = entries
+        self.bozo = bozo
+        self.bozo_exception = bozo_exception
+        self.truncated = truncated  # parsēšana apturēta agrāk (jau zināmi ieraksti)
+        self.permanent_url = permanent_url  # galīgā adrese pēc 301/308 novirzīšanām
+
+
+def iter_limited(chunks: Iterable[bytes], max_bytes: int, deadline: float) -> Iterator[bytes]:
+    """
+    Nodod tālāk lejupielādes porcijas, kamēr nav pārsniegts izmērs vai kopējais laiks.
+    `deadline` ir time.monotonic() vērtība.
+    """
+    received = 0
+    for chunk in chunks:
+        if not chunk:
+            continue
+        received += len(chunk)
+        if received > max_bytes:
+            raise FeedTooLarge(f"Atbilde pārsniedz {max_bytes} baitus")
+        if time.monotonic() > deadline:
+            raise FeedDeadlineExceeded("Lejupielāde pārsniedza kopējo laika limitu")
+        yield chunk
+
+
+def _localname(elem) -> str:
+    return etree.QName(elem).localname
+
+
+def _namespace(elem) -> Optional[str]:
+    return etree.QName(elem).namespace
+
+
+def _text(elem) -> str:
+    return (elem.text or "").strip()
+
+
+def _inner_xml(elem) -> str:
+    parts = [elem.text or ""]
+    for child in elem:
+        parts.append(etree.tostring(child, encoding="unicode", with_tail=True))
+    return "".join(parts).strip()
+
+
+def _atom_text(elem) -> str:
+    if elem.get("type") == "xhtml":
+        return _inner_xml(elem)
+    return _text(elem)
+
+
+def _atom_content_type(elem) -> str:
+    content_type = elem.get("type", "text")
+    return {"html": "text/html", "xhtml": "application/xhtml+xml", "text": "text/plain"}.get(content_type, content_type)
+
+
+def _convert_item(elem) -> FeedParserDict:
+    """
+    Pārveido RSS <item> vai Atom <entry> elementu feedparser ieraksta formā
+    """
+    entry = FeedParserDict()
+    tags = []
+    # feedparser ieraksta 'enclosures' tiek atvasināti no 'links' ar rel="enclosure"
+    links = []
+    media = []
+
+    for child in elem:
+        if not isinstance(child.tag, str):
+            continue  # komentāri un apstrādes instrukcijas
+        name = _localname(child)
+        ns = _namespace(child)
+
+        if ns == ATOM_NS:
+            if name == "id":
+                entry["id"] = _text(child)
+            elif name == "title":
+                entry["title"] = _atom_text(child)
+            elif name == "link":
+                rel = child.get("rel", "alternate")
+                if rel == "alternate" and "link" not in entry:
+                    entry["link"] = child.get("href", "")
+                links.append(FeedParserDict(
+                    rel=rel, href=child.get("href", ""), type=child.get("type", ""), length=child.get("length", "")
+                ))
+            elif name in ("published", "updated"):
+                entry[name] = _text(child)
+            elif name == "summary":
+                entry["summary"] = _atom_text(child)
+                entry["summary_detail"] = FeedParserDict(value=entry["summary"], type=_atom_content_type(child))
+            elif name == "content":
+                entry["content"] = [FeedParserDict(value=_atom_text(child), type=_atom_content_type(child))]
+            elif name == "author":
+                author_name = child.find(f"{{{ATOM_NS}}}name")
+                if author_name is not None:
+                    entry["author"] = _text(author_name)
+            elif name == "category" and child.get("term"):
+                tags.append(FeedParserDict(term=child.get("term"), scheme=child.get("scheme"), label=child.get("label")))
+        elif ns == CONTENT_NS and name == "encoded":
+            entry["content"] = [FeedParserDict(value=child.text or "", type="text/html")]
+        elif ns == DC_NS:
+            if name == "creator" and "author" not in entry:
+                entry["author"] = _text(child)
+            elif name == "date":
+                entry.setdefault("published", _text(child))
+                entry["updated"] = _text(child)
+            elif name == "subject" and _text(child):
+                tags.append(FeedParserDict(term=_text(child), scheme=None, label=None))
+        elif ns == MEDIA_NS and name == "content":
+            media.append(dict(child.attrib))
+        elif ns in (None, RSS1_NS):
+            if name == "title":
+                entry["title"] = _text(child)
+            elif name == "link":
+                entry["link"] = _text(child)
+            elif name == "guid":
+                entry["id"] = _text(child)
+                entry["guidislink"] = child.get("isPermaLink", "true").lower() != "false"
+            elif name == "pubDate":
+                entry["published"] = _text(child)
+            elif name == "description":
+                entry["summary"] = (child.text or "").strip()
+                entry["summary_detail"] = FeedParserDict(value=entry["summary"], type="text/html")
+            elif name == "author":
+                entry["author"] = _text(child)
+            elif name == "category" and _text(child):
+                tags.append(FeedParserDict(term=_text(child), scheme=child.get("domain"), label=None))
+            elif name == "comments":
+                entry["comments"] = _text(child)
+            elif name == "enclosure":
+                links.append(FeedParserDict(
+                    rel="enclosure", href=child.get("url", ""), type=child.get("type", ""), length=child.get("length", "")
+                ))
+
+    # RSS 1.0 ierakstam identifikators ir rdf:about atribūts
+    if "id" not in entry:
+        about = elem.get("{http://www.w3.org/1999/02/22-rdf-syntax-ns#}about")
+        if about:
+            entry["id"] = about
+
+    if tags:
+        entry["tags"] = tags
+    if links:
+        entry["links"] = links
+    if media:
+        entry["media_content"] = media
+
+    # published_parsed netiek aizpildīts šeit - datumus parsē app.services.dates
+    return entry
+
+
+class StreamingFeedParser:
+    """
+    Inkrementāls RSS 2.0 / RSS 1.0 / Atom parsētājs. Baiti tiek padoti porcijās,
+    un katrs pabeigtais ieraksts tiek atgriezts uzreiz, bet tā elements
+    tiek izdzēsts no koka, lai atmiņa nepieaugtu līdz ar barotnes izmēru.
+    """
+
+    def __init__(self):
+        self.feed = FeedParserDict()
+        self._parser = etree.XMLPullParser(
+            events=("end",),
+            resolve_entities=False,
+            no_network=True,
+            huge_tree=False,
+        )
+
+    def feed_bytes(self, data: bytes) -> List[FeedParserDict]:
+        self._parser.feed(data)
+        return self._drain()
+
+    def close(self) -> List[FeedParserDict]:
+        self._parser.close()
+        return self._drain()
+
+    def _drain(self) -> List[FeedParserDict]:
+        items = []
+        for _, elem in self._parser.read_events():
+            if not isinstance(elem.tag, str):
+                continue
+            if elem.tag in ITEM_TAGS:
+                items.append(_convert_item(elem))
+                self._discard(elem)
+            elif elem.tag in CHANNEL_TAGS:
+                if elem.get(XML_LANG) and "language" not in self.feed:
+                    self.feed["language"] = elem.get(XML_LANG)
+            else:
+                parent = elem.getparent()
+                if parent is not None and parent.tag in CHANNEL_TAGS:
+                    self._channel_field(elem)
+        return items
+
+    def _channel_field(self, elem) -> None:
+        name = _localname(elem)
+        if _namespace(elem) == ATOM_NS:
+            if name == "title":
+                self.feed["title"] = _atom_text(elem)
+            elif name == "subtitle":
+                self.feed["subtitle"] = _atom_text(elem)
+            elif name == "link":
+                rel = elem.get("rel", "alternate")
+                if rel == "alternate":
+                    self.feed.setdefault("link", elem.get("href", ""))
+                # rel="hub" un rel="self" vajadzīgi WebSub abonēšanai
+                self.feed.setdefault("links", []).append(FeedParserDict(
+                    rel=rel, href=elem.get("href", ""), type=elem.get("type", "")
+                ))
+        elif name in ("title", "link", "language"):
+            self.feed[name] = _text(elem)
+        elif name == "description":
+            # feedparser atslēga 'description' norāda uz 'subtitle'
+            self.feed["subtitle"] = _text(elem)
+
+    @staticmethod
+    def _discard(elem) -> None:
+        elem.clear()
+        parent = elem.getparent()
+        if parent is not None:
+            parent.remove(elem)
+
+
+def parse_feed_stream(chunks: Iterable[bytes],
+                      stop: Optional[Callable[[FeedParserDict], bool]] = None,
+                      refetch: Optional[Callable[[], Iterable[bytes]]] = None) -> ParsedFeed:
+    """
+    Parsē barotni no baitu porcijām. Ja `stop` atgriež True, parsēšana un
+    lejupielāde tiek pārtraukta (atlikušie ieraksti netiek lasīti).
+
+    Porcijas netiek uzkrātas - atmiņā ir tikai inkrementālā parsētāja stāvoklis.
+    Ja XML nav korekts (piem. HTML entītijas RSS aprakstos), barotne no sākuma
+    tiek iegūta ar `refetch` un parsēta ar feedparser; bez `refetch` tiek
+    atgriezti līdz kļūdai nolasītie ieraksti ar bozo pazīmi.
+    """
+    parser = StreamingFeedParser()
+    entries: List[FeedParserDict] = []
+
+    try:
+        for chunk in chunks:
+            for item in parser.feed_bytes(chunk):
+                entries.append(item)
+                if stop is not None and stop(item):
+                    return ParsedFeed(parser.feed, entries, truncated=True)
+        entries.extend(parser.close())
+        return ParsedFeed(parser.feed, entries)
+    except etree.XMLSyntaxError as e:
+        if refetch is None:
+            return ParsedFeed(parser.feed, entries, bozo=True, bozo_exception=e)
+        # feedparser nelasa straumi - viss dokuments atmiņā ir tikai šajā retajā gadījumā
+        parsed = feedparser.parse(b"".join(refetch()))
+        fallback_entries = []
+        truncated = False
+        for item in parsed.entries:
+            fallback_entries.append(item)
+            if stop is not None and stop(item):
+                truncated = True
+                break
+        return ParsedFeed(parsed.feed, fallback_entries, bozo=True, bozo_exception=e, truncated=truncated)
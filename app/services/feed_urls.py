@@ -0,0 +1,61 @@
+import re
+from typing import Optional
+from urllib.parse import urlsplit, urlunsplit
+
+import requests
+
+_DEFAULT_PORTS = {"http": 80, "https": 443}
+# Izsekošanas parametri neietekmē barotnes saturu
+_TRACKING_PARAM = re.compile(r"^(utm_\w+|fbclid|gclid|mc_cid|mc_eid)$", re.IGNORECASE)
+# Pastāvīgas novirzīšanas: saglabātā adrese jāaizstāj ar jauno
+PERMANENT_REDIRECTS = {301, 308}
+
+
+def canonicalize_url(url: str) -> str:
+    """
+    Barotnes URL kanoniskā forma: shēma un saimniekdators mazajiem burtiem,
+    bez noklusētā porta, fragmenta un izsekošanas parametriem, tukšs ceļš - "/"
+    """
+    parts = urlsplit(url.strip())
+    scheme = parts.scheme.lower()
+    host = (parts.hostname or "").rstrip(".")
+    netloc = f"[{host}]" if ":" in host else host
+    if parts.port and _DEFAULT_PORTS.get(scheme) != parts.port:
+        netloc = f"{netloc}:{parts.port}"
+    if parts.username:
+        userinfo = parts.username + (f":{parts.password}" if parts.password else "")
+        netloc = f"{userinfo}@{netloc}"
+    query = "&".join(
+        pair for pair in parts.query.split("&")
+        if pair and not _TRACKING_PARAM.match(pair.split("=", 1)[0])
+    )
+    return urlunsplit((scheme, netloc, parts.path or "/", query, ""))
+
+
+def url_key(url: str) -> str:
+    """
+    Dublikātu atslēga: kanoniskais URL bez shēmas, "www." un beigu slīpsvītras.
+    http:// un https:// vai ar "/" beigās un bez tās adreses uzskatām par vienu barotni.
+    Ceļš un parametri ir reģistrjutīgi (piem. YouTube ?channel_id=UC...), tāpēc
+    mazajiem burtiem ir tikai saimniekdators; atslēga netiek saīsināta.
+    """
+    parts = urlsplit(canonicalize_url(url))
+    host = parts.netloc.lower()
+    if host.startswith("www."):
+        host = host[4:]
+    key = host + parts.path.rstrip("/")
+    if parts.query:
+        key = f"{key}?{parts.query}"
+    return key
+
+
+def permanent_redirect_target(response: requests.Response) -> Optional[str]:
+    """
+    Galīgais URL, ja visas novirzīšanas bija pastāvīgas (301/308); pagaidu
+    novirzīšana ķēdē nozīmē, ka saglabātā adrese jāpatur
+    """
+    if not response.history:
+        return None
+    if any(hop.status_code not in PERMANENT_REDIRECTS for hop in response.history):
+        return None
+    return canonicalize_url(response.url)
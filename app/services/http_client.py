@@ -0,0 +1,156 @@
+import socket
+import threading
+import time
+from http.cookiejar import DefaultCookiePolicy
+from typing import List, Optional
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.connection import HTTPConnection, HTTPSConnection
+from urllib3.connectionpool import HTTPConnectionPool, HTTPSConnectionPool
+from urllib3.exceptions import ConnectTimeoutError, NameResolutionError, NewConnectionError
+from urllib3.util.request import ACCEPT_ENCODING
+from urllib3.util.timeout import _DEFAULT_TIMEOUT
+
+from app.config import settings
+from app.metrics import HTTP_RESPONSE_BYTES
+from app.services.dns_cache import dns_cache
+
+# Pārlūka User-Agent, ko izmanto rakstu lejupielādei
+BROWSER_USER_AGENT = (
+    'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 '
+    '(KHTML, like Gecko) Chrome/58.0.3029.110 Safari/537.3'
+)
+
+_local = threading.local()
+
+
+def attempt_timeouts(count: int, timeout: Optional[float], attempt_timeout: float) -> List[Optional[float]]:
+    """
+    Savienojuma noilgums katrai adresei: visām, izņemot pēdējo, īss
+    HTTP_CONNECT_ATTEMPT_TIMEOUT, lai viena nestrādājoša adrese (piem. AAAA bez
+    IPv6 maršruta) nepatērētu visu savienojuma noilgumu. Pēdējai adresei tiek
+    atstāts pārējais laiks (kopā ne vairāk kā timeout).
+    """
+    if count <= 1:
+        return [timeout] * count
+    if timeout is None:
+        return [attempt_timeout] * (count - 1) + [None]
+    short = min(attempt_timeout, timeout / count)
+    return [short] * (count - 1) + [timeout - short * (count - 1)]
+
+
+class _CachedDnsConnectionMixin:
+    """
+    Aizstāj urllib3 savienojuma izveidi: adreses tiek ņemtas no procesa DNS keša,
+    nevis katrā savienojumā no sistēmas atrisinātāja. TLS SNI un Host galvene
+    joprojām izmanto sākotnējo vārdu.
+    """
+    
+    def _new_conn(self) -> socket.socket:
+        try:
+            addresses = dns_cache.resolve(self._dns_host)
+        except socket.gaierror as e:
+            raise NameResolutionError(self.host, self, e) from e
+        
+        timeout = socket.getdefaulttimeout() if self.timeout is _DEFAULT_TIMEOUT else self.timeout
+        timeouts = attempt_timeouts(len(addresses), timeout, settings.HTTP_CONNECT_ATTEMPT_TIMEOUT)
+        last_error = None
+        for (family, ip), attempt_timeout in zip(addresses, timeouts):
+            sock = None
+            started = time.monotonic()
+            try:
+                sock = socket.socket(family, socket.SOCK_STREAM)
+                for option in self.socket_options or ():
+                    sock.setsockopt(*option)
+                sock.settimeout(attempt_timeout)
+                if self.source_address:
+                    sock.bind(self.source_address)
+                sock.connect((ip, self.port))
+                # Pēc savienojuma urllib3 lasīšanai iestata savu noilgumu
+                sock.settimeout(timeout)
+                return sock
+            except socket.timeout as e:
+                if sock is not None:
+                    sock.close()
+                last_error = ConnectTimeoutError(
+                    self, f"Connection to {self.host} ({ip}) timed out. "
+                          f"(connect timeout={attempt_timeout}, waited {time.monotonic() - started:.1f}s)"
+                )
+                last_error.__cause__ = e
+            except OSError as e:
+                if sock is not None:
+                    sock.close()
+                last_error = NewConnectionError(self, f"Failed to establish a new connection: {e}")
+                last_error.__cause__ = e
+        raise last_error
+
+
+class CachedDnsHTTPConnection(_CachedDnsConnectionMixin, HTTPConnection):
+    pass
+
+
+class CachedDnsHTTPSConnection(_CachedDnsConnectionMixin, HTTPSConnection):
+    pass
+
+
+class CachedDnsHTTPConnectionPool(HTTPConnectionPool):
+    ConnectionCls = CachedDnsHTTPConnection
+
+
+class CachedDnsHTTPSConnectionPool(HTTPSConnectionPool):
+    ConnectionCls = CachedDnsHTTPSConnection
+
+
+class CachedDnsAdapter(HTTPAdapter):
+    """requests adapteris, kura savienojumi izmanto DNS kešu"""
+    
+    def init_poolmanager(self, *args, **kwargs):
+        super().init_poolmanager(*args, **kwargs)
+        self.poolmanager.pool_classes_by_scheme = {
+            "http": CachedDnsHTTPConnectionPool,
+            "https": CachedDnsHTTPSConnectionPool,
+        }
+
+
+def create_session() -> requests.Session:
+    """
+    Jauna sesija ar DNS kešu. Sīkdatnes netiek saglabātas, lai pieprasījumi
+    uzvestos tāpat kā atsevišķi requests.get izsaukumi.
+    
+    Accept-Encoding satur visus urllib3 pieejamos atspiešanas veidus: gzip, deflate,
+    kā arī br (brotli pakotne) un zstd (zstandard pakotne), ja tās ir instalētas.
+    """
+    session = requests.Session()
+    session.headers["Accept-Encoding"] = ACCEPT_ENCODING
+    session.cookies.set_policy(DefaultCookiePolicy(allowed_domains=[]))
+    adapter = CachedDnsAdapter()
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    return session
+
+
+def get_session() -> requests.Session:
+    """
+    Pavediena sesija: requests.Session nav droša koplietošanai starp pavedieniem,
+    bet katrs pavediens atkārtoti izmanto savus savienojumus un kopīgo DNS kešu
+    """
+    session = getattr(_local, "session", None)
+    if session is None:
+        session = create_session()
+        _local.session = session
+    return session
+
+
+def record_response_bytes(response: requests.Response, source: str, decoded_bytes: int) -> None:
+    """
+    Uzskaita saņemtos (saspiestos) un atspiestos atbildes baitus. urllib3 tell()
+    atgriež no savienojuma nolasīto baitu skaitu pirms atspiešanas.
+    """
+    encoding = response.headers.get("Content-Encoding", "identity").lower() or "identity"
+    try:
+        wire_bytes = response.raw.tell()
+    except (AttributeError, OSError):
+        wire_bytes = decoded_bytes
+    HTTP_RESPONSE_BYTES.labels(source, "wire", encoding).inc(wire_bytes)
+    HTTP_RESPONSE_BYTES.labels(source, "decoded", encoding).inc(decoded_bytes)
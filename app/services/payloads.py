@@ -0,0 +1,52 @@
+import logging
+import uuid
+from typing import Optional
+
+import redis
+
+from app.config import settings
+
+# Konfigurējam žurnalēšanu
+logger = logging.getLogger(__name__)
+
+_KEY_PREFIX = "rss:payload:"
+
+_redis_client: Optional[redis.Redis] = None
+
+
+def _get_redis() -> redis.Redis:
+    """
+    Atgriež koplietojamu Redis klientu uzdevumu datiem
+    """
+    global _redis_client
+    if _redis_client is None:
+        _redis_client = redis.Redis.from_url(settings.PAYLOAD_REDIS_URL or settings.CELERY_BROKER_URL)
+    return _redis_client
+
+
+def store_payload(data: bytes, ttl: Optional[int] = None) -> str:
+    """
+    Saglabā uzdevuma datus (piem. WebSub piegādes ķermeni) Redis ar PAYLOAD_TTL
+    derīgumu un atgriež atslēgu. Uzdevumam tiek nodota tikai atslēga, lai lieli
+    dati neatrastos brokera rindā.
+    """
+    key = uuid.uuid4().hex
+    _get_redis().set(_KEY_PREFIX + key, data, ex=ttl or settings.PAYLOAD_TTL)
+    return key
+
+
+def load_payload(key: str) -> Optional[bytes]:
+    """
+    Nolasa datus; None, ja tie ir novecojuši vai jau dzēsti
+    """
+    return _get_redis().get(_KEY_PREFIX + key)
+
+
+def delete_payload(key: str) -> None:
+    """
+    Dzēš apstrādātos datus; kļūda netiek izmesta - dati tāpat novecos
+    """
+    try:
+        _get_redis().delete(_KEY_PREFIX + key)
+    except redis.RedisError as e:
+        logger.warning(f"Neizdevās dzēst uzdevuma datus {key}: {e}")
@@ -0,0 +1,45 @@
+import time
+from contextlib import contextmanager
+from typing import Dict, Iterable, List
+
+
+class StageTimer:
+    """
+    Uzkrāj vienas barotnes ievākšanas posmu ilgumus (DNS/savienojums, lejupielāde,
+    parsēšana, tīrīšana, dublikātu pārbaude, tagi, saglabāšana).
+    """
+
+    def __init__(self):
+        self.stages: Dict[str, float] = {}
+
+    @contextmanager
+    def stage(self, name: str):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add(name, time.perf_counter() - start)
+
+    def add(self, name: str, seconds: float) -> None:
+        self.stages[name] = self.stages.get(name, 0.0) + seconds
+
+    @property
+    def total(self) -> float:
+        # Kopējais darba laiks ir posmu summa - bez gaidīšanas pavedienu rindā
+        return sum(self.stages.values())
+
+    def stages_ms(self) -> Dict[str, float]:
+        return {name: round(seconds * 1000, 3) for name, seconds in self.stages.items()}
+
+
+def percentile(values: Iterable[float], pct: float) -> float:
+    """
+    Lineāri interpolēta procentile (tāpat kā PostgreSQL percentile_cont)
+    """
+    ordered: List[float] = sorted(values)
+    if not ordered:
+        return 0.0
+    position = (len(ordered) - 1) * pct
+    lower = int(position)
+    upper = min(lower + 1, len(ordered) - 1)
+    return ordered[lower] + (ordered[upper] - ordered[lower]) * (position - lower)
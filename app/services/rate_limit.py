@@ -0,0 +1,80 @@
+import logging
+from typing import Optional
+
+import redis
+
+from app.config import settings
+from app.metrics import CONTENT_RATE_LIMIT_TOTAL
+
+# Konfigurējam žurnalēšanu
+logger = logging.getLogger(__name__)
+
+# Žetonu spainis vienā atomārā solī. Laiks tiek ņemts no Redis servera, lai
+# darbinieku pulksteņu atšķirības neietekmētu limitu. Ja žetona nav, tas netiek
+# patērēts, un skripts atgriež sekundes līdz nākamajam žetonam (kā tekstu, jo
+# Lua skaitļi atbildē tiek noapaļoti līdz veselam skaitlim).
+_TOKEN_BUCKET_SCRIPT = """
+local rate = tonumber(ARGV[1])
+local burst = tonumber(ARGV[2])
+local time = redis.call('TIME')
+local now = tonumber(time[1]) + tonumber(time[2]) / 1000000
+local state = redis.call('HMGET', KEYS[1], 'tokens', 'ts')
+local tokens = tonumber(state[1]) or burst
+local ts = tonumber(state[2]) or now
+tokens = math.min(burst, tokens + math.max(0, now - ts) * rate)
+local wait = 0
+if tokens >= 1 then
+    tokens = tokens - 1
+else
+    wait = (1 - tokens) / rate
+end
+redis.call('HSET', KEYS[1], 'tokens', tokens, 'ts', now)
+redis.call('EXPIRE', KEYS[1], math.ceil(burst / rate) + 1)
+return tostring(wait)
+"""
+
+
+class DomainRateLimiter:
+    """
+    Pieprasījumu ātruma ierobežojums katram domēnam, kopīgs visiem Celery
+    darbiniekiem. Spaiņa stāvoklis glabājas Redis; ja Redis nav pieejams,
+    pieprasījums tiek atļauts.
+    """
+    
+    def __init__(self, client: Optional[redis.Redis] = None, rate: Optional[float] = None,
+                 burst: Optional[int] = None, prefix: str = "rss:ratelimit:"):
+        self._client = client
+        self.rate = settings.CONTENT_RATE_PER_DOMAIN if rate is None else rate
+        self.burst = settings.CONTENT_RATE_BURST if burst is None else burst
+        self.prefix = prefix
+        self._script = None
+    
+    def acquire(self, domain: str) -> float:
+        """
+        Paņem žetonu domēnam. Atgriež 0, ja pieprasījumu drīkst veikt uzreiz,
+        citādi sekundes, pēc kurām mēģināt vēlreiz.
+        """
+        if self.rate <= 0 or not domain:
+            return 0.0
+        try:
+            wait = float(self._get_script()(keys=[self.prefix + domain], args=[self.rate, max(1, self.burst)]))
+        except redis.RedisError as e:
+            CONTENT_RATE_LIMIT_TOTAL.labels("error").inc()
+            logger.warning(f"Ātruma ierobežojums domēnam {domain} nav pieejams: {e}")
+            return 0.0
+        CONTENT_RATE_LIMIT_TOTAL.labels("throttled" if wait > 0 else "allowed").inc()
+        return wait
+    
+    def _get_script(self):
+        if self._script is None:
+            if self._client is None:
+                url = settings.CONTENT_RATE_LIMIT_REDIS_URL or settings.CELERY_BROKER_URL
+                # Pavedienu pūlā uzdevumu laika limiti nedarbojas, tāpēc Redis nedrīkst gaidīt bezgalīgi
+                timeout = settings.CONTENT_RATE_LIMIT_REDIS_TIMEOUT
+                self._client = redis.Redis.from_url(url, socket_timeout=timeout, socket_connect_timeout=timeout)
+            self._script = self._client.register_script(_TOKEN_BUCKET_SCRIPT)
+        return self._script
+
+
+# Viens ierobežotājs procesā
+domain_rate_limiter = DomainRateLimiter()
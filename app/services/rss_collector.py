@@ -1,24 +1,111 @@
-import feedparser
-import requests
 import datetime
 from celery import current_app
 import logging
-from typing import Dict, Any
+from typing import Callable, Dict, Any, List, NamedTuple, Optional, Set
+from sqlalchemy import delete, func, insert, select, update, or_
+from sqlalchemy.exc import SQLAlchemyError
 from sqlalchemy.orm import Session
-import pytz
 from bs4 import BeautifulSoup
+from feedparser import FeedParserDict
 import concurrent.futures
-from datetime import datetime
+from datetime import datetime, timedelta
+import time
 import traceback
-from dateutil import parser
 
-from app.models.models import RssFeed, Entry, Tag
+from app.models.models import RssFeed, Entry, FeedFetchProfile, FeedHost
 from app.config import settings
+from app.metrics import (
+    CONTENT_TASKS_DISPATCHED,
+    DEDUP_QUERY_SECONDS,
+    ENTRIES_DUPLICATE,
+    ENTRIES_INSERTED,
+    FEED_BYTES_DOWNLOADED,
+    FEED_FETCH_ERRORS,
+    FEED_FETCH_SECONDS,
+    FEEDS_STALE,
+    FEED_PARSE_SECONDS,
+    FEED_REDIRECTS,
+)
+from app.services.change_feed import publish_changes
+from app.services.circuit_breaker import (
+    CLOSED,
+    HALF_OPEN,
+    OPEN,
+    HostCircuitOpen,
+    HostCircuitTracker,
+    backoff_delay,
+    circuit_state,
+    host_of,
+)
+from app.services.dates import date_normalizer
+from app.services.feed_stream import FeedTooLarge, ParsedFeed, iter_limited, parse_feed_stream
+from app.services.feed_urls import permanent_redirect_target, url_key as make_url_key
+from app.services.http_client import get_session, record_response_bytes
+from app.services.profiling import StageTimer
+from app.services.tags import entry_tag_names, link_tags, resolve_tags
+from app.services import websub
 
 # Konfigurējam žurnalēšanu
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Lejupielādes porcijas izmērs baitos
+FEED_CHUNK_SIZE = 64 * 1024
+
+# Pilnā raksta uzdevumu prioritāte pēc ieraksta vecuma: jaunākie raksti tiek
+# apstrādāti pirmie. Redis brokerī 0 ir augstākā prioritāte (sk. celeryconfig).
+CONTENT_PRIORITY_STEPS = (
+    (timedelta(hours=1), 0),
+    (timedelta(hours=6), 3),
+    (timedelta(days=1), 6),
+)
+CONTENT_PRIORITY_LOWEST = 9
+
+# Barotņu statusa kolonnas, kuru pārāk garas vērtības tiek saīsinātas; pārējās (URL)
+# saīsināta vērtība būtu nederīga, tāpēc tā netiek saglabāta
+STATUS_TRUNCATE_COLUMNS = {"title", "language", "circuit_state"}
+
+
+class StoredEntry(NamedTuple):
+    """Jauns saglabāts ieraksts un dati pilnā satura uzdevumam"""
+    id: str
+    published: datetime
+    has_full_content: bool
+
+
+def fit_feed_status(row: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Pielāgo statusa rindas virknes rss_feeds kolonnu garumam, lai viena barotne ar
+    pārāk garu nosaukumu vai adresi neizjauktu visas porcijas bulk UPDATE
+    """
+    columns = RssFeed.__table__.c
+    fitted = dict(row)
+    for key, value in row.items():
+        length = getattr(columns[key].type, "length", None) if key in columns else None
+        if not isinstance(value, str) or not length or len(value) <= length:
+            continue
+        if key in STATUS_TRUNCATE_COLUMNS or not columns[key].nullable:
+            fitted[key] = value[:length]
+        else:
+            fitted[key] = None
+    return fitted
+
+
+def content_task_priority(published: datetime, now: Optional[datetime] = None) -> int:
+    """
+    Celery prioritāte pilnā raksta uzdevumam
+    """
+    age = (now or datetime.utcnow()) - published
+    priority = CONTENT_PRIORITY_LOWEST
+    for limit, step in CONTENT_PRIORITY_STEPS:
+        if age <= limit:
+            priority = step
+            break
+    # RabbitMQ prioritātes ir apgrieztas - lielāks skaitlis ir svarīgāks
+    if settings.CELERY_BROKER_URL.startswith(("amqp", "pyamqp")):
+        return CONTENT_PRIORITY_LOWEST - priority
+    return priority
+
 
 class RssCollector:
     """
@@ -28,48 +115,105 @@ class RssCollector:
     def __init__(self, db: Session):
         self.db = db
         self.timeout = settings.RSS_REQUEST_TIMEOUT
+        # URL atslēgas, uz kurām šajā kolektorā jau pārceltas barotnes (vēl nav commit)
+        self._redirected_keys: Dict[str, int] = {}
     
     def fetch_all_feeds(self) -> Dict[str, int]:
         """
         Ievāc datus no visām aktīvajām RSS barotnēm
         """
-        # Iegūstam visas aktīvās barotnes
-        active_feeds = self.db.query(RssFeed).filter(RssFeed.active == True).all()
+        return self.collect_batch()
+    
+    def collect_batch(self, feeds: Optional[List[RssFeed]] = None) -> Dict[str, int]:
+        """
+        Ievāc datus no barotņu kopas, izmantojot vienu sesiju.
         
-        # Saglabājam barotņu ID, lai vēlāk varētu izveidot jaunas sesijas katrai pavedieniem
-        feed_ids = [feed.id for feed in active_feeds]
+        Barotņu stāvoklis tiek ielādēts ar vienu vaicājumu, tīkla pieprasījumi
+        notiek paralēli pavedienos (bez datubāzes piekļuves), bet rezultāti tiek
+        saglabāti šajā sesijā. Katra barotne tiek apstrādāta savā savepoint, lai
+        vienas barotnes kļūda neatceltu pārējās, un barotņu statuss tiek ierakstīts
+        ar vienu bulk UPDATE katrai saglabāšanas porcijai.
         
-        logger.info(f"Sākam ievākt datus no {len(active_feeds)} aktīvajām RSS barotnēm")
+        Barotnes un saimniekdatori ar atvērtu ķēdi netiek ievākti; ja saimniekdators
+        cikla laikā izrādās nepieejams, pārējās tā barotnes tiek izlaistas.
+        """
+        if feeds is None:
+            feeds = self._due_feeds()
+        
+        logger.info(f"Sākam ievākt datus no {len(feeds)} aktīvajām RSS barotnēm")
         
         # Rezultātu statistika
         results = {
             "success": 0,
             "error": 0,
+            "skipped": 0,
             "new_entries": 0
         }
+        tracker = HostCircuitTracker()
         
-        # Izmantojam konkurējošo izpildi, bet ar atsevišķu sesiju katrai pavedieniem
-        with concurrent.futures.ThreadPoolExecutor(max_workers=settings.RSS_CONCURRENT_REQUESTS) as executor:
-            future_to_feed_id = {
-                executor.submit(self._fetch_feed_with_new_session, feed_id): feed_id
-                for feed_id in feed_ids
-            }
+        # Barotņu objekti tiek ielādēti vienreiz; starpposma commit tos nedrīkst
+        # novecot, citādi katra nākamā barotne izraisītu atsevišķu SELECT
+        expire_on_commit = self.db.expire_on_commit
+        self.db.expire_on_commit = False
+        try:
+            status_updates: List[Dict[str, Any]] = []
+            profile_rows: List[Dict[str, Any]] = []
+            new_entries: List[StoredEntry] = []
+            new_counts: Dict[int, int] = {}
+            timers = {feed.id: StageTimer() for feed in feeds}
+            # Apturēšanas nosacījumi tiek sagatavoti šeit, jo pavedieni nepiekļūst datubāzei
+            stops = {feed.id: self._known_items_stop(feed) for feed in feeds}
             
-            for future in concurrent.futures.as_completed(future_to_feed_id):
-                feed_id = future_to_feed_id[future]
-                try:
-                    success, entry_count = future.result()
-                    if success:
+            with concurrent.futures.ThreadPoolExecutor(max_workers=settings.RSS_CONCURRENT_REQUESTS) as executor:
+                future_to_feed = {
+                    executor.submit(self._download_with_circuit, tracker, feed, timers[feed.id], stops[feed.id]): feed
+                    for feed in feeds
+                }
+                
+                for future in concurrent.futures.as_completed(future_to_feed):
+                    feed = future_to_feed[future]
+                    timer = timers.pop(feed.id)
+                    try:
+                        parsed_feed = future.result()
+                        savepoint = self.db.begin_nested()
+                        try:
+                            stored = self._store_entries(feed, parsed_feed.entries, timer)
+                            with timer.stage("commit"):
+                                savepoint.commit()
+                        except Exception:
+                            savepoint.rollback()
+                            raise
+                        
+                        status = self._success_status(feed, parsed_feed)
+                        status.update(self._high_water_status(feed, parsed_feed.entries, stops[feed.id] is None))
+                        status.update(self._redirect_status(feed, parsed_feed.permanent_url))
+                        status_updates.append(status)
+                        profile_rows.append(self._profile_row(feed.id, timer, True, len(stored)))
+                        new_entries.extend(stored)
+                        if stored:
+                            new_counts[feed.id] = len(stored)
                         results["success"] += 1
-                        results["new_entries"] += entry_count
-                    else:
+                        results["new_entries"] += len(stored)
+                    except HostCircuitOpen:
+                        # Tīkla pieprasījums netika veikts - barotnes stāvoklis nemainās
+                        results["skipped"] += 1
+                    except Exception as exc:
+                        logger.error(f"Kļūda apstrādājot barotni {feed.url}: {exc}")
+                        status_updates.append(self._error_status(feed, str(exc)))
+                        profile_rows.append(self._profile_row(feed.id, timer, False, 0))
                         results["error"] += 1
-                except Exception as exc:
-                    logger.error(f"Barotnes ar ID {feed_id} apstrāde izraisīja izņēmumu: {exc}")
-                    results["error"] += 1
+                    
+                    if len(status_updates) >= settings.RSS_BATCH_COMMIT_SIZE:
+                        self._commit_batch(status_updates, profile_rows, new_entries, new_counts)
+            
+            self._update_host_circuits(tracker)
+            self._commit_batch(status_updates, profile_rows, new_entries, new_counts)
+        finally:
+            self.db.expire_on_commit = expire_on_commit
         
         logger.info(f"RSS ievākšana pabeigta. Veiksmīgi: {results['success']}, "
-                f"Kļūdas: {results['error']}, Jauni ieraksti: {results['new_entries']}")
+                f"Kļūdas: {results['error']}, Izlaistas: {results['skipped']}, "
+                f"Jauni ieraksti: {results['new_entries']}")
         
         return results
     
@@ -78,126 +222,54 @@ class RssCollector:
         Ievāc datus no vienas RSS barotnes un saglabā tos datubāzē
         """
         logger.info(f"Ievācam datus no: {feed.url}")
-        new_entries_count = 0
+        timer = StageTimer()
+        tracker = HostCircuitTracker()
         
         try:
-            # Mēģinam iegūt RSS barotni
-            response = requests.get(feed.url, timeout=self.timeout, verify=True)
-            response.raise_for_status()  # Pārbauda, vai atbilde ir veiksmīga
-            
-            # Parsējam RSS
-            parsed_feed = feedparser.parse(response.content)
-            
-            if parsed_feed.bozo and hasattr(parsed_feed, 'bozo_exception'):
-                # Brīdinājums par parsēšanas kļūdām
-                logger.warning(f"RSS barotnē {feed.url} ir kļūdas: {parsed_feed.bozo_exception}")
+            stop = self._known_items_stop(feed)
+            parsed_feed = self._download_with_circuit(tracker, feed, timer, stop)
             
             # Atjaunojam barotnes metadatus
             if hasattr(parsed_feed, 'feed'):
-                feed.title = parsed_feed.feed.get('title', feed.title)
-                feed.description = parsed_feed.feed.get('description', feed.description)
-                feed.site_url = parsed_feed.feed.get('link', feed.site_url)
-                feed.language = parsed_feed.feed.get('language', feed.language)
+                hub, topic = websub.discover_hub(parsed_feed.feed)
+                for key, value in fit_feed_status({
+                    "title": parsed_feed.feed.get('title', feed.title),
+                    "description": parsed_feed.feed.get('description', feed.description),
+                    "site_url": parsed_feed.feed.get('link', feed.site_url),
+                    "language": parsed_feed.feed.get('language', feed.language),
+                    "websub_hub": hub,
+                    "websub_topic": topic,
+                }).items():
+                    setattr(feed, key, value)
             
-            # Apstrādājam ierakstus
-            for entry in parsed_feed.entries:
-                # Pārbaudām, vai ieraksts jau eksistē datubāzē
-                original_id = entry.get('id', entry.get('link', ''))
-                existing_entry = self.db.query(Entry).filter(
-                    (Entry.original_id == original_id) | (Entry.link == entry.get('link', ''))
-                ).first()
-                
-                if existing_entry:
-                    continue  # Izlaižam ierakstus, kas jau eksistē
-                
-                # Apstrādājam publicēšanas datumu
-                published = entry.get('published', entry.get('updated', None))
-                published_date = None
-                
-                if published:
-                    try:
-                        if hasattr(entry, 'published_parsed') and entry.published_parsed:
-                            # Izmantojam parsēto datumu, ja tāds ir
-                            date_tuple = entry.published_parsed[0:6]
-                            published_date = datetime(*date_tuple)
-                        else:
-                            # Manuāli mēģinām parsēt datumu
-                            
-                            published_date = parser.parse(published)
-                    except Exception as e:
-                        logger.warning(f"Neizdevās parsēt datumu '{published}': {e}")
-                        published_date = datetime.utcnow()
-                else:
-                    published_date = datetime.utcnow()
-                
-                # Iegūstam saturu
-                content = ''
-                if 'content' in entry and entry.content:
-                    content = entry.content[0].get('value', '')
-                elif 'summary_detail' in entry and entry.summary_detail:
-                    content = entry.summary_detail.get('value', '')
-                elif 'summary' in entry:
-                    content = entry.get('summary', '')
-                
-                # Iztīram HTML
-                soup = BeautifulSoup(content, 'lxml')
-                clean_content = soup.get_text(separator=' ', strip=True)
-                
-                soup = BeautifulSoup(entry.get('summary', ''), 'lxml')
-                clean_summary = soup.get_text(separator=' ', strip=True)
-                
-                # Izveidojam jaunu ierakstu
-                new_entry = Entry(
-                    feed_id=feed.id,
-                    title=entry.get('title', ''),
-                    link=entry.get('link', ''),
-                    published=published_date,
-                    summary=clean_summary,
-                    content=clean_content,
-                    author=entry.get('author', ''),
-                    original_id=original_id,
-                    metadata=self._prepare_metadata(entry)
-                )
-                
-                # Svarīgi - vispirms pievienojam ierakstu sesijai un saglabājam
-                self.db.add(new_entry)
-                self.db.flush()  # Ģenerējam ID un saglabājam ierakstu datubāzē
-
-                # Tikai pēc tam apstrādājam tagus
-                if 'tags' in entry and entry.tags:
-                    for tag_item in entry.tags:
-                        tag_name = tag_item.get('term', '')
-                        if tag_name:
-                            # Pārbaudām, vai tags jau eksistē
-                            tag = self.db.query(Tag).filter(Tag.name == tag_name).first()
-                            if not tag:
-                                tag = Tag(name=tag_name)
-                                self.db.add(tag)
-                                self.db.flush()  # Iegūstam tag ID
-                            
-                            # Pārbaudām, vai šis tags jau ir pievienots ierakstam
-                            if tag not in new_entry.tags:
-                                new_entry.tags.append(tag)
-
-                try:
-                    current_app.send_task('fetch_full_article_content', args=[new_entry.id])
-                    logger.info(f"Izsaukts pilnā raksta iegūšanas uzdevums: {new_entry.id}")
-                except Exception as e:
-                    logger.error(f"Neizdevās izsaukt pilnā raksta iegūšanu: {str(e)}")
-                # Papildu flush, lai saglabātu attiecības
-                self.db.flush()
-                new_entries_count += 1
+            new_entries = self._store_entries(feed, parsed_feed.entries, timer)
             
             # Atjaunojam barotnes statusu
             feed.last_fetched = datetime.utcnow()
             feed.error_count = 0
             feed.last_error = None
+            feed.circuit_state = CLOSED
+            feed.circuit_open_until = None
+            for key, value in self._high_water_status(feed, parsed_feed.entries, stop is None).items():
+                setattr(feed, key, value)
+            for key, value in self._redirect_status(feed, parsed_feed.permanent_url).items():
+                setattr(feed, key, value)
             
             # Saglabājam izmaiņas
+            with timer.stage("commit"):
+                self.db.flush()
+            self._save_profiles([self._profile_row(feed.id, timer, True, len(new_entries))])
+            self._update_host_circuits(tracker)
             self.db.commit()
-            logger.info(f"Barotnei {feed.url} pievienoti {new_entries_count} jauni ieraksti")
-            return True, new_entries_count
+            logger.info(f"Barotnei {feed.url} pievienoti {len(new_entries)} jauni ieraksti")
             
+            # Uzdevumus un paziņojumus sūtām tikai pēc veiksmīgas saglabāšanas
+            self._dispatch_content_tasks(new_entries)
+            publish_changes(self.db, {feed.id: len(new_entries)} if new_entries else {})
+            if feed.websub_hub and feed.websub_state == websub.NONE and websub.enabled():
+                self._dispatch_websub_subscribe(feed.id)
+            return True, len(new_entries)
+        
         except Exception as e:
             # Apstrādājam kļūdas
             self.db.rollback()
@@ -206,18 +278,585 @@ class RssCollector:
             logger.error(f"Kļūda apstrādājot barotni {feed.url}: {error_msg}\n{trace}")
             
             # Atjaunojam barotnes kļūdu statusu
-            feed.error_count += 1
-            feed.last_error = error_msg
-            feed.last_fetched = datetime.utcnow()
-            
-            # Ja sasniegts maksimālais kļūdu skaits, deaktivizējam barotni
-            if feed.error_count >= 5:  # Pēc 5 secīgām kļūdām deaktivizējam
-                logger.warning(f"Barotne {feed.url} deaktivizēta pēc {feed.error_count} secīgām kļūdām")
-                feed.active = False
+            status = self._error_status(feed, error_msg)
+            feed.error_count = status["error_count"]
+            feed.last_error = status["last_error"]
+            feed.last_fetched = status["last_fetched"]
+            feed.circuit_state = status["circuit_state"]
+            feed.circuit_open_until = status["circuit_open_until"]
             
+            self._save_profiles([self._profile_row(feed.id, timer, False, 0)])
+            self._update_host_circuits(tracker)
             self.db.commit()
             return False, 0
     
+    def record_stale_feeds(self) -> None:
+        """
+        Atjauno rss_feeds_stale: aktīvo barotņu skaits, kas nav ievāktas
+        RSS_STALE_AFTER sekundes, sadalīts pēc ķēdes stāvokļa
+        """
+        threshold = datetime.utcnow() - timedelta(seconds=settings.RSS_STALE_AFTER)
+        counts = dict(self.db.execute(
+            select(RssFeed.circuit_state, func.count())
+            .where(
+                RssFeed.active == True,
+                RssFeed.duplicate_of_id.is_(None),
+                or_(RssFeed.last_fetched.is_(None), RssFeed.last_fetched < threshold),
+            )
+            .group_by(RssFeed.circuit_state)
+        ).all())
+        for state in (CLOSED, HALF_OPEN, OPEN):
+            FEEDS_STALE.labels(state).set(counts.get(state, 0))
+    
+    def _due_feeds(self) -> List[RssFeed]:
+        """
+        Aktīvās barotnes, kuru ķēde nav atvērta. No saimniekdatora, kura ķēde ir
+        half-open, tiek ņemta tikai viena barotne kā pārbaudes mēģinājums.
+        Barotnes ar derīgu WebSub abonementu tiek ievāktas tikai retāk.
+        """
+        now = datetime.utcnow()
+        feeds = self.db.query(RssFeed).filter(
+            RssFeed.active == True,
+            or_(RssFeed.circuit_open_until == None, RssFeed.circuit_open_until <= now),
+            # WebSub abonētās barotnes tiek ievāktas tikai reizi WEBSUB_FALLBACK_POLL
+            or_(
+                RssFeed.websub_state != websub.SUBSCRIBED,
+                RssFeed.websub_lease_expires == None,
+                RssFeed.websub_lease_expires <= now,
+                RssFeed.last_fetched == None,
+                RssFeed.last_fetched <= now - timedelta(seconds=settings.WEBSUB_FALLBACK_POLL),
+            )
+        ).all()
+        
+        open_hosts = {
+            row.host: circuit_state(row.circuit_state, row.open_until, now)
+            for row in self.db.query(FeedHost).filter(FeedHost.circuit_state == OPEN).all()
+        }
+        if not open_hosts:
+            return feeds
+        
+        due = []
+        probed = set()
+        for feed in feeds:
+            host = feed.host or host_of(feed.url)
+            state = open_hosts.get(host, CLOSED)
+            if state == OPEN or (state == HALF_OPEN and host in probed):
+                continue
+            if state == HALF_OPEN:
+                probed.add(host)
+            due.append(feed)
+        
+        logger.info(f"Izlaistas {len(feeds) - len(due)} barotnes ar atvērtu saimniekdatora ķēdi")
+        return due
+    
+    def _download_with_circuit(self, tracker: HostCircuitTracker, feed: RssFeed, timer: StageTimer,
+                               stop: Optional[Callable[[Dict[str, Any]], bool]] = None) -> ParsedFeed:
+        """
+        Lejupielādē barotni, ja tās saimniekdators šajā ciklā nav atzīts par nepieejamu,
+        un reģistrē rezultātu saimniekdatora uzskaitē
+        """
+        host = feed.host or host_of(feed.url)
+        tracker.check(host)
+        try:
+            parsed_feed = self._download_feed(feed.id, feed.url, timer, stop)
+        except Exception as exc:
+            tracker.record_failure(host, exc)
+            raise
+        tracker.record_success(host)
+        return parsed_feed
+    
+    def _download_feed(self, feed_id: int, url: str, timer: StageTimer,
+                       stop: Optional[Callable[[Dict[str, Any]], bool]] = None) -> ParsedFeed:
+        """
+        Lejupielādē un parsē RSS barotni. Neizmanto datubāzi, tāpēc drīkst
+        tikt izsaukta no citiem pavedieniem.
+        
+        Atbilde tiek lasīta porcijās un uzreiz padota inkrementālajam parsētājam;
+        lejupielāde tiek pārtraukta, ja pārsniegts RSS_MAX_FEED_BYTES vai
+        RSS_FETCH_DEADLINE, vai arī `stop` atgriež True kādam ierakstam.
+        """
+        # Mēģinam iegūt RSS barotni
+        start = time.perf_counter()
+        deadline = time.monotonic() + settings.RSS_FETCH_DEADLINE
+        max_bytes = settings.RSS_MAX_FEED_BYTES
+        connect_seconds = None
+        response = None
+        received = 0
+        read_seconds = 0.0
+        
+        def timed_chunks(chunks):
+            # Lasīšanas laiks tiek skaitīts atsevišķi no parsēšanas laika
+            nonlocal received, read_seconds
+            iterator = iter(chunks)
+            while True:
+                chunk_start = time.perf_counter()
+                try:
+                    chunk = next(iterator)
+                except StopIteration:
+                    return
+                finally:
+                    read_seconds += time.perf_counter() - chunk_start
+                received += len(chunk)
+                yield chunk
+        
+        def refetch():
+            # Nekorektam XML feedparser vajag visu dokumentu: tas tiek lejupielādēts vēlreiz
+            # ar tiem pašiem limitiem, nevis uzkrāts katras barotnes pirmajā lejupielādē
+            with get_session().get(url, timeout=self.timeout, verify=True, stream=True) as again:
+                again.raise_for_status()
+                yield from iter_limited(again.iter_content(FEED_CHUNK_SIZE), max_bytes, deadline)
+        
+        try:
+            response = get_session().get(url, timeout=self.timeout, verify=True, stream=True)
+            # elapsed ir laiks līdz galvenēm: DNS, savienojums, TLS un servera atbilde
+            connect_seconds = response.elapsed.total_seconds()
+            response.raise_for_status()  # Pārbauda, vai atbilde ir veiksmīga
+            
+            declared_length = response.headers.get('Content-Length')
+            if declared_length and declared_length.isdigit() and int(declared_length) > max_bytes:
+                raise FeedTooLarge(f"Barotne pārsniedz {max_bytes} baitus (Content-Length: {declared_length})")
+            
+            chunks = timed_chunks(iter_limited(response.iter_content(FEED_CHUNK_SIZE), max_bytes, deadline))
+            parse_start = time.perf_counter()
+            parsed_feed = parse_feed_stream(chunks, stop, refetch=lambda: timed_chunks(refetch()))
+            parse_seconds = max(0.0, time.perf_counter() - parse_start - read_seconds)
+            parsed_feed.permanent_url = permanent_redirect_target(response)
+            # WebSub centrmezgls var būt norādīts arī HTTP Link galvenē
+            for rel in ("hub", "self"):
+                if rel in response.links:
+                    parsed_feed.feed.setdefault("links", []).append(
+                        FeedParserDict(rel=rel, href=response.links[rel].get("url", ""))
+                    )
+            if response.history and parsed_feed.permanent_url is None:
+                FEED_REDIRECTS.labels("temporary").inc()
+        except Exception:
+            FEED_FETCH_ERRORS.inc()
+            raise
+        finally:
+            if response is not None:
+                response.close()
+                record_response_bytes(response, "feed", received)
+            elapsed = time.perf_counter() - start
+            if connect_seconds is None:
+                connect_seconds = elapsed
+            timer.add("connect", connect_seconds)
+            timer.add("download", read_seconds)
+            FEED_FETCH_SECONDS.observe(connect_seconds + read_seconds)
+            FEED_BYTES_DOWNLOADED.inc(received)
+        
+        timer.add("parse", parse_seconds)
+        FEED_PARSE_SECONDS.observe(parse_seconds)
+        
+        if parsed_feed.bozo and parsed_feed.bozo_exception:
+            # Brīdinājums par parsēšanas kļūdām
+            logger.warning(f"RSS barotnē {url} ir kļūdas: {parsed_feed.bozo_exception}")
+        if parsed_feed.truncated:
+            logger.debug(f"Barotnes {url} lasīšana apturēta pēc {len(parsed_feed.entries)} ierakstiem")
+        
+        return parsed_feed
+    
+    def _store_entries(self, feed: RssFeed, items, timer: Optional[StageTimer] = None) -> List[StoredEntry]:
+        """
+        Saglabā barotnes jaunos ierakstus un atgriež to sarakstu
+        """
+        timer = timer or StageTimer()
+        new_entries: List[StoredEntry] = []
+        entry_tags: Dict[str, Dict[str, str]] = {}
+        with timer.stage("dedup"):
+            known_ids, known_links = self._find_existing(items)
+        
+        # Apstrādājam ierakstus
+        for entry in items:
+            # Pārbaudām, vai ieraksts jau eksistē datubāzē
+            original_id = entry.get('id', entry.get('link', ''))
+            link = entry.get('link', '')
+            if original_id in known_ids or link in known_links:
+                ENTRIES_DUPLICATE.inc()
+                continue  # Izlaižam ierakstus, kas jau eksistē
+            
+            # Vienā barotnē mēdz atkārtoties viens un tas pats ieraksts
+            known_ids.add(original_id)
+            known_links.add(link)
+            
+            # Apstrādājam publicēšanas datumu (naivs UTC)
+            with timer.stage("dates"):
+                published_date = date_normalizer.entry_date(entry, feed.id) or datetime.utcnow()
+            
+            # Iegūstam saturu
+            content = ''
+            if 'content' in entry and entry.content:
+                content = entry.content[0].get('value', '')
+            elif 'summary_detail' in entry and entry.summary_detail:
+                content = entry.summary_detail.get('value', '')
+            elif 'summary' in entry:
+                content = entry.get('summary', '')
+            
+            # Iztīram HTML
+            with timer.stage("clean"):
+                soup = BeautifulSoup(content, 'lxml')
+                clean_content = soup.get_text(separator=' ', strip=True)
+                
+                soup = BeautifulSoup(entry.get('summary', ''), 'lxml')
+                clean_summary = soup.get_text(separator=' ', strip=True)
+            
+            # Izveidojam jaunu ierakstu
+            new_entry = Entry(
+                feed_id=feed.id,
+                title=entry.get('title', ''),
+                link=link,
+                published=published_date,
+                summary=clean_summary,
+                content=clean_content,
+                author=entry.get('author', ''),
+                original_id=original_id,
+                entry_metadata=self._prepare_metadata(entry)
+            )
+            
+            # Svarīgi - vispirms pievienojam ierakstu sesijai un saglabājam
+            with timer.stage("insert"):
+                self.db.add(new_entry)
+                self.db.flush()  # Ģenerējam ID un saglabājam ierakstu datubāzē
+            
+            # Tagus saglabājam pēc cikla visiem barotnes ierakstiem kopā
+            entry_tags[new_entry.id] = entry_tag_names(entry.get('tags'))
+            # Pilns raksts barotnē ir tikai content elementā (piem. content:encoded)
+            has_full_content = 'content' in entry and len(clean_content) >= settings.CONTENT_FULL_MIN_LENGTH
+            new_entries.append(StoredEntry(new_entry.id, published_date, has_full_content))
+        
+        with timer.stage("tags"):
+            self._store_tags(entry_tags)
+        
+        ENTRIES_INSERTED.inc(len(new_entries))
+        return new_entries
+    
+    def _store_tags(self, entry_tags: Dict[str, Dict[str, str]]) -> None:
+        """
+        Normalizētos tagus atrod vai izveido ar vienu vaicājumu, saites pievieno ar
+        vienu INSERT un tagu usage_count palielina inkrementāli
+        """
+        names: Dict[str, str] = {}
+        for entry_names in entry_tags.values():
+            for key, name in entry_names.items():
+                names.setdefault(key, name)
+        tag_ids = resolve_tags(self.db, names)
+        link_tags(self.db, [
+            (entry_id, tag_ids[key])
+            for entry_id, entry_names in entry_tags.items()
+            for key in entry_names
+        ])
+    
+    def _find_existing(self, items) -> tuple[Set[str], Set[str]]:
+        """
+        Ar vienu vaicājumu atrod barotnes ierakstus, kas jau ir datubāzē
+        """
+        original_ids = {item.get('id', item.get('link', '')) for item in items}
+        links = {item.get('link', '') for item in items}
+        original_ids.discard('')
+        links.discard('')
+        if not original_ids and not links:
+            return set(), set()
+        
+        with DEDUP_QUERY_SECONDS.time():
+            rows = self.db.query(Entry.original_id, Entry.link).filter(
+                or_(Entry.original_id.in_(original_ids), Entry.link.in_(links))
+            ).all()
+        return {row.original_id for row in rows}, {row.link for row in rows}
+    
+    def _dispatch_content_tasks(self, entries: List[StoredEntry]) -> None:
+        """
+        Izsauc pilnā raksta iegūšanu jaunajiem ierakstiem (pēc commit) saskaņā ar
+        CONTENT_EXTRACTION_POLICY: "always", "skip_if_full" (izlaiž ierakstus, kuru
+        barotne jau satur pilnu rakstu) vai "never"
+        """
+        policy = settings.CONTENT_EXTRACTION_POLICY
+        now = datetime.utcnow()
+        for entry in entries:
+            if policy == "never":
+                CONTENT_TASKS_DISPATCHED.labels("skipped_policy").inc()
+                continue
+            if policy == "skip_if_full" and entry.has_full_content:
+                CONTENT_TASKS_DISPATCHED.labels("skipped_full").inc()
+                continue
+            try:
+                priority = content_task_priority(entry.published, now)
+                current_app.send_task('fetch_full_article_content', args=[entry.id], priority=priority)
+                CONTENT_TASKS_DISPATCHED.labels("dispatched").inc()
+                logger.info(f"Izsaukts pilnā raksta iegūšanas uzdevums: {entry.id} (prioritāte {priority})")
+            except Exception as e:
+                logger.error(f"Neizdevās izsaukt pilnā raksta iegūšanu: {str(e)}")
+    
+    def _success_status(self, feed: RssFeed, parsed_feed) -> Dict[str, Any]:
+        """
+        Barotnes statusa rinda bulk UPDATE pēc veiksmīgas ievākšanas
+        """
+        meta = parsed_feed.feed if hasattr(parsed_feed, 'feed') else {}
+        now = datetime.utcnow()
+        hub, topic = websub.discover_hub(meta)
+        return {
+            "id": feed.id,
+            "title": meta.get('title', feed.title),
+            "description": meta.get('description', feed.description),
+            "site_url": meta.get('link', feed.site_url),
+            "language": meta.get('language', feed.language),
+            "last_fetched": now,
+            "error_count": 0,
+            "last_error": None,
+            "circuit_state": CLOSED,
+            "circuit_open_until": None,
+            "websub_hub": hub,
+            "websub_topic": topic,
+            "updated_at": now,
+        }
+    
+    def ingest_pushed(self, feed: RssFeed, body: bytes) -> int:
+        """
+        Saglabā WebSub centrmezgla piegādāto barotnes saturu ar to pašu parsēšanas
+        un saglabāšanas ceļu kā ievākšana; atgriež jauno ierakstu skaitu
+        """
+        timer = StageTimer()
+        with timer.stage("parse"):
+            parsed_feed = parse_feed_stream([body], refetch=lambda: [body])
+        new_entries = self._store_entries(feed, parsed_feed.entries, timer)
+        
+        now = datetime.utcnow()
+        feed.last_fetched = now
+        feed.last_pushed = now
+        for key, value in self._high_water_status(feed, parsed_feed.entries, False).items():
+            setattr(feed, key, value)
+        
+        with timer.stage("commit"):
+            self.db.flush()
+        self._save_profiles([self._profile_row(feed.id, timer, True, len(new_entries))])
+        self.db.commit()
+        logger.info(f"WebSub: barotnei {feed.url} piegādāti {len(new_entries)} jauni ieraksti")
+        
+        self._dispatch_content_tasks(new_entries)
+        publish_changes(self.db, {feed.id: len(new_entries)} if new_entries else {})
+        return len(new_entries)
+    
+    def _dispatch_websub_subscribe(self, feed_id: int) -> None:
+        try:
+            current_app.send_task('websub_subscribe', args=[feed_id])
+        except Exception as e:
+            logger.error(f"Neizdevās izsaukt WebSub abonēšanu: {str(e)}")
+    
+    def _redirect_status(self, feed: RssFeed, permanent_url: Optional[str]) -> Dict[str, Any]:
+        """
+        Pēc pastāvīgas novirzīšanas saglabā jauno adresi, lai nākamā ievākšana
+        to neveiktu atkārtoti. Ja jaunā adrese sakrīt ar citu barotni, šī barotne
+        tiek atzīmēta kā dublikāts un deaktivizēta.
+        """
+        if not permanent_url or permanent_url == feed.url or len(permanent_url) > 255:
+            return {}
+        key = make_url_key(permanent_url)
+        other_id = self._redirected_keys.get(key)
+        if other_id is None:
+            other_id = self.db.execute(
+                select(RssFeed.id).where(RssFeed.url_key == key, RssFeed.id != feed.id).limit(1)
+            ).scalar()
+        if other_id is not None and other_id != feed.id:
+            FEED_REDIRECTS.labels("duplicate").inc()
+            logger.warning(f"Barotne {feed.url} novirza uz {permanent_url} - tā ir barotnes {other_id} dublikāts")
+            return {"duplicate_of_id": other_id, "active": False}
+        
+        self._redirected_keys[key] = feed.id
+        FEED_REDIRECTS.labels("updated").inc()
+        logger.info(f"Barotne {feed.url} pastāvīgi pārvietota uz {permanent_url}")
+        return {"url": permanent_url, "url_key": key, "host": host_of(permanent_url)}
+    
+    def _known_items_stop(self, feed: RssFeed) -> Optional[Callable[[Dict[str, Any]], bool]]:
+        """
+        Atgriež nosacījumu, kas aptur barotnes lasīšanu pēc RSS_KNOWN_ITEMS_STOP
+        secīgiem jau zināmiem ierakstiem. None nozīmē pilnu pārbaudi - tā notiek
+        ik pēc RSS_FULL_SCAN_EVERY ievākšanām, lai pamanītu ierakstus, kas
+        barotnē parādās ne hronoloģiskā secībā.
+        """
+        recent_ids = set(feed.recent_ids or [])
+        if not recent_ids or (feed.fetches_since_full_scan or 0) + 1 >= settings.RSS_FULL_SCAN_EVERY:
+            return None
+        
+        high_water = feed.last_seen_published
+        threshold = settings.RSS_KNOWN_ITEMS_STOP
+        known_run = 0
+        
+        def stop(item) -> bool:
+            nonlocal known_run
+            original_id = item.get('id', item.get('link', ''))
+            published = date_normalizer.entry_date(item, feed.id)
+            # Ieraksts ir zināms, ja tas ir starp pēdējiem ID vai vecāks par augstāko atzīmi
+            if original_id in recent_ids or (high_water and published and published < high_water):
+                known_run += 1
+            else:
+                known_run = 0
+            return known_run >= threshold
+        
+        return stop
+    
+    def _high_water_status(self, feed: RssFeed, items, full_scan: bool) -> Dict[str, Any]:
+        """
+        Aprēķina barotnes augstāko ūdens atzīmi pēc veiksmīgas ievākšanas
+        """
+        recent_ids: List[str] = []
+        seen: Set[str] = set()
+        for original_id in [item.get('id', item.get('link', '')) for item in items] + list(feed.recent_ids or []):
+            if original_id and original_id not in seen:
+                seen.add(original_id)
+                recent_ids.append(original_id)
+        
+        last_seen_published = feed.last_seen_published
+        for item in items:
+            published = date_normalizer.entry_date(item, feed.id)
+            if published and (last_seen_published is None or published > last_seen_published):
+                last_seen_published = published
+        
+        return {
+            "last_seen_id": recent_ids[0] if recent_ids else feed.last_seen_id,
+            "last_seen_published": last_seen_published,
+            "recent_ids": recent_ids[:settings.RSS_RECENT_IDS],
+            "fetches_since_full_scan": 0 if full_scan else (feed.fetches_since_full_scan or 0) + 1,
+        }
+    
+    def _error_status(self, feed: RssFeed, error_msg: str) -> Dict[str, Any]:
+        """
+        Barotnes statusa rinda bulk UPDATE pēc neveiksmīgas ievākšanas. Pēc
+        CIRCUIT_FAILURE_THRESHOLD secīgām kļūdām barotnes ķēde tiek atvērta ar
+        eksponenciāli augošu aizturi; barotne netiek deaktivizēta.
+        """
+        error_count = (feed.error_count or 0) + 1
+        now = datetime.utcnow()
+        state = CLOSED
+        open_until = None
+        
+        if error_count >= settings.CIRCUIT_FAILURE_THRESHOLD:
+            state = OPEN
+            open_until = now + backoff_delay(error_count - settings.CIRCUIT_FAILURE_THRESHOLD + 1)
+            logger.warning(f"Barotnes {feed.url} ķēde atvērta līdz {open_until:%Y-%m-%d %H:%M} "
+                           f"pēc {error_count} secīgām kļūdām")
+        
+        return {
+            "id": feed.id,
+            "title": feed.title,
+            "description": feed.description,
+            "site_url": feed.site_url,
+            "language": feed.language,
+            "last_fetched": now,
+            "error_count": error_count,
+            "last_error": error_msg,
+            "circuit_state": state,
+            "circuit_open_until": open_until,
+            "updated_at": now,
+        }
+    
+    def _update_host_circuits(self, tracker: HostCircuitTracker) -> None:
+        """
+        Atjauno saimniekdatoru ķēdes pēc cikla: veiksmīga atbilde ķēdi aizver,
+        cikls tikai ar saimniekdatora kļūdām palielina kļūdu skaitu un pēc
+        sliekšņa atver ķēdi visām saimniekdatora barotnēm
+        """
+        hosts = tracker.hosts()
+        if not hosts:
+            return
+        
+        now = datetime.utcnow()
+        existing = {row.host: row for row in self.db.query(FeedHost).filter(FeedHost.host.in_(hosts)).all()}
+        for host in hosts:
+            row = existing.get(host)
+            if tracker.successes.get(host):
+                if row is not None and row.circuit_state != CLOSED:
+                    logger.info(f"Saimniekdators {host} atkal pieejams, ķēde aizvērta")
+                if row is not None:
+                    row.circuit_state = CLOSED
+                    row.failure_count = 0
+                    row.open_until = None
+                continue
+            
+            failures = tracker.failures.get(host, 0)
+            if not failures:
+                continue
+            if row is None:
+                row = FeedHost(host=host, circuit_state=CLOSED, failure_count=0)
+                self.db.add(row)
+            row.failure_count = (row.failure_count or 0) + 1
+            row.last_error = tracker.last_errors.get(host)
+            if row.failure_count >= settings.CIRCUIT_FAILURE_THRESHOLD or failures >= settings.CIRCUIT_HOST_TRIP_FEEDS:
+                row.circuit_state = OPEN
+                row.open_until = now + backoff_delay(row.failure_count)
+                logger.warning(f"Saimniekdatora {host} ķēde atvērta līdz {row.open_until:%Y-%m-%d %H:%M}")
+    
+    def _commit_batch(self, status_updates: List[Dict[str, Any]], profile_rows: List[Dict[str, Any]],
+                      new_entries: List[StoredEntry], new_counts: Dict[int, int]) -> None:
+        """
+        Ieraksta uzkrāto barotņu statusu ar vienu bulk UPDATE un apstiprina porciju
+        """
+        if status_updates:
+            self._update_statuses(status_updates)
+        self._save_profiles(profile_rows)
+        self.db.commit()
+        
+        self._dispatch_content_tasks(new_entries)
+        publish_changes(self.db, new_counts)
+        
+        status_updates.clear()
+        profile_rows.clear()
+        new_entries.clear()
+        new_counts.clear()
+    
+    def _update_statuses(self, status_updates: List[Dict[str, Any]]) -> None:
+        """
+        Barotņu statusi ar vienu bulk UPDATE. Ja porcija tomēr neizdodas, katra
+        barotne tiek atjaunota savā savepoint, lai kļūda skartu tikai to barotni.
+        """
+        rows = [fit_feed_status(row) for row in status_updates]
+        try:
+            with self.db.begin_nested():
+                self.db.execute(update(RssFeed), rows)
+            return
+        except SQLAlchemyError as e:
+            logger.warning(f"Barotņu statusa bulk UPDATE neizdevās, saglabājam pa vienai: {e}")
+        
+        for row in rows:
+            try:
+                with self.db.begin_nested():
+                    self.db.execute(update(RssFeed), [row])
+            except SQLAlchemyError as e:
+                logger.error(f"Neizdevās saglabāt barotnes {row['id']} statusu: {e}")
+    
+    def _profile_row(self, feed_id: int, timer: StageTimer, success: bool, new_entries: int) -> Dict[str, Any]:
+        """
+        Sagatavo barotnes ievākšanas laika profila rindu
+        """
+        return {
+            "feed_id": feed_id,
+            "created_at": datetime.utcnow(),
+            "success": success,
+            "new_entries": new_entries,
+            "total_ms": round(timer.total * 1000, 3),
+            "stages": timer.stages_ms(),
+        }
+    
+    def _save_profiles(self, profile_rows: List[Dict[str, Any]]) -> None:
+        """
+        Saglabā laika profilus un katrai barotnei atstāj tikai pēdējos RSS_PROFILE_HISTORY
+        """
+        if not profile_rows:
+            return
+        
+        self.db.execute(insert(FeedFetchProfile), profile_rows)
+        
+        ranked = select(
+            FeedFetchProfile.id,
+            func.row_number().over(
+                partition_by=FeedFetchProfile.feed_id,
+                order_by=(FeedFetchProfile.created_at.desc(), FeedFetchProfile.id.desc()),
+            ).label("rn"),
+        ).where(FeedFetchProfile.feed_id.in_({row["feed_id"] for row in profile_rows})).subquery()
+        self.db.execute(
+            delete(FeedFetchProfile).where(
+                FeedFetchProfile.id.in_(select(ranked.c.id).where(ranked.c.rn > settings.RSS_PROFILE_HISTORY))
+            ),
+            execution_options={"synchronize_session": False},
+        )
+    
     def _prepare_metadata(self, entry) -> Dict[str, Any]:
         """
         Sagatavo papildu metadatus no ieraksta
@@ -241,32 +880,3 @@ class RssCollector:
             }
         
         return metadata
-    
-    def _fetch_feed_with_new_session(self, feed_id: int) -> tuple[bool, int]:
-        """
-        Izveido jaunu sesiju un ievāc datus no konkrētas RSS barotnes
-        """
-        # Izveidojam jaunu sesiju katrai pavedieniem
-        from app.models.database import SessionLocal
-        db = SessionLocal()
-        
-        try:
-            # Iegūstam barotni no datubāzes
-            feed = db.query(RssFeed).filter(RssFeed.id == feed_id).first()
-            
-            if not feed:
-                logger.error(f"Barotne ar ID {feed_id} nav atrasta")
-                return False, 0
-            
-            # Ievācam datus, izmantojot atsevišķu sesiju
-            collector = RssCollector(db)
-            result = collector.fetch_single_feed(feed)
-            
-            # Aizveŗam sesiju
-            db.close()
-            
-            return result
-        except Exception as e:
-            logger.error(f"Kļūda ievācot datus no barotnes ar ID {feed_id}: {str(e)}")
-            db.close()
-            return False, 0
\ No newline at end of file
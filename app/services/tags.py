@@ -0,0 +1,103 @@
+import re
+import unicodedata
+from collections import Counter
+from datetime import datetime
+from typing import Dict, Iterable, Tuple
+
+from sqlalchemy import bindparam, delete, select, update
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.orm import Session
+
+from app.models.models import Tag, entry_tag
+
+_WHITESPACE = re.compile(r"\s+")
+TAG_MAX_LENGTH = Tag.__table__.c.name.type.length
+
+
+def tag_name(raw: str) -> str:
+    """
+    Taga attēlojamais nosaukums: NFKC forma, bez atstarpēm sākumā un beigās,
+    iekšējās atstarpes saspiestas līdz vienai
+    """
+    return _WHITESPACE.sub(" ", unicodedata.normalize("NFKC", raw or "")).strip()[:TAG_MAX_LENGTH]
+
+
+def tag_key(raw: str) -> str:
+    """
+    Taga salīdzināšanas atslēga: "Politics", "politics " un "POLITICS" ir viens tags
+    """
+    return tag_name(raw).casefold()[:TAG_MAX_LENGTH]
+
+
+def resolve_tags(db: Session, names: Dict[str, str]) -> Dict[str, int]:
+    """
+    Atgriež {atslēga: taga ID}; trūkstošie tagi tiek izveidoti ar vienu INSERT.
+    names ir {atslēga: nosaukums}, nosaukums tiek izmantots tikai jaunam tagam.
+    """
+    if not names:
+        return {}
+    ids = dict(db.execute(select(Tag.key, Tag.id).where(Tag.key.in_(list(names)))).all())
+    missing = sorted(key for key in names if key not in ids)
+    if missing:
+        now = datetime.utcnow()
+        # Kārtotas atslēgas - paralēlas ievākšanas neieslēdzas viena otrai unikālajā indeksā
+        statement = insert(Tag).values([
+            {"key": key, "name": names[key], "usage_count": 0, "created_at": now} for key in missing
+        ]).on_conflict_do_nothing(index_elements=[Tag.key]).returning(Tag.key, Tag.id)
+        ids.update(db.execute(statement).all())
+        # Tagus, ko starplaikā izveidoja cits darbinieks, nolasām atkārtoti
+        concurrent = [key for key in missing if key not in ids]
+        if concurrent:
+            ids.update(db.execute(select(Tag.key, Tag.id).where(Tag.key.in_(concurrent))).all())
+    return ids
+
+
+def link_tags(db: Session, links: Iterable[Tuple[str, int]]) -> int:
+    """
+    Pievieno (ieraksta ID, taga ID) saites un palielina tagu usage_count;
+    atgriež pievienoto saišu skaitu
+    """
+    rows = [{"entry_id": entry_id, "tag_id": tag_id} for entry_id, tag_id in set(links)]
+    if not rows:
+        return 0
+    statement = insert(entry_tag).values(rows).on_conflict_do_nothing().returning(entry_tag.c.tag_id)
+    counts = Counter(db.execute(statement).scalars())
+    _add_usage(db, counts)
+    return sum(counts.values())
+
+
+def unlink_entries(db: Session, entry_ids) -> int:
+    """
+    Dzēš ierakstu tagu saites (entry_ids - ID saraksts vai apakšvaicājums) un
+    samazina tagu usage_count; atgriež dzēsto saišu skaitu
+    """
+    statement = delete(entry_tag).where(entry_tag.c.entry_id.in_(entry_ids)).returning(entry_tag.c.tag_id)
+    counts = Counter(db.execute(statement).scalars())
+    _add_usage(db, {tag_id: -count for tag_id, count in counts.items()})
+    return sum(counts.values())
+
+
+def _add_usage(db: Session, deltas: Dict[int, int]) -> None:
+    """
+    Pieskaita izmaiņas tagu skaitītājiem. Rindas tiek atjauninātas ID secībā,
+    lai paralēlas transakcijas nebloķētu viena otru.
+    """
+    if not deltas:
+        return
+    tags = Tag.__table__
+    statement = update(tags)\
+        .where(tags.c.id == bindparam("tag_id"))\
+        .values(usage_count=tags.c.usage_count + bindparam("delta"))
+    db.execute(statement, [{"tag_id": tag_id, "delta": delta} for tag_id, delta in sorted(deltas.items())])
+
+
+def entry_tag_names(items) -> Dict[str, str]:
+    """
+    Barotnes ieraksta kategorijas kā {atslēga: nosaukums} (pirmais nosaukums uzvar)
+    """
+    names: Dict[str, str] = {}
+    for tag_item in items or []:
+        name = tag_name(tag_item.get('term') or '')
+        if name:
+            names.setdefault(tag_key(name), name)
+    return names
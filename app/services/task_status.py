@@ -0,0 +1,61 @@
+import logging
+from datetime import datetime
+from typing import Dict, Optional
+
+import redis
+
+from app.config import settings
+
+# Konfigurējam žurnalēšanu
+logger = logging.getLogger(__name__)
+
+# Uzdevuma stāvokļi
+QUEUED = "queued"
+RUNNING = "running"
+SUCCESS = "success"
+FAILURE = "failure"
+
+_KEY_PREFIX = "rss:task:"
+
+_redis_client: Optional[redis.Redis] = None
+
+
+def _get_redis() -> redis.Redis:
+    """
+    Atgriež koplietojamu Redis klientu uzdevumu statusiem
+    """
+    global _redis_client
+    if _redis_client is None:
+        _redis_client = redis.Redis.from_url(settings.TASK_STATUS_REDIS_URL or settings.CELERY_BROKER_URL)
+    return _redis_client
+
+
+def set_task_status(task_id: str, state: str, **fields) -> None:
+    """
+    Saglabā uzdevuma statusu kā nelielu Redis hash ar TASK_STATUS_TTL derīgumu.
+    Celery rezultātu datubāze šiem uzdevumiem netiek izmantota. Bez task_id
+    (uzdevums izsaukts tieši, ne caur Celery) statuss netiek saglabāts.
+    """
+    if not task_id:
+        return
+    mapping = {key: str(value) for key, value in fields.items() if value is not None}
+    mapping["state"] = state
+    mapping["updated_at"] = datetime.utcnow().isoformat()
+    try:
+        pipeline = _get_redis().pipeline(transaction=False)
+        pipeline.hset(_KEY_PREFIX + task_id, mapping=mapping)
+        pipeline.expire(_KEY_PREFIX + task_id, settings.TASK_STATUS_TTL)
+        pipeline.execute()
+    except redis.RedisError as e:
+        # Statusa kļūda nedrīkst ietekmēt uzdevuma izpildi
+        logger.warning(f"Neizdevās saglabāt uzdevuma {task_id} statusu: {e}")
+
+
+def get_task_status(task_id: str) -> Optional[Dict[str, str]]:
+    """
+    Nolasa uzdevuma statusu; None, ja tas nav zināms vai ir novecojis
+    """
+    data = _get_redis().hgetall(_KEY_PREFIX + task_id)
+    if not data:
+        return None
+    return {key.decode(): value.decode() for key, value in data.items()}
@@ -0,0 +1,102 @@
+import hashlib
+import hmac
+import logging
+import secrets
+from datetime import datetime, timedelta
+from typing import Optional, Tuple
+
+from app.config import settings
+from app.models.models import RssFeed
+
+# Konfigurējam žurnalēšanu
+logger = logging.getLogger(__name__)
+
+# Abonementa stāvokļi
+NONE = "none"
+PENDING = "pending"        # abonēšana pieprasīta, gaida centrmezgla apstiprinājumu
+SUBSCRIBED = "subscribed"
+UNSUBSCRIBING = "leaving"  # atteikšanās pieprasīta, gaida centrmezgla apstiprinājumu
+
+# Pieprasījuma režīms, kuru centrmezgls drīkst apstiprināt katrā stāvoklī
+PENDING_MODES = {PENDING: "subscribe", UNSUBSCRIBING: "unsubscribe"}
+
+# Cik ilgi gaidīt centrmezgla apstiprinājumu, pirms pieprasījumu atkārtot
+PENDING_TIMEOUT = timedelta(hours=1)
+
+_SIGNATURE_ALGORITHMS = {
+    "sha1": hashlib.sha1,
+    "sha256": hashlib.sha256,
+    "sha384": hashlib.sha384,
+    "sha512": hashlib.sha512,
+}
+
+
+def enabled() -> bool:
+    """WebSub darbojas tikai tad, ja ir norādīta publiski sasniedzama servisa adrese"""
+    return bool(settings.WEBSUB_CALLBACK_BASE)
+
+
+def discover_hub(feed_meta) -> Tuple[Optional[str], Optional[str]]:
+    """
+    Atgriež (centrmezgla URL, tēmas URL) no barotnes <link rel="hub"> un
+    <link rel="self"> (vai HTTP Link galvenes); ja centrmezgla nav - (None, None)
+    """
+    hub = None
+    topic = None
+    for link in feed_meta.get("links", []) if feed_meta else []:
+        rel = link.get("rel")
+        if rel == "hub" and hub is None:
+            hub = link.get("href") or None
+        elif rel == "self" and topic is None:
+            topic = link.get("href") or None
+    return (hub, topic) if hub else (None, None)
+
+
+def callback_url(feed_id: int) -> str:
+    return f"{settings.WEBSUB_CALLBACK_BASE.rstrip('/')}/api/websub/{feed_id}"
+
+
+def request_subscription(feed: RssFeed, mode: str = "subscribe") -> None:
+    """
+    Nosūta abonēšanas (vai atteikšanās) pieprasījumu centrmezglam. Centrmezgls
+    apstiprina to asinhroni ar GET pieprasījumu uz callback_url.
+    """
+    # HTTP klients (un DNS kešs) vajadzīgs tikai darbiniekam, ne API atzvanu galapunktam
+    from app.services.http_client import get_session
+    if not feed.websub_secret:
+        feed.websub_secret = secrets.token_hex(20)
+    response = get_session().post(
+        feed.websub_hub,
+        data={
+            "hub.mode": mode,
+            "hub.topic": feed.websub_topic or feed.url,
+            "hub.callback": callback_url(feed.id),
+            "hub.secret": feed.websub_secret,
+            "hub.lease_seconds": settings.WEBSUB_LEASE_SECONDS,
+        },
+        timeout=settings.RSS_REQUEST_TIMEOUT,
+    )
+    response.raise_for_status()
+    # Līdz apstiprinājumam websub_lease_expires ir gaidīšanas termiņš; centrmezgla
+    # apstiprinājums tiek pieņemts tikai pieprasītajam režīmam
+    feed.websub_state = PENDING if mode == "subscribe" else UNSUBSCRIBING
+    feed.websub_lease_expires = datetime.utcnow() + PENDING_TIMEOUT
+    logger.info(f"WebSub {mode} pieprasījums barotnei {feed.url} nosūtīts uz {feed.websub_hub}")
+
+
+def verify_signature(secret: Optional[str], body: bytes, header: Optional[str]) -> bool:
+    """
+    Pārbauda X-Hub-Signature ("sha256=<hex>") pret abonementa noslēpumu. Abonementi
+    vienmēr tiek veidoti ar noslēpumu, tāpēc bez tā piegāde netiek pieņemta.
+    """
+    if not secret:
+        return False
+    if not header or "=" not in header:
+        return False
+    algorithm, signature = header.split("=", 1)
+    digest = _SIGNATURE_ALGORITHMS.get(algorithm.strip().lower())
+    if digest is None:
+        return False
+    expected = hmac.new(secret.encode(), body, digest).hexdigest()
+    return hmac.compare_digest(expected, signature.strip().lower())
+
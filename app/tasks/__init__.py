@@ -1,4 +1,12 @@
 # app/tasks/__init__.py
-from app.tasks.celery_tasks import collect_all_rss_feeds, collect_single_rss_feed, cleanup_old_entries
+# Uzdevumu modulis (un tā atkarības - feedparser, readability, bs4) tiek importēts tikai
+# pēc pieprasījuma, lai API process, kas tikai sūta uzdevumus (app.tasks.dispatch), to neielādētu
 
-__all__ = ['collect_all_rss_feeds', 'collect_single_rss_feed', 'cleanup_old_entries']
\ No newline at end of file
+__all__ = ['collect_all_rss_feeds', 'collect_single_rss_feed', 'cleanup_old_entries']
+
+
+def __getattr__(name):
+    if name in __all__:
+        from app.tasks import celery_tasks
+        return getattr(celery_tasks, name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -1,19 +1,35 @@
 from celery import shared_task
+from celery.exceptions import Retry
 import logging
+import random
+import time
 import requests
-from bs4 import BeautifulSoup
-from readability import Document
-from datetime import datetime
+from typing import Optional, Tuple
+from datetime import datetime, timedelta
+from sqlalchemy import and_, or_, select, update
 from app.models.database import SessionLocal
-from app.services.rss_collector import RssCollector
-from app.models.models import RssFeed, Entry
+from app.services.rss_collector import FEED_CHUNK_SIZE, RssCollector
+from app.services.article_extractor import article_extractor
+from app.services.change_feed import assign_change_seq
+from app.services.charset import charset_detector
+from app.services.circuit_breaker import host_of
+from app.services.feed_stream import FeedTooLarge, iter_limited
+from app.services.http_client import BROWSER_USER_AGENT, get_session, record_response_bytes
+from app.services.payloads import delete_payload, load_payload, store_payload
+from app.services.rate_limit import domain_rate_limiter
+from app.services.tags import unlink_entries
+from app.services import task_status
+from app.services import websub
+from app.config import settings
+from app.models.models import RssFeed, Entry, EntryContent
+from app.metrics import ARTICLE_EXTRACTION_SECONDS
 
 # Konfigurējam žurnalēšanu
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
 
-@shared_task(name="collect_all_rss_feeds")
+@shared_task(name="collect_all_rss_feeds", ignore_result=True)
 def collect_all_rss_feeds():
     """
     Celery uzdevums, kas ievāc datus no visām aktīvajām RSS barotnēm
@@ -22,43 +38,13 @@ def collect_all_rss_feeds():
     db = SessionLocal()
     
     try:
-        # Iegūstam visas aktīvās barotnes
-        active_feeds = db.query(RssFeed).filter(RssFeed.active == True).all()
-        
-        # Rezultātu statistika
-        results = {
-            "success": 0,
-            "error": 0,
-            "new_entries": 0
-        }
-        
-        logger.info(f"Sākam ievākt datus no {len(active_feeds)} aktīvajām RSS barotnēm")
-        
-        # Apstrādājam katru barotni secīgi (bez vienlaicīguma)
-        for feed in active_feeds:
-            try:
-                # Izveidojam jaunu sesiju katrai barotnei
-                feed_db = SessionLocal()
-                collector = RssCollector(feed_db)
-                
-                # Iegūstam barotni no datubāzes
-                feed_fresh = feed_db.query(RssFeed).filter(RssFeed.id == feed.id).first()
-                
-                if feed_fresh:
-                    success, entry_count = collector.fetch_single_feed(feed_fresh)
-                    if success:
-                        results["success"] += 1
-                        results["new_entries"] += entry_count
-                    else:
-                        results["error"] += 1
-                
-                feed_db.close()
-            except Exception as e:
-                logger.error(f"Kļūda apstrādājot barotni {feed.url}: {str(e)}")
-                results["error"] += 1
+        # Visas barotnes ievācam vienā sesijā ar savepoint katrai barotnei
+        collector = RssCollector(db)
+        results = collector.collect_batch()
         
-        logger.info(f"RSS ievākšana pabeigta. Veiksmīgi: {results['success']}, "
-                  f"Kļūdas: {results['error']}, Jauni ieraksti: {results['new_entries']}")
+        # Ieraksti, kuru numurēšana pēc commit neizdevās, tiek numurēti katrā ciklā
+        assign_change_seq(db)
+        collector.record_stale_feeds()
         
         return results
     except Exception as e:
@@ -68,20 +54,24 @@ def collect_all_rss_feeds():
         db.close()
 
 
-@shared_task(name="collect_single_rss_feed")
-def collect_single_rss_feed(feed_id: int):
+@shared_task(name="collect_single_rss_feed", bind=True, ignore_result=True)
+def collect_single_rss_feed(self, feed_id: int):
     """
-    Celery uzdevums, kas ievāc datus no konkrētas RSS barotnes
+    Celery uzdevums, kas ievāc datus no konkrētas RSS barotnes. Iznākums tiek
+    saglabāts kompaktajā statusu krātuvē (GET /tasks/{task_id}).
     """
     logger.info(f"Sākas RSS ievākšana barotnei ar ID {feed_id}")
+    task_id = self.request.id
     db = SessionLocal()
     
     try:
+        task_status.set_task_status(task_id, task_status.RUNNING, task=self.name, feed_id=feed_id)
         # Iegūstam barotni no datubāzes
         feed = db.query(RssFeed).filter(RssFeed.id == feed_id).first()
         
         if not feed:
             logger.error(f"Barotne ar ID {feed_id} nav atrasta")
+            task_status.set_task_status(task_id, task_status.FAILURE, error="Feed not found")
             return {"error": "Feed not found"}
         
         # Ievācam datus
@@ -90,17 +80,132 @@ def collect_single_rss_feed(feed_id: int):
         
         if success:
             logger.info(f"Veiksmīgi ievākti dati no barotnes {feed.url}. Pievienoti {entry_count} jauni ieraksti.")
+            task_status.set_task_status(task_id, task_status.SUCCESS, new_entries=entry_count)
             return {"success": True, "new_entries": entry_count}
         else:
             logger.error(f"Kļūda ievācot datus no barotnes {feed.url}")
+            task_status.set_task_status(task_id, task_status.FAILURE, error=feed.last_error)
             return {"success": False, "error": feed.last_error}
     except Exception as e:
         logger.error(f"Kļūda ievācot datus no barotnes ar ID {feed_id}: {str(e)}")
+        task_status.set_task_status(task_id, task_status.FAILURE, error=str(e))
         raise
     finally:
         db.close()
 
 
+@shared_task(name="collect_rss_feed_batch", ignore_result=True)
+def collect_rss_feed_batch(feed_ids: list):
+    """
+    Celery uzdevums, kas ievāc norādīto barotņu porciju (masveida importa pirmā ievākšana)
+    """
+    db = SessionLocal()
+    
+    try:
+        feeds = db.query(RssFeed).filter(RssFeed.id.in_(feed_ids), RssFeed.active == True).all()
+        logger.info(f"Sākas barotņu porcijas ievākšana: {len(feeds)} barotnes")
+        return RssCollector(db).collect_batch(feeds)
+    except Exception as e:
+        logger.error(f"Kļūda ievācot barotņu porciju: {str(e)}")
+        raise
+    finally:
+        db.close()
+
+
+@shared_task(name="websub_subscribe", ignore_result=True)
+def websub_subscribe(feed_id: int, mode: str = "subscribe"):
+    """
+    Celery uzdevums, kas nosūta WebSub abonēšanas vai atteikšanās pieprasījumu centrmezglam
+    """
+    db = SessionLocal()
+    
+    try:
+        feed = db.query(RssFeed).filter(RssFeed.id == feed_id).first()
+        if not feed or not feed.websub_hub:
+            return {"success": False, "error": "Feed has no hub"}
+        websub.request_subscription(feed, mode)
+        db.commit()
+        return {"success": True, "state": feed.websub_state}
+    except Exception as e:
+        db.rollback()
+        logger.error(f"Kļūda WebSub {mode} barotnei {feed_id}: {str(e)}")
+        return {"success": False, "error": str(e)}
+    finally:
+        db.close()
+
+
+@shared_task(name="ingest_websub_push", ignore_result=True)
+def ingest_websub_push(feed_id: int, payload_key: str):
+    """
+    Celery uzdevums, kas saglabā WebSub centrmezgla piegādāto saturu. Saturs
+    tiek nolasīts no uzdevumu datu glabātuves (app.services.payloads).
+    """
+    db = SessionLocal()
+    
+    try:
+        body = load_payload(payload_key)
+        if body is None:
+            logger.warning(f"WebSub piegāde barotnei {feed_id} vairs nav pieejama (PAYLOAD_TTL)")
+            return {"error": "Payload expired"}
+        feed = db.query(RssFeed).filter(RssFeed.id == feed_id).first()
+        if not feed:
+            delete_payload(payload_key)
+            return {"error": "Feed not found"}
+        new_entries = RssCollector(db).ingest_pushed(feed, body)
+        delete_payload(payload_key)
+        return {"success": True, "new_entries": new_entries}
+    except Exception as e:
+        db.rollback()
+        logger.error(f"Kļūda saglabājot WebSub saturu barotnei {feed_id}: {str(e)}")
+        raise
+    finally:
+        db.close()
+
+
+@shared_task(name="renew_websub_subscriptions", ignore_result=True)
+def renew_websub_subscriptions():
+    """
+    Celery uzdevums, kas abonē jaunatklātos centrmezglus, atjauno abonementus
+    pirms to termiņa beigām un atsakās no neaktīvo barotņu abonementiem
+    """
+    if not websub.enabled():
+        return {"subscribe": 0, "unsubscribe": 0}
+    db = SessionLocal()
+    
+    try:
+        now = datetime.utcnow()
+        renew_until = now + timedelta(seconds=settings.WEBSUB_RENEW_BEFORE)
+        feeds = db.query(RssFeed.id, RssFeed.active, RssFeed.websub_state).filter(
+            RssFeed.websub_hub != None,
+            or_(
+                and_(RssFeed.active == True, RssFeed.websub_state == websub.NONE),
+                # Neapstiprināts pieprasījums tiek atkārtots pēc tā termiņa
+                and_(RssFeed.websub_state == websub.PENDING, RssFeed.websub_lease_expires <= now),
+                and_(RssFeed.websub_state == websub.SUBSCRIBED,
+                     or_(RssFeed.websub_lease_expires == None, RssFeed.websub_lease_expires <= renew_until)),
+                and_(RssFeed.active == False, RssFeed.websub_state == websub.SUBSCRIBED),
+                # Neapstiprināta atteikšanās arī tiek atkārtota
+                and_(RssFeed.websub_state == websub.UNSUBSCRIBING, RssFeed.websub_lease_expires <= now),
+            )
+        ).all()
+        
+        counts = {"subscribe": 0, "unsubscribe": 0}
+        for feed in feeds:
+            if feed.active:
+                mode = "subscribe"
+            elif feed.websub_state in (websub.SUBSCRIBED, websub.UNSUBSCRIBING):
+                mode = "unsubscribe"
+            else:
+                continue
+            websub_subscribe.delay(feed.id, mode)
+            counts[mode] += 1
+        
+        logger.info(f"WebSub: {counts['subscribe']} abonēšanas, {counts['unsubscribe']} atteikšanās pieprasījumi")
+        return counts
+    finally:
+        db.close()
+
+
 @shared_task(name="cleanup_old_entries")
 def cleanup_old_entries(days: int = 30):
     """
@@ -114,7 +219,9 @@ def cleanup_old_entries(days: int = 30):
     
     try:
         cutoff_date = datetime.utcnow() - timedelta(days=days)
-        deleted_count = db.query(Entry).filter(Entry.published < cutoff_date).delete()
+        # Tagu saites dzēšam pirms ierakstiem, samazinot tagu usage_count
+        unlink_entries(db, select(Entry.id).where(Entry.published < cutoff_date))
+        deleted_count = db.query(Entry).filter(Entry.published < cutoff_date).delete(synchronize_session=False)
         db.commit()
         
         logger.info(f"Dzēsti {deleted_count} veci ieraksti")
@@ -126,77 +233,117 @@ def cleanup_old_entries(days: int = 30):
     finally:
         db.close()
 
-def get_clean_article_text(url: str) -> str:
+def download_article(url: str) -> Tuple[requests.Response, bytes]:
     """
-    Funkcija, kas iegūst tīru raksta tekstu no news URL
+    Lejupielādē raksta HTML ar kopējo laika un izmēra limitu. content rindas pavedienu
+    pūlā Celery task_time_limit nedarbojas, tāpēc uzdevumu ierobežo tikai šie limiti:
+    RSS_REQUEST_TIMEOUT savienojumam un katrai lasīšanai, ARTICLE_FETCH_DEADLINE visai
+    lejupielādei un ARTICLE_MAX_BYTES atbildes izmēram. Atgriež atbildi un tās saturu.
     """
+    headers = {'User-Agent': BROWSER_USER_AGENT}
+    deadline = time.monotonic() + settings.ARTICLE_FETCH_DEADLINE
+    max_bytes = settings.ARTICLE_MAX_BYTES
+    response = get_session().get(url, headers=headers, timeout=settings.RSS_REQUEST_TIMEOUT, stream=True)
     try:
-        # iegustam HTML
-        headers = {
-            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/58.0.3029.110 Safari/537.3'
-        }
-        response = requests.get(url, headers=headers, timeout=10)
-        response.raise_for_status()  # Pārbaudām, vai pieprasījums bija veiksmīgs   
-
-        #readability, lai iegutu raksta galveno tekstu
-        doc = Document(response.text)
-        article_html = doc.summary()
-
-        #BeautifulSoup, lai iegutu tīru tekstu
-        soup = BeautifulSoup(article_html, 'html.parser')
-        
-        # nonemam nevelabos elementus
-        for unwwanted in soup.find_all(['script', 'style', 'iframe', 'noscript', 'aside']):
-            unwwanted.decompose()
-
-        # nonemam ari klases vai id
-        for unwated in soup.find_all(
-            class_=lambda x: x and ('ads' in x or 'piano' in x or 'sidebar' in x)
-        ):
-            unwated.decompose()
+        response.raise_for_status()  # Pārbaudām, vai pieprasījums bija veiksmīgs
+        declared_length = response.headers.get('Content-Length')
+        if declared_length and declared_length.isdigit() and int(declared_length) > max_bytes:
+            raise FeedTooLarge(f"Raksts pārsniedz {max_bytes} baitus (Content-Length: {declared_length})")
+        content = b"".join(iter_limited(response.iter_content(FEED_CHUNK_SIZE), max_bytes, deadline))
+    finally:
+        response.close()
+    return response, content
 
-        # iegustam tiru tekstu
-        clean_text = soup.get_text(separator='\n\n')
 
-        clean_text = '\n'.join([line.strip() for line in clean_text.split('\n') if line.strip()])
-        
-        return clean_text
-    except Exception as e:
-        logger.error(f"Kļūda iegūstot tīru raksta tekstu no URL {url}: {str(e)}")
-        return f"kļūda iegūstot tīru raksta tekstu no URL {url}: {str(e)}"
+def extract_article_text(content: bytes, content_type: Optional[str], host: str) -> str:
+    """
+    Atkodē raksta HTML un izgūst tīru tekstu. Izgūšana noslogo CPU (readability
+    lielākoties ir Python kods), tāpēc tā notiek extract rindas prefork darbiniekā,
+    nevis content pavedienu pūlā, kur to serializētu GIL.
+    """
+    # Kodējums no galvenes vai <meta> - response.text minētu to no visas lapas
+    encoding, _ = charset_detector.detect(content, content_type, host)
+    html = content.decode(encoding, errors='replace')
+    
+    with ARTICLE_EXTRACTION_SECONDS.time():
+        # lxml izgūšana; domēna noteikums ar satura selektoru ļauj izlaist readability
+        return article_extractor.extract(html, host)
 
-@shared_task(name="fetch_full_article_content")  
-def fetch_full_article_content(entry_id: str) -> str:
+@shared_task(name="fetch_full_article_content", bind=True, max_retries=50, ignore_result=True)
+def fetch_full_article_content(self, entry_id: str) -> str:
     """
-    Celery uzdevums, kas iegūst pilnu raksta saturu no ievadītā ID
+    Celery uzdevums, kas lejupielādē pilnā raksta HTML no ievadītā ID un nodod to
+    izgūšanai (extract_article_content). Ja domēna ātruma limits (kopīgs visiem
+    darbiniekiem) ir sasniegts, uzdevums tiek atlikts, neaizņemot darbinieku.
     """
     db = SessionLocal()
     try:
         logger.info(f"Sākas pilna raksta satura iegūšana no ievadītā ID {entry_id}")
-        # Iegūstam ierakstu no datubāzes   
-        entry = db.query(Entry).filter(Entry.id == entry_id).first()
-        if not entry:
+        # No ieraksta vajadzīga tikai saite
+        link = db.query(Entry.link).filter(Entry.id == entry_id).scalar()
+        if not link:
             logger.error(f"Ieraksts ar ID {entry_id} nav atrasts")
             return {"error": "Entry not found"}
         
-        # Iegūstam tīru raksta tekstu no URL
-        clean_text = get_clean_article_text(entry.link)
-
-        if clean_text and not clean_text.startswith("kļūda"):
-            # Atjaunojam ieraksta saturu datubāzē
-            entry.content = clean_text
-            entry.updated_at = datetime.utcnow()
-            db.commit()
-            logger.info(f"Veiksmīgi iegūts pilns raksta saturs no {entry.link}")
-            return {"success": True, }
-        else:
-            logger.error(f"Kļūda iegūstot pilnu raksta saturu no {entry.link}")
+        wait = domain_rate_limiter.acquire(host_of(link))
+        if wait > 0:
+            logger.info(f"Domēna limits sasniegts, raksts {link} tiek atlikts uz {wait:.1f} s")
+            raise self.retry(countdown=wait + random.uniform(0, 1))
+        
+        response, content = download_article(link)
+        record_response_bytes(response, "article", len(content))
+        
+        # HTML brokera rindā netiek sūtīts - izgūšanas uzdevums to nolasa no Redis
+        payload_key = store_payload(content)
+        extract_article_content.delay(entry_id, link, payload_key, response.headers.get('Content-Type'))
+        return {"success": True, }
+    except Retry:
+        raise
+    except Exception as e:
+        logger.error(f"Kļūda iegūstot pilnu raksta saturu no ievadītā ID {entry_id}: {str(e)}")
+        return {"error": str(e)}
+    finally:
+        db.close()
+
+
+@shared_task(name="extract_article_content", ignore_result=True,
+             soft_time_limit=settings.ARTICLE_EXTRACT_TIME_LIMIT,
+             time_limit=settings.ARTICLE_EXTRACT_TIME_LIMIT + 30)
+def extract_article_content(entry_id: str, link: str, payload_key: str, content_type: Optional[str] = None):
+    """
+    Celery uzdevums, kas izgūst tīru tekstu no lejupielādētā raksta HTML un saglabā
+    to satura tabulā. Izpildās prefork pūlā, kur darbojas uzdevuma laika limiti.
+    """
+    content = load_payload(payload_key)
+    if content is None:
+        logger.warning(f"Raksta {link} HTML vairs nav pieejams (PAYLOAD_TTL)")
+        return {"error": "Payload expired"}
+    db = SessionLocal()
+    
+    try:
+        clean_text = extract_article_text(content, content_type, host_of(link))
+        if not clean_text:
+            logger.error(f"Kļūda iegūstot pilnu raksta saturu no {link}")
             return {"success": False, }
+        
+        # Atjaunojam tikai satura tabulu; entries rinda netiek pārrakstīta
+        updated = db.execute(
+            update(EntryContent)
+            .where(EntryContent.entry_id == entry_id)
+            .values(content=clean_text, updated_at=datetime.utcnow())
+        ).rowcount
+        if not updated:
+            db.add(EntryContent(entry_id=entry_id, content=clean_text))
+        db.commit()
+        logger.info(f"Veiksmīgi iegūts pilns raksta saturs no {link}")
+        return {"success": True, }
     except Exception as e:
+        # arī SoftTimeLimitExceeded - izgūšana pārsniedza ARTICLE_EXTRACT_TIME_LIMIT
         db.rollback()
-        logger.error(f"Kļūda iegūstot pilnu raksta saturu no ievadītā ID {entry_id}: {str(e)}")
+        logger.error(f"Kļūda izgūstot raksta saturu no {link}: {str(e)}")
         return {"error": str(e)}
     finally:
+        delete_payload(payload_key)
         db.close()
 
     
\ No newline at end of file
@@ -0,0 +1,27 @@
+from typing import TYPE_CHECKING, Optional
+
+if TYPE_CHECKING:
+    from celery.result import AsyncResult
+
+_app = None
+
+
+def celery_app():
+    """
+    Celery lietotne uzdevumu sūtīšanai no API: ar celeryconfig maršrutiem, bet bez
+    uzdevumu moduļa importa. Noklusētā lietotne (shared_task.delay) maršrutus nezina
+    un sūta uzdevumus uz rindu "celery", ko profilu darbinieki neapstrādā.
+    """
+    global _app
+    if _app is None:
+        from celery import Celery
+        _app = Celery("rss_service", set_as_current=False)
+        _app.config_from_object("celeryconfig")
+    return _app
+
+
+def send_task(name: str, *args, task_id: Optional[str] = None, **options) -> "AsyncResult":
+    """
+    Nosūta uzdevumu pēc nosaukuma, piem. send_task("collect_single_rss_feed", feed_id)
+    """
+    return celery_app().send_task(name, args=list(args), task_id=task_id, **options)
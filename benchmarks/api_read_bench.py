@@ -0,0 +1,88 @@
+"""
+API lasīšanas galapunktu slodzes tests.
+
+Palaiž N vienlaicīgus klientus pret jau palaistu API un izdrukā pieprasījumu
+skaitu sekundē un latentuma procentiles katram galapunktam. Sinhrono un
+asinhrono versiju salīdzina, palaižot to pašu testu pret abām API versijām
+(piem. `git stash` / cits zars) ar vienādu uvicorn darbinieku skaitu:
+
+    uvicorn app.main:app --workers 1 --port 8000
+    python -m benchmarks.api_read_bench --base-url http://localhost:8000 --concurrency 64
+"""
+import argparse
+import asyncio
+import statistics
+import time
+from typing import Dict, List
+
+import httpx
+
+DEFAULT_PATHS = [
+    "/api/entries/?limit=20",
+    "/api/entries/?limit=20&sort_by=created",
+    "/api/feeds/?limit=100",
+    "/api/entries/stats/sources",
+]
+
+
+def _percentile(values: List[float], pct: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+async def _worker(client: httpx.AsyncClient, path: str, deadline: float,
+                  latencies: List[float], errors: List[int]) -> None:
+    while time.perf_counter() < deadline:
+        start = time.perf_counter()
+        try:
+            response = await client.get(path)
+            if response.status_code >= 400:
+                errors.append(response.status_code)
+        except httpx.HTTPError:
+            errors.append(0)
+        latencies.append(time.perf_counter() - start)
+
+
+async def run_path(base_url: str, path: str, concurrency: int, duration: float) -> Dict[str, float]:
+    latencies: List[float] = []
+    errors: List[int] = []
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+    async with httpx.AsyncClient(base_url=base_url, limits=limits, timeout=30) as client:
+        # Iesildām savienojumus un datubāzes pūlu
+        await client.get(path)
+        deadline = time.perf_counter() + duration
+        await asyncio.gather(*[
+            _worker(client, path, deadline, latencies, errors) for _ in range(concurrency)
+        ])
+
+    return {
+        "requests": len(latencies),
+        "rps": len(latencies) / duration,
+        "errors": len(errors),
+        "p50_ms": _percentile(latencies, 50) * 1000,
+        "p95_ms": _percentile(latencies, 95) * 1000,
+        "p99_ms": _percentile(latencies, 99) * 1000,
+        "mean_ms": (statistics.fmean(latencies) * 1000) if latencies else 0.0,
+    }
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--base-url", default="http://localhost:8000")
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--duration", type=float, default=15.0, help="sekundes katram galapunktam")
+    parser.add_argument("--path", action="append", dest="paths", help="galapunkts (var norādīt vairākas reizes)")
+    args = parser.parse_args()
+
+    print(f"{'galapunkts':45} {'rps':>9} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'kļūdas':>7}")
+    for path in args.paths or DEFAULT_PATHS:
+        result = await run_path(args.base_url, path, args.concurrency, args.duration)
+        print(f"{path:45} {result['rps']:9.1f} {result['p50_ms']:9.1f} "
+              f"{result['p95_ms']:9.1f} {result['p99_ms']:9.1f} {result['errors']:7d}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,96 @@
+"""
+Raksta teksta izgūšanas ātruma tests uz saglabāta HTML korpusa.
+
+Korpuss ir direktorija ar .html failiem (--corpus); ja tā nav norādīta, tiek
+izmantoti benchmarks.feed_server ģenerētie raksti. Tiek salīdzināts:
+
+    legacy     readability -> BeautifulSoup(html.parser) -> divi find_all (iepriekšējais ceļš)
+    engine     app.services.article_extractor bez domēna noteikuma (readability + lxml teksta izgūšana)
+    rule       app.services.article_extractor ar satura selektoru (bez readability)
+
+Tiek izdrukāts arī, cik engine rezultātu atšķiras no legacy rezultāta.
+
+Piemēri:
+    python -m benchmarks.article_extraction_bench --articles 300 --size 20000
+    python -m benchmarks.article_extraction_bench --corpus ./html_corpus --content-selector "article"
+"""
+import argparse
+import os
+import time
+from pathlib import Path
+from typing import Callable, List
+
+# Iestatījumi ir obligāti app.config importam; testam tie netiek izmantoti
+for _name, _value in {
+    "POSTGRES_USER": "bench",
+    "POSTGRES_PASSWORD": "bench",
+    "POSTGRES_HOST": "localhost",
+    "POSTGRES_DB": "bench",
+    "CELERY_BROKER_URL": "memory://",
+    "CELERY_RESULT_BACKEND": "cache+memory://",
+}.items():
+    os.environ.setdefault(_name, _value)
+
+from bs4 import BeautifulSoup  # noqa: E402
+from readability import Document  # noqa: E402
+
+from app.services.article_extractor import ArticleExtractor  # noqa: E402
+from benchmarks.feed_server import render_article  # noqa: E402
+
+BENCH_HOST = "bench.local"
+
+
+def legacy_extract(html: str) -> str:
+    """Iepriekšējais get_clean_article_text izgūšanas bloks"""
+    soup = BeautifulSoup(Document(html).summary(), 'html.parser')
+    for unwanted in soup.find_all(['script', 'style', 'iframe', 'noscript', 'aside']):
+        unwanted.decompose()
+    for unwanted in soup.find_all(class_=lambda x: x and ('ads' in x or 'piano' in x or 'sidebar' in x)):
+        unwanted.decompose()
+    clean_text = soup.get_text(separator='\n\n')
+    return '\n'.join([line.strip() for line in clean_text.split('\n') if line.strip()])
+
+
+def load_corpus(directory: str, articles: int, size: int) -> List[str]:
+    if directory:
+        return [path.read_text(encoding="utf-8", errors="replace") for path in sorted(Path(directory).glob("*.html"))]
+    return [render_article(index % 20, index, size) for index in range(articles)]
+
+
+def _run(name: str, corpus: List[str], extract: Callable[[str], str]) -> List[str]:
+    extract(corpus[0])  # iesildīšana (noteikumu kompilēšana, importi)
+    start = time.perf_counter()
+    results = [extract(html) for html in corpus]
+    elapsed = time.perf_counter() - start
+    print(f"{name:>8} {elapsed * 1000:10.1f} ms {len(corpus) / elapsed:10.1f} raksti/s "
+          f"{elapsed / len(corpus) * 1000:8.2f} ms/raksts")
+    return results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--corpus", default="", help="direktorija ar .html failiem")
+    parser.add_argument("--articles", type=int, default=200, help="ģenerēto rakstu skaits (bez --corpus)")
+    parser.add_argument("--size", type=int, default=20000, help="ģenerētā raksta teksta izmērs baitos")
+    parser.add_argument("--content-selector", default="article.article-body",
+                        help="satura selektors 'rule' mērījumam")
+    args = parser.parse_args()
+
+    corpus = load_corpus(args.corpus, args.articles, args.size)
+    if not corpus:
+        parser.error("korpusā nav neviena .html faila")
+    print(f"Korpuss: {len(corpus)} raksti, {sum(len(html) for html in corpus) / 1e6:.1f} MB")
+    print(f"{'metode':>8} {'kopā':>13} {'ātrums':>19} {'vidēji':>15}")
+
+    legacy = _run("legacy", corpus, legacy_extract)
+    engine = ArticleExtractor(rules={})
+    extracted = _run("engine", corpus, lambda html: engine.extract(html, BENCH_HOST))
+    with_rule = ArticleExtractor(rules={BENCH_HOST: {"content": args.content_selector}})
+    _run("rule", corpus, lambda html: with_rule.extract(html, BENCH_HOST))
+
+    mismatches = sum(1 for before, after in zip(legacy, extracted) if before != after)
+    print(f"engine rezultāts atšķiras no legacy: {mismatches} no {len(corpus)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,99 @@
+"""
+Raksta HTML atkodēšanas salīdzinājums: requests response.text pret
+app.services.charset.CharsetDetector (galvene, <meta>, domēna kešs, noteikšana
+ierobežotam fragmentam).
+
+Korpuss ir benchmarks.feed_server raksti, kodēti UTF-8 un windows-1257, ar
+trim piegādes variantiem:
+
+    header   Content-Type: text/html; charset=...
+    meta     kodējums tikai <meta charset> (galvenē text/html bez charset)
+    none     ne galvenē, ne lapā (Content-Type nav) - requests nosaka kodējumu no visas lapas
+
+Katram variantam tiek izdrukāts laiks uz rakstu, ietaupījums un cik rakstu
+atkodēti nepareizi (salīdzinot ar sākotnējo tekstu).
+
+Piemērs:
+    python -m benchmarks.charset_bench --articles 100 --size 200000
+"""
+import argparse
+import os
+import time
+from typing import Callable, List, Optional, Tuple
+
+# Iestatījumi ir obligāti app.config importam; testam tie netiek izmantoti
+for _name, _value in {
+    "POSTGRES_USER": "bench",
+    "POSTGRES_PASSWORD": "bench",
+    "POSTGRES_HOST": "localhost",
+    "POSTGRES_DB": "bench",
+    "CELERY_BROKER_URL": "memory://",
+    "CELERY_RESULT_BACKEND": "cache+memory://",
+}.items():
+    os.environ.setdefault(_name, _value)
+
+import requests  # noqa: E402
+
+from app.services.charset import CharsetDetector  # noqa: E402
+from benchmarks.feed_server import render_article  # noqa: E402
+
+# (teksts, baiti, Content-Type galvene, saimniekdators)
+Sample = Tuple[str, bytes, Optional[str], str]
+
+
+def build_corpus(articles: int, size: int, variant: str) -> List[Sample]:
+    corpus = []
+    for index in range(articles):
+        encoding = "utf-8" if index % 2 else "windows-1257"
+        html = render_article(index % 20, index, size)
+        if variant == "header":
+            html = html.replace('<meta charset="utf-8">', "")
+            content_type = f"text/html; charset={encoding}"
+        elif variant == "meta":
+            html = html.replace('<meta charset="utf-8">', f'<meta charset="{encoding}">')
+            content_type = "text/html"
+        else:
+            html = html.replace('<meta charset="utf-8">', "")
+            content_type = None
+        corpus.append((html, html.encode(encoding), content_type, f"site{index % 10}-{encoding}.example"))
+    return corpus
+
+
+def requests_text(body: bytes, content_type: Optional[str], host: str) -> str:
+    response = requests.Response()
+    response._content = body
+    if content_type:
+        response.headers["Content-Type"] = content_type
+    response.encoding = requests.utils.get_encoding_from_headers(response.headers)
+    return response.text
+
+
+def _run(corpus: List[Sample], decode: Callable[[bytes, Optional[str], str], str]) -> Tuple[float, int]:
+    start = time.perf_counter()
+    wrong = sum(1 for text, body, content_type, host in corpus if decode(body, content_type, host) != text)
+    return (time.perf_counter() - start) / len(corpus) * 1000, wrong
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--articles", type=int, default=100)
+    parser.add_argument("--size", type=int, default=100000, help="raksta teksta izmērs baitos")
+    args = parser.parse_args()
+
+    print(f"{'variants':>8} {'requests ms':>12} {'kļūdas':>7} {'detector ms':>12} {'kļūdas':>7} {'ietaupīts':>10}")
+    for variant in ("header", "meta", "none"):
+        corpus = build_corpus(args.articles, args.size, variant)
+        detector = CharsetDetector()
+
+        def detect(body: bytes, content_type: Optional[str], host: str) -> str:
+            encoding, _ = detector.detect(body, content_type, host)
+            return body.decode(encoding, errors="replace")
+
+        before, before_wrong = _run(corpus, requests_text)
+        after, after_wrong = _run(corpus, detect)
+        print(f"{variant:>8} {before:12.2f} {before_wrong:7d} {after:12.2f} {after_wrong:7d} "
+              f"{(1 - after / before) * 100 if before else 0:9.1f}%")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,115 @@
+"""
+Ierakstu datumu parsēšanas ātruma tests.
+
+Korpuss satur barotnēs reāli sastopamus datumu formātus (RFC 822 ar dažādām
+laika joslām, ISO 8601, vietējo ziņu portālu formāti). Katra "barotne"
+izmanto vienu formātu, tāpat kā īstās barotnes. Tiek salīdzināts:
+
+    dateutil      dateutil.parser.parse katram ierakstam (iepriekšējais rezerves ceļš)
+    feedparser    feedparser iekšējais datumu parsētājs
+    normalizer    app.services.dates.DateNormalizer ar barotnes formātu kešu
+
+Tiek izdrukāts arī, cik normalizer rezultātu atšķiras no dateutil UTC rezultāta.
+
+Piemērs:
+    python -m benchmarks.date_parsing_bench --items 20000
+"""
+import argparse
+import os
+import random
+import time
+from datetime import datetime, timedelta, timezone
+
+# Iestatījumi ir obligāti app.config importam; testam tie netiek izmantoti
+for _name, _value in {
+    "POSTGRES_USER": "bench",
+    "POSTGRES_PASSWORD": "bench",
+    "POSTGRES_HOST": "localhost",
+    "POSTGRES_DB": "bench",
+    "CELERY_BROKER_URL": "memory://",
+    "CELERY_RESULT_BACKEND": "cache+memory://",
+}.items():
+    os.environ.setdefault(_name, _value)
+
+from dateutil import parser as dateutil_parser  # noqa: E402
+
+from app.services.dates import DateNormalizer, to_utc  # noqa: E402
+
+_RIGA = timezone(timedelta(hours=3))
+
+# Formāti no reālām barotnēm: (nosaukums, funkcija, kas datumu pārvērš tekstā)
+CORPUS_FORMATS = [
+    ("rfc822", lambda d: d.strftime("%a, %d %b %Y %H:%M:%S +0300")),
+    ("rfc822_gmt", lambda d: d.astimezone(timezone.utc).strftime("%a, %d %b %Y %H:%M:%S GMT")),
+    ("rfc822_abbr", lambda d: d.strftime("%a, %d %b %Y %H:%M:%S EEST")),
+    ("rfc822_no_weekday", lambda d: d.strftime("%d %b %Y %H:%M:%S +0300")),
+    ("iso8601", lambda d: d.isoformat()),
+    ("iso8601_z", lambda d: d.astimezone(timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ")),
+    ("iso8601_ms", lambda d: d.isoformat(timespec="milliseconds")),
+    ("sql", lambda d: d.astimezone(timezone.utc).strftime("%Y-%m-%d %H:%M:%S")),
+    ("lv_dotted", lambda d: d.astimezone(timezone.utc).strftime("%d.%m.%Y %H:%M")),
+    ("lv_dotted_year", lambda d: d.astimezone(timezone.utc).strftime("%d.%m.%Y. %H:%M")),
+    ("us_ampm", lambda d: d.astimezone(timezone.utc).strftime("%m/%d/%Y %I:%M:%S %p")),
+    ("long_english", lambda d: d.astimezone(timezone.utc).strftime("%A, %B %d, %Y - %H:%M")),
+]
+
+
+def build_corpus(items: int, feeds: int):
+    """Atgriež (feed_id, datums) pārus; katrai barotnei ir savs formāts"""
+    rng = random.Random(42)
+    start = datetime(2026, 1, 1, tzinfo=_RIGA)
+    corpus = []
+    for index in range(items):
+        feed_id = index % feeds
+        _, render = CORPUS_FORMATS[feed_id % len(CORPUS_FORMATS)]
+        moment = start + timedelta(minutes=rng.randint(0, 60 * 24 * 300))
+        corpus.append((feed_id, render(moment)))
+    return corpus
+
+
+def _run(name: str, corpus, parse) -> dict:
+    start = time.perf_counter()
+    results = [parse(feed_id, value) for feed_id, value in corpus]
+    elapsed = time.perf_counter() - start
+    print(f"{name:>12} {elapsed * 1000:10.1f} ms {len(corpus) / elapsed:12.0f} datumi/s "
+          f"{elapsed / len(corpus) * 1e6:8.2f} µs/datums")
+    return dict(zip(range(len(corpus)), results))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--items", type=int, default=20000)
+    parser.add_argument("--feeds", type=int, default=120)
+    args = parser.parse_args()
+
+    corpus = build_corpus(args.items, args.feeds)
+    print(f"{'metode':>12} {'kopā':>13} {'ātrums':>21} {'vidēji':>17}")
+
+    baseline = _run("dateutil", corpus, lambda feed_id, value: to_utc(dateutil_parser.parse(value)))
+
+    try:
+        import feedparser
+
+        def _feedparser(feed_id, value):
+            parsed = feedparser.datetimes._parse_date(value)
+            return datetime(*parsed[0:6]) if parsed else None
+
+        _run("feedparser", corpus, _feedparser)
+    except ImportError:
+        print(f"{'feedparser':>12} nav instalēts")
+
+    normalizer = DateNormalizer()
+    normalized = _run("normalizer", corpus, normalizer.parse)
+
+    mismatches = [
+        corpus[index][1] for index, value in normalized.items()
+        if value != baseline[index]
+    ]
+    print(f"Atšķirības no dateutil: {len(mismatches)} no {len(corpus)}")
+    for value in sorted(set(mismatches))[:10]:
+        print(f"  {value!r}: dateutil={to_utc(dateutil_parser.parse(value))} "
+              f"normalizer={normalizer.parse(value)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,293 @@
+"""
+Lokāls RSS/Atom barotņu serveris veiktspējas testiem.
+
+Barotnes tiek ģenerētas deterministiski no URL parametriem, tāpēc atkārtots
+pieprasījums atgriež tos pašus ierakstus (tiek pārbaudīta dublikātu apstrāde):
+
+    /feed/<n>.xml?items=50&body=2000&tags=3&latency=0&etag=1&error_rate=0&format=rss&new_per_fetch=0
+    /article/<n>/<i>.html?size=20000
+
+Parametri:
+    items          ierakstu skaits barotnē
+    body           ieraksta apraksta (HTML) izmērs baitos
+    tags           kategoriju skaits katram ierakstam
+    latency        papildu aizture milisekundēs pirms atbildes
+    etag           1 - atbalstīt ETag / If-None-Match (304 atbildes)
+    error_rate     varbūtība (0..1), ar kādu tiek atgriezta 503 kļūda
+    format         rss vai atom
+    new_per_fetch  cik jaunu ierakstu parādās katrā nākamajā pieprasījumā
+    hub            WebSub centrmezgla URL (<link rel="hub">), piem. benchmarks.websub_hub
+
+Palaišana atsevišķi:
+    python -m benchmarks.feed_server --port 8765
+"""
+import argparse
+import hashlib
+import random
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+from email.utils import format_datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, Optional
+from urllib.parse import parse_qs, urlencode, urlparse
+from xml.sax.saxutils import escape
+
+_WORDS = (
+    "valdība ziņo par jauno budžetu sportā pilsētā šodien ekonomika tirgus "
+    "tehnoloģijas pētījums universitāte kultūra koncerts laikapstākļi vētra "
+    "uzņēmums investīcijas likums saeima ministrija skola veselība slimnīca"
+).split()
+
+_EPOCH = datetime(2026, 1, 1, tzinfo=timezone.utc)
+
+
+def _text(rng: random.Random, size: int) -> str:
+    parts = []
+    length = 0
+    while length < size:
+        word = rng.choice(_WORDS)
+        parts.append(word)
+        length += len(word) + 1
+    return " ".join(parts)
+
+
+def _html_body(rng: random.Random, size: int) -> str:
+    paragraphs = []
+    remaining = size
+    while remaining > 0:
+        chunk = _text(rng, min(400, remaining))
+        paragraphs.append(f"<p>{escape(chunk)}</p>")
+        remaining -= len(chunk) + 7
+    return "".join(paragraphs)
+
+
+class FeedState:
+    """Serveris skaita katras barotnes pieprasījumus, lai varētu parādīt jaunus ierakstus"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._fetches: Dict[str, int] = {}
+        self.requests = 0
+        self.not_modified = 0
+        self.errors = 0
+        self.bytes_sent = 0
+
+    def next_fetch(self, key: str) -> int:
+        with self._lock:
+            count = self._fetches.get(key, 0)
+            self._fetches[key] = count + 1
+            self.requests += 1
+            return count
+
+    def record(self, status: int, size: int) -> None:
+        with self._lock:
+            self.bytes_sent += size
+            if status == 304:
+                self.not_modified += 1
+            elif status >= 500:
+                self.errors += 1
+
+
+def render_feed(base_url: str, feed_no: int, params: Dict[str, str], fetch_no: int) -> str:
+    items = int(params.get("items", 50))
+    body = int(params.get("body", 2000))
+    tags = int(params.get("tags", 3))
+    fmt = params.get("format", "rss")
+    new_per_fetch = int(params.get("new_per_fetch", 0))
+    hub = params.get("hub")
+    self_url = f"{base_url}/feed/{feed_no}.xml?{urlencode(params)}"
+
+    # Jaunākais ieraksts ir pirmais; katrs pieprasījums pabīda logu par new_per_fetch
+    newest = items + fetch_no * new_per_fetch
+    entries = []
+    for index in range(newest, newest - items, -1):
+        rng = random.Random(f"{feed_no}:{index}")
+        published = _EPOCH + timedelta(minutes=index * 7)
+        entries.append({
+            "id": f"urn:bench:{feed_no}:{index}",
+            "title": _text(rng, 60),
+            "link": f"{base_url}/article/{feed_no}/{index}.html",
+            "published": published,
+            "summary": _html_body(rng, body),
+            "tags": [f"Tēma {rng.randint(1, 200)}" for _ in range(tags)],
+            "author": f"Autors {rng.randint(1, 30)}",
+        })
+
+    if fmt == "atom":
+        parts = [
+            '<?xml version="1.0" encoding="utf-8"?>',
+            '<feed xmlns="http://www.w3.org/2005/Atom" xml:lang="lv">',
+            f"<title>Testa barotne {feed_no}</title>",
+            f'<link href="{base_url}/site/{feed_no}"/>',
+            f"<id>urn:bench:{feed_no}</id>",
+            f"<updated>{_EPOCH.isoformat()}</updated>",
+        ]
+        if hub:
+            parts.append(f'<link rel="hub" href="{escape(hub)}"/>')
+            parts.append(f'<link rel="self" href="{escape(self_url)}"/>')
+        for entry in entries:
+            parts.append("<entry>")
+            parts.append(f"<id>{entry['id']}</id>")
+            parts.append(f"<title>{escape(entry['title'])}</title>")
+            parts.append(f'<link rel="alternate" href="{entry["link"]}"/>')
+            parts.append(f"<published>{entry['published'].isoformat()}</published>")
+            parts.append(f"<updated>{entry['published'].isoformat()}</updated>")
+            parts.append(f"<author><name>{escape(entry['author'])}</name></author>")
+            for tag in entry["tags"]:
+                parts.append(f'<category term="{escape(tag)}"/>')
+            parts.append(f'<summary type="html">{escape(entry["summary"])}</summary>')
+            parts.append("</entry>")
+        parts.append("</feed>")
+    else:
+        parts = [
+            '<?xml version="1.0" encoding="utf-8"?>',
+            '<rss version="2.0" xmlns:atom="http://www.w3.org/2005/Atom"><channel>',
+            f"<title>Testa barotne {feed_no}</title>",
+            f"<link>{base_url}/site/{feed_no}</link>",
+            "<description>Sintētiska barotne veiktspējas testiem</description>",
+            "<language>lv</language>",
+        ]
+        if hub:
+            parts.append(f'<atom:link rel="hub" href="{escape(hub)}"/>')
+            parts.append(f'<atom:link rel="self" href="{escape(self_url)}"/>')
+        for entry in entries:
+            parts.append("<item>")
+            parts.append(f'<guid isPermaLink="false">{entry["id"]}</guid>')
+            parts.append(f"<title>{escape(entry['title'])}</title>")
+            parts.append(f"<link>{entry['link']}</link>")
+            parts.append(f"<pubDate>{format_datetime(entry['published'])}</pubDate>")
+            parts.append(f"<author>{escape(entry['author'])}</author>")
+            for tag in entry["tags"]:
+                parts.append(f"<category>{escape(tag)}</category>")
+            parts.append(f"<description>{escape(entry['summary'])}</description>")
+            parts.append("</item>")
+        parts.append("</channel></rss>")
+    return "\n".join(parts)
+
+
+def render_article(feed_no: int, index: int, size: int) -> str:
+    rng = random.Random(f"article:{feed_no}:{index}")
+    nav = "".join(f'<li><a href="/x/{i}">{_text(rng, 12)}</a></li>' for i in range(30))
+    return (
+        "<!DOCTYPE html><html><head><meta charset=\"utf-8\">"
+        f"<title>Raksts {feed_no}/{index}</title>"
+        "<script>window.analytics = {};</script><style>body{font-family:sans-serif}</style>"
+        "</head><body>"
+        f"<header><nav><ul>{nav}</ul></nav></header>"
+        "<div class=\"ads banner\">Reklāma</div>"
+        f"<article class=\"article-body\"><h1>{_text(rng, 60)}</h1>{_html_body(rng, size)}</article>"
+        f"<aside class=\"sidebar\">{_html_body(rng, 800)}</aside>"
+        "<footer>© Testa izdevējs</footer>"
+        "</body></html>"
+    )
+
+
+def make_handler(state: FeedState):
+    class FeedHandler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def log_message(self, format, *args):  # noqa: A002 - BaseHTTPRequestHandler paraksts
+            pass
+
+        def _send(self, status: int, body: bytes = b"", content_type: str = "text/plain",
+                  headers: Optional[Dict[str, str]] = None) -> None:
+            self.send_response(status)
+            self.send_header("Content-Type", content_type)
+            self.send_header("Content-Length", str(len(body)))
+            for name, value in (headers or {}).items():
+                self.send_header(name, value)
+            self.end_headers()
+            if body and self.command != "HEAD":
+                self.wfile.write(body)
+            state.record(status, len(body))
+
+        def do_GET(self):
+            url = urlparse(self.path)
+            params = {key: values[-1] for key, values in parse_qs(url.query).items()}
+            segments = [segment for segment in url.path.split("/") if segment]
+
+            latency = float(params.get("latency", 0)) / 1000
+            if latency:
+                time.sleep(latency)
+
+            try:
+                if len(segments) == 2 and segments[0] == "feed":
+                    self._serve_feed(int(segments[1].split(".")[0]), params)
+                elif len(segments) == 3 and segments[0] == "article":
+                    size = int(params.get("size", 20000))
+                    body = render_article(int(segments[1]), int(segments[2].split(".")[0]), size).encode("utf-8")
+                    self._send(200, body, "text/html; charset=utf-8")
+                else:
+                    self._send(404, b"not found")
+            except ValueError:
+                self._send(400, b"bad request")
+
+        def _serve_feed(self, feed_no: int, params: Dict[str, str]) -> None:
+            fetch_no = state.next_fetch(f"{feed_no}:{sorted(params.items())}")
+            error_rate = float(params.get("error_rate", 0))
+            if error_rate and random.Random(f"err:{feed_no}:{fetch_no}").random() < error_rate:
+                self._send(503, b"temporarily unavailable")
+                return
+
+            base_url = f"http://{self.headers.get('Host')}"
+            body = render_feed(base_url, feed_no, params, fetch_no).encode("utf-8")
+            content_type = "application/atom+xml" if params.get("format") == "atom" else "application/rss+xml"
+
+            headers = {}
+            if params.get("etag", "0") == "1":
+                etag = '"' + hashlib.sha1(body).hexdigest() + '"'
+                headers["ETag"] = etag
+                if self.headers.get("If-None-Match") == etag:
+                    self._send(304, headers=headers)
+                    return
+
+            self._send(200, body, f"{content_type}; charset=utf-8", headers)
+
+    return FeedHandler
+
+
+class FeedServer:
+    """Palaiž serveri fona pavedienā; izmantojams kā konteksta pārvaldnieks"""
+
+    def __init__(self, host: str = "127.0.0.1", port: int = 0):
+        self.state = FeedState()
+        self.httpd = ThreadingHTTPServer((host, port), make_handler(self.state))
+        self.httpd.daemon_threads = True
+        self._thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+
+    @property
+    def base_url(self) -> str:
+        host, port = self.httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def feed_url(self, feed_no: int, **params) -> str:
+        query = "&".join(f"{key}={value}" for key, value in params.items())
+        return f"{self.base_url}/feed/{feed_no}.xml" + (f"?{query}" if query else "")
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    args = parser.parse_args()
+
+    with FeedServer(args.host, args.port) as server:
+        print(f"Barotņu serveris darbojas: {server.feed_url(1, items=50)}")
+        try:
+            while True:
+                time.sleep(3600)
+        except KeyboardInterrupt:
+            pass
+
+
+if __name__ == "__main__":
+    main()
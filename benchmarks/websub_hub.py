@@ -0,0 +1,199 @@
+"""
+Lokāls WebSub centrmezgls testiem (vienkāršota https://www.w3.org/TR/websub/ realizācija).
+
+    POST /            abonēšana: hub.mode=subscribe|unsubscribe, hub.topic, hub.callback,
+                      hub.secret, hub.lease_seconds. Atbilde 202, pēc tam centrmezgls
+                      apstiprina abonementu ar GET uz hub.callback (hub.challenge).
+    POST /publish     hub.topic (forma vai URL parametrs): centrmezgls nolasa tēmas
+                      URL un piegādā saturu visiem apstiprinātajiem abonentiem ar
+                      X-Hub-Signature: sha256=<hmac>.
+    GET /subscriptions apstiprināto abonementu saraksts (JSON)
+
+Kopā ar benchmarks.feed_server (parametrs hub=<centrmezgla URL>) barotnes
+reklamē šo centrmezglu, un servisu var pārbaudīt bez ārēja centrmezgla:
+
+    python -m benchmarks.websub_hub --port 8766
+    curl -X POST 'http://127.0.0.1:8766/publish?hub.topic=<barotnes URL>'
+"""
+import argparse
+import hashlib
+import hmac
+import json
+import secrets
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, Tuple
+from urllib.parse import parse_qs, urlencode, urlparse
+from urllib.request import Request, urlopen
+
+_TIMEOUT = 10
+
+
+class HubState:
+    """Apstiprinātie abonementi: (tēma, callback) -> noslēpums"""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.subscriptions: Dict[Tuple[str, str], str] = {}
+        self.verified = 0
+        self.delivered = 0
+        self.failed = 0
+
+    def subscribers(self, topic: str) -> Dict[str, str]:
+        with self.lock:
+            return {callback: secret for (key, callback), secret in self.subscriptions.items() if key == topic}
+
+
+def verify_intent(state: HubState, params: Dict[str, str]) -> bool:
+    """Apstiprina abonēšanas nolūku: abonentam jāatgriež tas pats hub.challenge"""
+    mode, topic, callback = params["hub.mode"], params["hub.topic"], params["hub.callback"]
+    challenge = secrets.token_urlsafe(16)
+    query = {"hub.mode": mode, "hub.topic": topic, "hub.challenge": challenge}
+    if mode == "subscribe":
+        query["hub.lease_seconds"] = params.get("hub.lease_seconds", "864000")
+    separator = "&" if urlparse(callback).query else "?"
+    try:
+        with urlopen(f"{callback}{separator}{urlencode(query)}", timeout=_TIMEOUT) as response:
+            confirmed = 200 <= response.status < 300 and response.read().decode().strip() == challenge
+    except OSError:
+        confirmed = False
+
+    with state.lock:
+        if confirmed and mode == "subscribe":
+            state.subscriptions[(topic, callback)] = params.get("hub.secret", "")
+        elif confirmed:
+            state.subscriptions.pop((topic, callback), None)
+        state.verified += confirmed
+    return confirmed
+
+
+def publish(state: HubState, topic: str) -> int:
+    """Nolasa tēmu un piegādā to abonentiem; atgriež veiksmīgo piegāžu skaitu"""
+    with urlopen(topic, timeout=_TIMEOUT) as response:
+        body = response.read()
+        content_type = response.headers.get("Content-Type", "application/xml")
+
+    subscribers = state.subscribers(topic)
+    delivered = 0
+    for callback, secret in subscribers.items():
+        headers = {
+            "Content-Type": content_type,
+            "Link": f'<{topic}>; rel="self"',
+        }
+        if secret:
+            signature = hmac.new(secret.encode(), body, hashlib.sha256).hexdigest()
+            headers["X-Hub-Signature"] = f"sha256={signature}"
+        try:
+            with urlopen(Request(callback, data=body, headers=headers, method="POST"), timeout=_TIMEOUT) as reply:
+                delivered += 200 <= reply.status < 300
+        except OSError:
+            pass
+    with state.lock:
+        state.delivered += delivered
+        state.failed += len(subscribers) - delivered
+    return delivered
+
+
+def make_handler(state: HubState):
+    class HubHandler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def log_message(self, format, *args):  # noqa: A002 - BaseHTTPRequestHandler paraksts
+            pass
+
+        def _send(self, status: int, body: bytes = b"", content_type: str = "text/plain") -> None:
+            self.send_response(status)
+            self.send_header("Content-Type", content_type)
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def _params(self) -> Dict[str, str]:
+            url = urlparse(self.path)
+            length = int(self.headers.get("Content-Length", 0))
+            form = self.rfile.read(length).decode("utf-8") if length else ""
+            params = {key: values[0] for key, values in parse_qs(url.query).items()}
+            params.update({key: values[0] for key, values in parse_qs(form).items()})
+            return params
+
+        def do_GET(self):
+            if urlparse(self.path).path == "/subscriptions":
+                with state.lock:
+                    body = json.dumps([
+                        {"topic": topic, "callback": callback} for topic, callback in state.subscriptions
+                    ])
+                self._send(200, body.encode(), "application/json")
+            else:
+                self._send(404)
+
+        def do_POST(self):
+            path = urlparse(self.path).path
+            params = self._params()
+            if path == "/publish":
+                topic = params.get("hub.topic") or params.get("hub.url")
+                if not topic:
+                    self._send(400, b"hub.topic is required")
+                    return
+                try:
+                    delivered = publish(state, topic)
+                except OSError as e:
+                    self._send(502, str(e).encode())
+                    return
+                self._send(200, json.dumps({"delivered": delivered}).encode(), "application/json")
+                return
+
+            if path != "/" or params.get("hub.mode") not in ("subscribe", "unsubscribe") \
+                    or not params.get("hub.topic") or not params.get("hub.callback"):
+                self._send(400, b"hub.mode, hub.topic and hub.callback are required")
+                return
+            # Apstiprināšana notiek asinhroni, kā to dara īsti centrmezgli
+            threading.Thread(target=verify_intent, args=(state, params), daemon=True).start()
+            self._send(202)
+
+    return HubHandler
+
+
+class WebSubHub:
+    """Palaiž centrmezglu fona pavedienā; izmantojams kā konteksta pārvaldnieks"""
+
+    def __init__(self, host: str = "127.0.0.1", port: int = 0):
+        self.state = HubState()
+        self.httpd = ThreadingHTTPServer((host, port), make_handler(self.state))
+        self.httpd.daemon_threads = True
+        self._thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+
+    @property
+    def url(self) -> str:
+        host, port = self.httpd.server_address[:2]
+        return f"http://{host}:{port}/"
+
+    def publish(self, topic: str) -> int:
+        return publish(self.state, topic)
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8766)
+    args = parser.parse_args()
+
+    with WebSubHub(args.host, args.port) as hub:
+        print(f"WebSub centrmezgls darbojas: {hub.url}")
+        try:
+            while True:
+                time.sleep(3600)
+        except KeyboardInterrupt:
+            pass
+
+
+if __name__ == "__main__":
+    main()
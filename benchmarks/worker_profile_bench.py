@@ -0,0 +1,143 @@
+"""
+Celery darbinieku profilu slodzes tests: caurlaidspēja (uzdevumi/s) katras
+rindas darba slodzei ar dažādiem pūla veidiem.
+
+Darba slodzes atbilst uzdevumu ķermeņiem bez datubāzes un brokera:
+
+    content  raksta lejupielāde (download_article, kā fetch_full_article_content)
+    extract  kodējuma noteikšana un teksta izgūšana no jau lejupielādēta HTML
+             (extract_article_text, kā extract_article_content)
+    feeds    barotnes lejupielāde un straumēta parsēšana (parse_feed_stream)
+
+Pūli atdarina Celery pūlus: solo (viens pēc otra), prefork (procesu pūls) un
+threads (pavedienu pūls). Lejupielādes latentums tiek simulēts ar
+benchmarks.feed_server parametru latency (extract slodzei tā nav nozīmes). Ar *
+atzīmēts pūls, kuru izmanto celeryworker.py profils attiecīgajai rindai.
+
+Piemērs:
+    python -m benchmarks.worker_profile_bench --tasks 400 --latency 200 --threads 8,32,64
+
+Mērījums 1 CPU kodolā (--tasks 200 --latency 200 --threads 8,32), extract slodze:
+solo 44 uzd./s (p95 26 ms), threads 8 - 44 uzd./s (p95 260 ms), threads 32 -
+39 uzd./s (p95 1414 ms), CPU visos ~90-99%. Izgūšana (~22 ms CPU rakstam) pavedienos
+nekļūst ātrāka, tikai palielinās gaidīšana, tāpēc tā ir atsevišķā prefork rindā, kur
+paralēlums aug ar kodolu skaitu. content (tikai lejupielāde) ar 32 pavedieniem -
+82 uzd./s pie 56% CPU.
+"""
+import argparse
+import os
+import resource
+import time
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Any, Callable, List, Optional, Tuple
+
+# Iestatījumi ir obligāti app.config importam; testam tie netiek izmantoti
+for _name, _value in {
+    "POSTGRES_USER": "bench",
+    "POSTGRES_PASSWORD": "bench",
+    "POSTGRES_HOST": "localhost",
+    "POSTGRES_DB": "bench",
+    "CELERY_BROKER_URL": "memory://",
+    "CELERY_RESULT_BACKEND": "cache+memory://",
+}.items():
+    os.environ.setdefault(_name, _value)
+
+from app.services.feed_stream import parse_feed_stream  # noqa: E402
+from app.services.http_client import get_session  # noqa: E402
+from app.services.profiling import percentile  # noqa: E402
+from app.tasks.celery_tasks import download_article, extract_article_text  # noqa: E402
+from benchmarks.feed_server import FeedServer  # noqa: E402
+from celeryworker import worker_profiles  # noqa: E402
+
+
+def content_task(url: str) -> float:
+    start = time.perf_counter()
+    download_article(url)
+    return time.perf_counter() - start
+
+
+def extract_task(article: Tuple[bytes, str]) -> float:
+    content, content_type = article
+    start = time.perf_counter()
+    extract_article_text(content, content_type, "localhost")
+    return time.perf_counter() - start
+
+
+def feeds_task(url: str) -> float:
+    start = time.perf_counter()
+    response = get_session().get(url, timeout=30)
+    response.raise_for_status()
+    parse_feed_stream([response.content], refetch=lambda: [response.content])
+    return time.perf_counter() - start
+
+
+WORKLOADS = {"content": content_task, "extract": extract_task, "feeds": feeds_task}
+
+
+def _cpu_seconds() -> float:
+    usage = [resource.getrusage(who) for who in (resource.RUSAGE_SELF, resource.RUSAGE_CHILDREN)]
+    return sum(item.ru_utime + item.ru_stime for item in usage)
+
+
+def run(task: Callable[[Any], float], inputs: List[Any], executor: Optional[Executor]) -> Tuple[float, float, List[float]]:
+    """Atgriež (sienas pulksteņa laiks, CPU laiks, uzdevumu ilgumi)"""
+    cpu_start = _cpu_seconds()
+    start = time.perf_counter()
+    if executor is None:
+        durations = [task(item) for item in inputs]
+    else:
+        with executor:
+            durations = list(executor.map(task, inputs))
+    return time.perf_counter() - start, _cpu_seconds() - cpu_start, durations
+
+
+def build_inputs(server: FeedServer, workload: str, tasks: int, latency: int, size: int, items: int) -> List[Any]:
+    if workload == "content":
+        return [f"{server.base_url}/article/{index % 50}/{index}.html?size={size}&latency={latency}"
+                for index in range(tasks)]
+    if workload == "extract":
+        # Raksti tiek lejupielādēti iepriekš; mērīta tiek tikai izgūšana
+        articles = []
+        for index in range(min(tasks, 50)):
+            response, content = download_article(f"{server.base_url}/article/{index}/{index}.html?size={size}")
+            articles.append((content, response.headers.get("Content-Type")))
+        return [articles[index % len(articles)] for index in range(tasks)]
+    return [server.feed_url(index, items=items, body=2000, latency=latency) for index in range(tasks)]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--tasks", type=int, default=200, help="uzdevumu skaits katram mērījumam")
+    parser.add_argument("--latency", type=int, default=200, help="servera aizture milisekundēs")
+    parser.add_argument("--size", type=int, default=50000, help="raksta izmērs baitos")
+    parser.add_argument("--items", type=int, default=50, help="ierakstu skaits barotnē")
+    parser.add_argument("--processes", type=int, default=os.cpu_count() or 2)
+    parser.add_argument("--threads", default="8,32", help="pavedienu skaiti, atdalīti ar komatu")
+    parser.add_argument("--workloads", default="content,extract,feeds")
+    args = parser.parse_args()
+
+    profiles = worker_profiles()
+    pools = [("solo", 1), ("prefork", args.processes)]
+    pools += [("threads", int(count)) for count in args.threads.split(",") if count]
+
+    print(f"{'rinda':>8} {'pūls':>10} {'paralēli':>8} {'uzd./s':>8} {'p50 ms':>8} {'p95 ms':>8} {'CPU %':>7}")
+    with FeedServer() as server:
+        for workload in args.workloads.split(","):
+            inputs = build_inputs(server, workload, args.tasks, args.latency, args.size, args.items)
+            profile_pool = profiles[workload]["pool"]
+            for pool, workers in pools:
+                if pool == "solo":
+                    executor = None
+                elif pool == "prefork":
+                    executor = ProcessPoolExecutor(max_workers=workers)
+                else:
+                    executor = ThreadPoolExecutor(max_workers=workers)
+                elapsed, cpu, durations = run(WORKLOADS[workload], inputs, executor)
+                marker = "*" if pool == profile_pool else " "
+                print(f"{workload:>8} {pool + marker:>10} {workers:8d} {len(inputs) / elapsed:8.1f} "
+                      f"{percentile(durations, 0.5) * 1000:8.1f} {percentile(durations, 0.95) * 1000:8.1f} "
+                      f"{cpu / elapsed * 100:6.0f}%")
+
+
+if __name__ == "__main__":
+    main()
@@ -4,13 +4,21 @@ from app.config import settings
 # Celery brokera un rezultātu datubāzes adreses
 broker_url = settings.CELERY_BROKER_URL
 result_backend = settings.CELERY_RESULT_BACKEND
+# Lielākā daļa uzdevumu ir ar ignore_result=True (sk. app.tasks.celery_tasks); pārējo
+# rezultāti tiek dzēsti pēc CELERY_RESULT_EXPIRES sekundēm
+result_expires = settings.CELERY_RESULT_EXPIRES
 
 # Uzdevumu maršruti
 task_routes = {
     'collect_all_rss_feeds': {'queue': 'feeds'},
     'collect_single_rss_feed': {'queue': 'feeds'},
+    'collect_rss_feed_batch': {'queue': 'feeds'},
+    'websub_subscribe': {'queue': 'feeds'},
+    'ingest_websub_push': {'queue': 'feeds'},
+    'renew_websub_subscriptions': {'queue': 'maintenance'},
     'cleanup_old_entries': {'queue': 'maintenance'},
     'fetch_full_article_content': {'queue': 'content'},
+    'extract_article_content': {'queue': 'extract'},
 }
 
 # Darbu izsaukšanas grafiks
@@ -25,11 +33,26 @@ beat_schedule = {
         'schedule': crontab(minute=0, hour=3),  # Katru dienu plkst. 3:00
         'kwargs': {'days': 30},  # Parametri uzdevumam
     },
+    'renew-websub-subscriptions-hourly': {
+        'task': 'renew_websub_subscriptions',
+        'schedule': crontab(minute=15),  # Katru stundu
+    },
 }
 
-# Celery darbinieku konfigurācija
+# Celery darbinieku konfigurācija (noklusējumi; rindu profili - celeryworker.py worker_profiles)
 worker_concurrency = 2 # Vienlaicīgo procesu skaits
 worker_max_tasks_per_child = 1000  # Pārstartē darbinieku pēc 1000 uzdevumiem
+worker_prefetch_multiplier = 1  # Iepriekš paņemti uzdevumi apietu prioritātes
+
+# Uzdevumu prioritātes (content rindā jaunākie raksti pirmie). Redis brokerī katrai
+# prioritātes pakāpei ir savs saraksts, un 0 ir augstākā prioritāte.
+broker_transport_options = {
+    'priority_steps': [0, 3, 6, 9],
+    'sep': ':',
+    'queue_order_strategy': 'priority',
+}
+task_queue_max_priority = 10  # RabbitMQ brokerim
+task_default_priority = 5
 
 # Celery monitoringa konfigurācija - Flower
 flower_basic_auth = None  # Piemērs: ['admin:password']
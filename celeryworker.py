@@ -1,11 +1,43 @@
+"""
+Celery darbinieks. Katrai rindai ir savs profils (pūla veids, paralēlums un prefetch):
+
+    python celeryworker.py profile content       # raksti: tīkla gaidīšana, pavedienu pūls
+    python celeryworker.py profile extract       # rakstu teksta izgūšana: CPU, prefork procesi
+    python celeryworker.py profile feeds         # barotnes: parsēšana, prefork procesi
+    python celeryworker.py profile maintenance   # tīrīšana un WebSub atjaunošana, viens process
+    python celeryworker.py profile all           # visas rindas vienā darbiniekā (izstrādei)
+
+Papildu argumenti tiek nodoti celery worker un pārraksta profila vērtības, piem.
+`python celeryworker.py profile content --concurrency 64`. Tieša palaišana
+`celery -A celeryworker worker ...` arī darbojas ar celeryconfig noklusējumiem.
+"""
 import os
+import sys
+import time
 from celery import Celery
+from celery.signals import (
+    task_postrun,
+    task_prerun,
+    worker_init,
+    worker_process_init,
+    worker_process_shutdown,
+)
 
 # Iestatām vides mainīgos
 os.environ.setdefault('PYTHONPATH', '.')
 
 # Importējam uzdevumus tieši
-from app.tasks.celery_tasks import collect_all_rss_feeds, collect_single_rss_feed, cleanup_old_entries, fetch_full_article_content
+from app.tasks.celery_tasks import (
+    collect_all_rss_feeds,
+    collect_single_rss_feed,
+    collect_rss_feed_batch,
+    cleanup_old_entries,
+    extract_article_content,
+    fetch_full_article_content,
+    ingest_websub_push,
+    renew_websub_subscriptions,
+    websub_subscribe,
+)
 
 # Izveidojam Celery instanci
 celery = Celery("rss_service")
@@ -13,11 +45,139 @@ celery = Celery("rss_service")
 # Ielādējam konfigurāciju
 celery.config_from_object("celeryconfig")
 
+
+# Celery darbiniekiem izmantojam atsevišķu datubāzes dzinēja profilu
+@worker_init.connect
+def _configure_db_for_worker(**kwargs):
+    from app.models.database import configure_worker_engine
+    configure_worker_engine()
+
+
+@worker_process_init.connect
+def _configure_db_for_worker_process(**kwargs):
+    # prefork bērnprocess nedrīkst izmantot no vecākprocesa mantotos savienojumus
+    from app.models.database import configure_worker_engine
+    configure_worker_engine()
+
+
+@worker_init.connect
+def _start_metrics_server(**kwargs):
+    # Galvenais process eksportē metrikas no visiem bērnprocesiem (PROMETHEUS_MULTIPROC_DIR)
+    from app.config import settings
+    if settings.CELERY_METRICS_PORT:
+        from prometheus_client import start_http_server
+        from app.metrics import get_registry
+        start_http_server(settings.CELERY_METRICS_PORT, registry=get_registry())
+
+
+@worker_process_shutdown.connect
+def _mark_metrics_process_dead(pid=None, **kwargs):
+    if os.environ.get("PROMETHEUS_MULTIPROC_DIR"):
+        from prometheus_client import multiprocess
+        multiprocess.mark_process_dead(pid or os.getpid())
+
+
+# Uzdevumu izpildes ilguma uzskaite
+_task_started = {}
+
+
+@task_prerun.connect
+def _task_started_at(task_id=None, **kwargs):
+    _task_started[task_id] = time.perf_counter()
+
+
+@task_postrun.connect
+def _task_finished(task_id=None, task=None, state=None, **kwargs):
+    started = _task_started.pop(task_id, None)
+    if started is None or task is None:
+        return
+    from app.metrics import CELERY_TASK_SECONDS
+    delivery_info = getattr(task.request, "delivery_info", None) or {}
+    queue = delivery_info.get("routing_key") or "unknown"
+    CELERY_TASK_SECONDS.labels(task.name, queue, state or "UNKNOWN").observe(time.perf_counter() - started)
+
+
 # Reģistrējam uzdevumus manuāli
 # celery.task(collect_all_rss_feeds)
 # celery.task(collect_single_rss_feed)
+# celery.task(collect_rss_feed_batch)
 # celery.task(cleanup_old_entries)
 # celery.task(fetch_full_article_content)
 
+
+def worker_profiles():
+    """
+    Darbinieku profili pa rindām. content uzdevums tikai lejupielādē raksta HTML un
+    lielāko daļu laika gaida tīklu (un ātruma limitu), tāpēc pavedienu pūls ar lielu
+    paralēlumu. Teksta izgūšana (readability lielākoties ir Python kods un tur GIL)
+    notiek extract rindā prefork procesos - pavedienu pūlā tā būtu serializēta.
+    gevent/eventlet netiek izmantoti, jo psycopg2 un lxml nesadarbojas ar to notikumu
+    cilpu. feeds uzdevumi lejupielādē barotnes paši savā pavedienu pūlā
+    (RSS_CONCURRENT_REQUESTS), bet parsēšana un saglabāšana noslogo CPU - tiem prefork
+    procesi, kuru skaits mainās (autoscale) no 1 līdz CPU kodolu skaitam, jo ievākšana
+    notiek periodiski. prefetch 1 saglabā content prioritāšu secību un neaizņem garus
+    feeds uzdevumus darbiniekā, kas ir aizņemts.
+    
+    task_time_limit un task_soft_time_limit (celeryconfig) piemēro tikai prefork pūls
+    (feeds, extract un all). threads un solo pūls uzdevumu nepārtrauc, tāpēc content un
+    maintenance rindā drīkst būt tikai uzdevumi ar saviem cietajiem noilgumiem:
+    fetch_full_article_content ierobežo RSS_REQUEST_TIMEOUT katrai tīkla operācijai,
+    ARTICLE_FETCH_DEADLINE visai lejupielādei un CONTENT_RATE_LIMIT_REDIS_TIMEOUT Redis
+    vaicājumam; maintenance uzdevumi strādā tikai ar datubāzi un brokeri. CPU darbs un
+    uzdevumi, kas paļaujas uz Celery laika limitu, pieder prefork rindām.
+    """
+    from app.config import settings
+    cpu = settings.CELERY_CPU_CONCURRENCY or os.cpu_count() or 2
+    return {
+        "content": {"queues": ["content"], "pool": "threads",
+                    "concurrency": settings.CELERY_IO_CONCURRENCY, "prefetch_multiplier": 1},
+        "feeds": {"queues": ["feeds"], "pool": "prefork", "concurrency": cpu, "autoscale": (cpu, 1),
+                  "prefetch_multiplier": 1, "max_tasks_per_child": 1000},
+        "extract": {"queues": ["extract"], "pool": "prefork", "concurrency": cpu,
+                    "prefetch_multiplier": 1, "max_tasks_per_child": 1000},
+        "maintenance": {"queues": ["maintenance"], "pool": "solo",
+                        "concurrency": 1, "prefetch_multiplier": 1},
+        "all": {"queues": ["feeds", "maintenance", "content", "extract"], "pool": "prefork",
+                "concurrency": 2, "prefetch_multiplier": 1, "max_tasks_per_child": 1000},
+    }
+
+
+def profile_argv(name: str, extra=()) -> list:
+    """
+    celery worker argumenti profilam; extra tiek pievienoti beigās un pārraksta profilu
+    """
+    profile = worker_profiles()[name]
+    argv = [
+        "worker",
+        "--loglevel=info",
+        f"--hostname={name}@%h",
+        f"--queues={','.join(profile['queues'])}",
+        f"--pool={profile['pool']}",
+        f"--prefetch-multiplier={profile['prefetch_multiplier']}",
+    ]
+    if "autoscale" in profile:
+        argv.append("--autoscale={},{}".format(*profile["autoscale"]))
+    else:
+        argv.append(f"--concurrency={profile['concurrency']}")
+    if "max_tasks_per_child" in profile:
+        argv.append(f"--max-tasks-per-child={profile['max_tasks_per_child']}")
+    return argv + list(extra)
+
+
+def run_profile(name: str, extra=()) -> None:
+    profiles = worker_profiles()
+    if name not in profiles:
+        raise SystemExit(f"Nezināms darbinieka profils '{name}'; pieejamie: {', '.join(profiles)}")
+    profile = profiles[name]
+    if profile["pool"] == "threads":
+        # Pavedieni dala vienu dzinēju: QueuePool režīmā pūlam jābūt ne mazākam par paralēlumu
+        from app.config import settings
+        settings.CELERY_DB_POOL_SIZE = max(settings.CELERY_DB_POOL_SIZE, profile["concurrency"])
+    celery.worker_main(profile_argv(name, extra))
+
+
 if __name__ == '__main__':
-    celery.start()
\ No newline at end of file
+    if len(sys.argv) > 2 and sys.argv[1] == "profile":
+        run_profile(sys.argv[2], sys.argv[3:])
+    else:
+        celery.start()
\ No newline at end of file
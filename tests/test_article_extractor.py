@@ -0,0 +1,48 @@
+from app.services.article_extractor import ArticleExtractor
+
+PARAGRAPH = "Rīgas domes sēdē deputāti apsprieda jaunā tilta būvniecības plānu un tā finansējumu. "
+
+ARTICLE_HTML = f"""<?xml version="1.0" encoding="utf-8"?>
+<html>
+<head><title>Ziņa</title><script>var tracking = 1;</script></head>
+<body>
+<nav><a href="/">Sākums</a> <a href="/zinas">Ziņas</a></nav>
+<div class="sidebar-ads">Reklāma</div>
+<article class="story">
+<h1>Virsraksts</h1>
+<div class="story__body">
+<p>{PARAGRAPH * 4}</p>
+<p>{PARAGRAPH * 3}</p>
+<div class="related">Saistītie raksti</div>
+</div>
+</article>
+<footer>Visas tiesības aizsargātas</footer>
+</body>
+</html>"""
+
+
+def test_extract_without_rule_uses_readability():
+    text = ArticleExtractor(rules={}).extract(ARTICLE_HTML, "news.example.com")
+    
+    assert PARAGRAPH.strip() in text
+    assert "var tracking" not in text
+    assert "Reklāma" not in text
+    assert not text.startswith("kļūda")
+
+
+def test_extract_with_content_rule():
+    extractor = ArticleExtractor(rules={
+        "example.com": {"content": "article .story__body", "remove": [".related"]},
+    })
+    text = extractor.extract(ARTICLE_HTML, "www.example.com")
+    
+    assert text.split("\n")[0] == (PARAGRAPH * 4).strip()
+    assert "Saistītie raksti" not in text
+    assert "Virsraksts" not in text
+
+
+def test_content_rule_without_match_falls_back_to_readability():
+    extractor = ArticleExtractor(rules={"example.com": {"content": ".missing"}})
+    text = extractor.extract(ARTICLE_HTML, "example.com")
+    
+    assert PARAGRAPH.strip() in text
@@ -0,0 +1,132 @@
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from types import SimpleNamespace
+
+import pytest
+
+from app.services import payloads
+from app.services.feed_stream import FeedDeadlineExceeded, FeedTooLarge
+from app.tasks import celery_tasks
+
+
+class SlowHandler(BaseHTTPRequestHandler):
+    """Atbild ar 200, bet saturu sūta pa vienam baitam - katra lasīšana iekļaujas noilgumā"""
+    
+    def do_GET(self):
+        self.send_response(200)
+        self.send_header("Content-Type", "text/html; charset=utf-8")
+        if self.path == "/large":
+            self.send_header("Content-Length", "100000")
+            self.end_headers()
+            return
+        self.end_headers()
+        try:
+            for _ in range(100):
+                self.wfile.write(b"x")
+                self.wfile.flush()
+                time.sleep(0.1)
+        except OSError:
+            pass
+    
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def server():
+    httpd = ThreadingHTTPServer(("127.0.0.1", 0), SlowHandler)
+    httpd.daemon_threads = True
+    thread = threading.Thread(target=httpd.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{httpd.server_port}"
+    httpd.shutdown()
+    httpd.server_close()
+
+
+def test_article_download_stops_at_deadline(server, monkeypatch):
+    monkeypatch.setattr(celery_tasks.settings, "ARTICLE_FETCH_DEADLINE", 1)
+    monkeypatch.setattr(celery_tasks, "FEED_CHUNK_SIZE", 1)
+    started = time.monotonic()
+    with pytest.raises(FeedDeadlineExceeded):
+        celery_tasks.download_article(f"{server}/slow")
+    assert time.monotonic() - started < 3
+
+
+def test_article_download_rejects_declared_size(server, monkeypatch):
+    monkeypatch.setattr(celery_tasks.settings, "ARTICLE_MAX_BYTES", 1000)
+    with pytest.raises(FeedTooLarge):
+        celery_tasks.download_article(f"{server}/large")
+
+
+class FakeQuery:
+    def __init__(self, value):
+        self.value = value
+    
+    def filter(self, *args):
+        return self
+    
+    def scalar(self):
+        return self.value
+
+
+class FakeSession:
+    """Sesija, kas atgriež ieraksta saiti un uzkrāj pievienotos objektus"""
+    
+    def __init__(self, link):
+        self.link = link
+        self.added = []
+        self.commits = 0
+    
+    def query(self, *args):
+        return FakeQuery(self.link)
+    
+    def execute(self, statement):
+        return SimpleNamespace(rowcount=0)
+    
+    def add(self, obj):
+        self.added.append(obj)
+    
+    def commit(self):
+        self.commits += 1
+    
+    def rollback(self):
+        pass
+    
+    def close(self):
+        pass
+
+
+def test_article_html_is_handed_to_extract_queue(server, monkeypatch, payload_redis):
+    link = f"{server}/large"
+    sessions = []
+    
+    def session_factory():
+        sessions.append(FakeSession(link))
+        return sessions[-1]
+    monkeypatch.setattr(celery_tasks, "SessionLocal", session_factory)
+    monkeypatch.setattr(celery_tasks.domain_rate_limiter, "acquire", lambda host: 0.0)
+    article = "<html><body><article><p>" + "Raksta teksts. " * 40 + "</p></article></body></html>"
+    monkeypatch.setattr(celery_tasks, "download_article", lambda url: (
+        SimpleNamespace(headers={"Content-Type": "text/html; charset=utf-8"}, raw=None), article.encode()
+    ))
+    queued = []
+    monkeypatch.setattr(celery_tasks.extract_article_content, "delay", lambda *args: queued.append(args))
+    
+    assert celery_tasks.fetch_full_article_content("entry-1") == {"success": True}
+    [(entry_id, queued_link, key, content_type)] = queued
+    assert (entry_id, queued_link, content_type) == ("entry-1", link, "text/html; charset=utf-8")
+    # Brokera rindā ir tikai atslēga, HTML - Redis
+    assert payloads.load_payload(key) == article.encode()
+    
+    assert celery_tasks.extract_article_content(entry_id, queued_link, key, content_type) == {"success": True}
+    [content] = sessions[-1].added
+    assert content.entry_id == "entry-1"
+    assert "Raksta teksts." in content.content
+    assert payloads.load_payload(key) is None
+
+
+def test_extraction_runs_under_celery_time_limits():
+    task = celery_tasks.extract_article_content
+    assert task.soft_time_limit == celery_tasks.settings.ARTICLE_EXTRACT_TIME_LIMIT
+    assert task.time_limit > task.soft_time_limit
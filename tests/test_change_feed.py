@@ -0,0 +1,79 @@
+import asyncio
+
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from sqlalchemy.orm import Session
+
+from app.api.endpoints.entries import _load_changes
+from app.models.models import Entry, RssFeed
+from app.services.change_feed import assign_change_seq
+from tests.conftest import TEST_DATABASE_URL
+
+
+def _read_changes(after: int):
+    async def read():
+        engine = create_async_engine(TEST_DATABASE_URL.replace("postgresql://", "postgresql+asyncpg://", 1))
+        try:
+            async with AsyncSession(engine) as db:
+                return await _load_changes(db, after, 100)
+        finally:
+            await engine.dispose()
+    return asyncio.run(read())
+
+
+def _add_entry(db: Session, feed_id: int, title: str) -> str:
+    entry = Entry(feed_id=feed_id, title=title, link=f"https://example.com/{title}", original_id=title)
+    db.add(entry)
+    db.flush()
+    return entry.id
+
+
+def test_interleaved_transactions_are_not_skipped(pg_engine):
+    with Session(pg_engine) as db:
+        feed = RssFeed(url="https://example.com/feed.xml", title="Test")
+        db.add(feed)
+        db.commit()
+        feed_id = feed.id
+    
+    first, second = Session(pg_engine), Session(pg_engine)
+    try:
+        # Pirmā transakcija ievieto ierakstu agrāk, bet tiek apstiprināta vēlāk
+        first_id = _add_entry(first, feed_id, "first")
+        second_id = _add_entry(second, feed_id, "second")
+        second.commit()
+        assign_change_seq(second)
+        
+        changes = _read_changes(0)
+        assert [entry.id for entry in changes] == [second_id]
+        cursor = changes[-1].seq
+        
+        first.commit()
+        assign_change_seq(first)
+        
+        changes = _read_changes(cursor)
+        assert [entry.id for entry in changes] == [first_id]
+        assert changes[0].seq > cursor
+    finally:
+        first.close()
+        second.close()
+
+
+def test_uncommitted_entries_stay_unnumbered(pg_engine):
+    with Session(pg_engine) as db:
+        feed = RssFeed(url="https://example.com/feed.xml", title="Test")
+        db.add(feed)
+        db.commit()
+        feed_id = feed.id
+    
+    pending, other = Session(pg_engine), Session(pg_engine)
+    try:
+        _add_entry(pending, feed_id, "pending")
+        # Nepabeigtas transakcijas ieraksti nav redzami un nesaņem numuru
+        assert assign_change_seq(other) == 0
+        assert _read_changes(0) == []
+        
+        pending.commit()
+        assert assign_change_seq(other) == 1
+        assert [entry.title for entry in _read_changes(0)] == ["pending"]
+    finally:
+        pending.close()
+        other.close()
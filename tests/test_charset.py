@@ -0,0 +1,41 @@
+import codecs
+
+from app.services.charset import CharsetDetector
+
+LATVIAN = "Ziņas par Rīgas ielām un Daugavas krastmalu, kā arī ēku atjaunošanu. " * 20
+META_1257 = b'<html><head><meta charset="windows-1257"></head><body>' + LATVIAN.encode("cp1257") + b"</body></html>"
+
+
+def test_header_has_priority_over_meta():
+    detector = CharsetDetector()
+    assert detector.detect(META_1257, "text/html; charset=UTF-8", "example.lv") == ("utf-8", "header")
+    # Nezināms kodeks galvenē tiek ignorēts
+    assert detector.detect(META_1257, "text/html; charset=nav-tada", "example.lv") == ("cp1257", "meta")
+
+
+def test_meta_has_priority_over_domain_cache():
+    detector = CharsetDetector()
+    detector._by_host["example.lv"] = "iso8859_13"
+    assert detector.detect(META_1257, "text/html", "example.lv") == ("cp1257", "meta")
+    
+    # http-equiv forma un latin-1, ko pārlūki nolasa kā windows-1252
+    body = b'<meta http-equiv="Content-Type" content="text/html; charset=ISO-8859-1"><p>caf\xe9</p>'
+    assert detector.detect(body, None, "example.lv") == ("cp1252", "meta")
+
+
+def test_bom_precedes_meta():
+    detector = CharsetDetector()
+    body = codecs.BOM_UTF8 + b'<meta charset="windows-1257">' + LATVIAN.encode("utf-8")
+    assert detector.detect(body, None, "") == ("utf-8-sig", "bom")
+
+
+def test_detected_charset_is_remembered_per_domain():
+    detector = CharsetDetector()
+    body = ("<html><body>" + LATVIAN + "</body></html>").encode("cp1257")
+    encoding, source = detector.detect(body, "text/html", "Example.LV")
+    assert source == "detected"
+    
+    # Nākamā lapa no tā paša domēna bez deklarācijas - no keša, bez noteikšanas
+    assert detector.detect(b"<p>\xf0</p>", None, "example.lv") == (encoding, "cache")
+    # Citam domēnam kešs netiek izmantots
+    assert detector.detect(b"<p>ascii</p>", None, "other.lv")[1] != "cache"
@@ -0,0 +1,82 @@
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+
+import pytest
+import requests
+
+from app.services import circuit_breaker
+from app.services.circuit_breaker import (
+    CLOSED,
+    HALF_OPEN,
+    OPEN,
+    HostCircuitOpen,
+    HostCircuitTracker,
+    backoff_delay,
+    circuit_state,
+)
+from app.services.rss_collector import RssCollector
+
+NOW = datetime(2026, 10, 19, 12, 0)
+
+
+def _feed(error_count=0):
+    return SimpleNamespace(id=1, url="https://example.com/feed.xml", title="t", description=None,
+                           site_url=None, language=None, error_count=error_count)
+
+
+def test_feed_circuit_opens_after_threshold_and_half_opens_after_delay(monkeypatch):
+    monkeypatch.setattr(circuit_breaker.settings, "CIRCUIT_FAILURE_THRESHOLD", 3)
+    collector = RssCollector(None)
+    
+    status = collector._error_status(_feed(error_count=1), "timeout")
+    assert (status["error_count"], status["circuit_state"], status["circuit_open_until"]) == (2, CLOSED, None)
+    
+    status = collector._error_status(_feed(error_count=2), "timeout")
+    assert status["circuit_state"] == OPEN
+    open_until = status["circuit_open_until"]
+    assert circuit_state(OPEN, open_until, open_until - timedelta(seconds=1)) == OPEN
+    # Pēc aiztures nākamā ievākšana ir pārbaudes mēģinājums
+    assert circuit_state(OPEN, open_until, open_until) == HALF_OPEN
+    
+    # Veiksmīga pārbaude ķēdi aizver
+    status = collector._success_status(_feed(error_count=3), SimpleNamespace(feed={}))
+    assert (status["error_count"], status["circuit_state"], status["circuit_open_until"]) == (0, CLOSED, None)
+    assert circuit_state(status["circuit_state"], None, NOW) == CLOSED
+
+
+def test_backoff_grows_exponentially_with_jitter_and_cap(monkeypatch):
+    monkeypatch.setattr(circuit_breaker.settings, "CIRCUIT_BASE_DELAY", 300)
+    monkeypatch.setattr(circuit_breaker.settings, "CIRCUIT_MAX_DELAY", 3600)
+    monkeypatch.setattr(circuit_breaker.random, "uniform", lambda low, high: high)
+    assert backoff_delay(1) == timedelta(seconds=300)
+    assert backoff_delay(3) == timedelta(seconds=1200)
+    assert backoff_delay(30) == timedelta(seconds=3600)
+    
+    # Vismaz puse aiztures ir fiksēta
+    monkeypatch.setattr(circuit_breaker.random, "uniform", lambda low, high: low)
+    assert backoff_delay(2) == timedelta(seconds=300)
+
+
+def test_host_trips_only_on_host_failures_without_success(monkeypatch):
+    monkeypatch.setattr(circuit_breaker.settings, "CIRCUIT_HOST_TRIP_FEEDS", 2)
+    tracker = HostCircuitTracker()
+    
+    # 404 ir barotnes, nevis saimniekdatora kļūda
+    not_found = requests.HTTPError(response=SimpleNamespace(status_code=404))
+    tracker.record_failure("a.example", not_found)
+    tracker.record_failure("a.example", not_found)
+    tracker.check("a.example")
+    
+    tracker.record_failure("b.example", requests.ConnectionError("refused"))
+    tracker.check("b.example")
+    tracker.record_failure("b.example", requests.Timeout("timeout"))
+    with pytest.raises(HostCircuitOpen):
+        tracker.check("b.example")
+    
+    # Ja saimniekdators šajā ciklā atbildēja, atsevišķas kļūdas to neatslēdz
+    tracker.record_success("c.example")
+    server_error = requests.HTTPError(response=SimpleNamespace(status_code=503))
+    tracker.record_failure("c.example", server_error)
+    tracker.record_failure("c.example", server_error)
+    tracker.check("c.example")
+    assert tracker.hosts() == {"b.example", "c.example"}
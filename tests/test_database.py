@@ -0,0 +1,15 @@
+from app.models import database
+
+
+def test_worker_engine_rebinds_sessions_only(monkeypatch):
+    api_engine = database.engine
+    monkeypatch.setattr(database.settings, "CELERY_DB_POOL_MODE", "null")
+    try:
+        worker_engine = database.configure_worker_engine()
+        
+        # Moduļi, kas importējuši `engine`, joprojām redz API dzinēju
+        assert database.engine is api_engine
+        assert database.get_engine() is worker_engine
+        assert database.SessionLocal().get_bind() is worker_engine
+    finally:
+        database.SessionLocal.configure(bind=api_engine)
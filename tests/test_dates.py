@@ -0,0 +1,48 @@
+from datetime import datetime
+
+from app.services.dates import DateNormalizer
+
+
+def test_rfc822_and_iso8601_are_converted_to_naive_utc():
+    normalizer = DateNormalizer()
+    assert normalizer.parse("Mon, 19 Oct 2026 10:30:00 +0300") == datetime(2026, 10, 19, 7, 30)
+    assert normalizer.parse("2026-10-19T10:30:00+03:00") == datetime(2026, 10, 19, 7, 30)
+    # Saīsinājumu EEST email.utils uzskatītu par UTC
+    assert normalizer.parse("Mon, 19 Oct 2026 10:30:00 EEST") == datetime(2026, 10, 19, 7, 30)
+
+
+def test_successful_format_is_cached_per_feed(monkeypatch):
+    normalizer = DateNormalizer()
+    assert normalizer.parse("19.10.2026 10:30", feed_id=7) == datetime(2026, 10, 19, 10, 30)
+    assert normalizer._formats == {7: "%d.%m.%Y %H:%M"}
+    
+    # Nākamais datums tiek parsēts ar barotnes formātu, zināmie formāti netiek pārlasīti
+    monkeypatch.setattr("app.services.dates.KNOWN_FORMATS", ())
+    assert normalizer.parse("20.10.2026 08:00", feed_id=7) == datetime(2026, 10, 20, 8, 0)
+    # Citai barotnei formāts nav zināms
+    assert normalizer.parse("20.10.2026 08:00", feed_id=8) == datetime(2026, 10, 20, 8, 0)
+    assert 8 not in normalizer._formats
+
+
+def test_changed_format_is_forgotten_and_relearned():
+    normalizer = DateNormalizer()
+    normalizer.parse("19.10.2026 10:30", feed_id=7)
+    assert normalizer.parse("2026/10/19 10:30:15", feed_id=7) == datetime(2026, 10, 19, 10, 30, 15)
+    assert normalizer._formats == {7: "%Y/%m/%d %H:%M:%S"}
+
+
+def test_dateutil_fallback_and_failure():
+    normalizer = DateNormalizer()
+    assert normalizer.parse("October 19th, 2026 at 10:30", feed_id=7) == datetime(2026, 10, 19, 10, 30)
+    assert 7 not in normalizer._formats
+    assert normalizer.parse("nav datums") is None
+    assert normalizer.parse("") is None
+
+
+def test_entry_date_prefers_published_parsed_and_stores_result():
+    normalizer = DateNormalizer()
+    assert normalizer.entry_date({"published_parsed": (2026, 10, 19, 7, 30, 0, 0, 292, 0)}) == datetime(2026, 10, 19, 7, 30)
+    
+    entry = {"updated": "19.10.2026 10:30"}
+    assert normalizer.entry_date(entry, feed_id=1) == datetime(2026, 10, 19, 10, 30)
+    assert entry["published_parsed"][:5] == (2026, 10, 19, 10, 30)
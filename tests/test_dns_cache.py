@@ -0,0 +1,209 @@
+import socket
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from app.services import dns_cache as dns_cache_module
+from app.services import http_client
+from app.services.dns_cache import DnsCache, HostsFile
+from app.services.http_client import attempt_timeouts, create_session
+
+
+class StubResolver:
+    """Lokāls testa atrisinātājs: vārds -> (adreses, TTL) vai kļūda"""
+    
+    def __init__(self, records):
+        self.records = records
+        self.calls = []
+    
+    def __call__(self, host):
+        self.calls.append(host)
+        result = self.records[host]
+        if isinstance(result, Exception):
+            raise result
+        return result
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1000.0
+    
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(dns_cache_module.time, "monotonic", clock)
+    return clock
+
+
+def test_cache_hit_until_ttl_expires(clock):
+    resolver = StubResolver({"example.com": ([(socket.AF_INET, "192.0.2.1")], 60)})
+    cache = DnsCache(resolver)
+    
+    assert cache.resolve("Example.com.") == [(socket.AF_INET, "192.0.2.1")]
+    assert cache.resolve("example.com") == [(socket.AF_INET, "192.0.2.1")]
+    assert resolver.calls == ["example.com"]
+    
+    clock.now += 61
+    resolver.records["example.com"] = ([(socket.AF_INET, "192.0.2.2")], 60)
+    assert cache.resolve("example.com") == [(socket.AF_INET, "192.0.2.2")]
+    assert len(resolver.calls) == 2
+
+
+def test_ttl_is_clamped_to_minimum(clock):
+    resolver = StubResolver({"example.com": ([(socket.AF_INET, "192.0.2.1")], 1)})
+    cache = DnsCache(resolver)
+    cache.resolve("example.com")
+    
+    clock.now += dns_cache_module.settings.DNS_CACHE_MIN_TTL - 1
+    cache.resolve("example.com")
+    assert len(resolver.calls) == 1
+
+
+def test_negative_result_is_cached(clock):
+    resolver = StubResolver({"missing.example": socket.gaierror(socket.EAI_NONAME, "nav")})
+    cache = DnsCache(resolver)
+    for _ in range(2):
+        with pytest.raises(socket.gaierror):
+            cache.resolve("missing.example")
+    assert len(resolver.calls) == 1
+    
+    clock.now += dns_cache_module.settings.DNS_CACHE_NEGATIVE_TTL + 1
+    with pytest.raises(socket.gaierror):
+        cache.resolve("missing.example")
+    assert len(resolver.calls) == 2
+
+
+def test_hosts_file_is_consulted_before_dns(tmp_path, monkeypatch):
+    hosts = tmp_path / "hosts"
+    hosts.write_text("127.0.0.1 localhost\n10.0.0.5 feeds.internal feeds  # komentārs\n")
+    monkeypatch.setattr(dns_cache_module, "hosts_file", HostsFile(str(hosts)))
+    
+    def fail(*args, **kwargs):
+        raise AssertionError("DNS vaicājums nebija vajadzīgs")
+    monkeypatch.setattr(dns_cache_module.dns.resolver, "resolve", fail)
+    monkeypatch.setattr(dns_cache_module.socket, "getaddrinfo", fail)
+    
+    addresses, _ = dns_cache_module.dnspython_resolver("Feeds.Internal")
+    assert addresses == [(socket.AF_INET, "10.0.0.5")]
+
+
+def test_nxdomain_does_not_fall_back_to_system_resolver(tmp_path, monkeypatch):
+    monkeypatch.setattr(dns_cache_module, "hosts_file", HostsFile(str(tmp_path / "hosts")))
+    queries = []
+    
+    def nxdomain(host, record_type, **kwargs):
+        queries.append(record_type)
+        raise dns_cache_module.dns.resolver.NXDOMAIN()
+    
+    def fail(*args, **kwargs):
+        raise AssertionError("sistēmas atrisinātājs nebija vajadzīgs")
+    monkeypatch.setattr(dns_cache_module.dns.resolver, "resolve", nxdomain)
+    monkeypatch.setattr(dns_cache_module.socket, "getaddrinfo", fail)
+    
+    with pytest.raises(socket.gaierror):
+        dns_cache_module.dnspython_resolver("missing.example")
+    assert queries == ["A"]
+
+
+def test_attempt_timeouts_keep_total_within_connect_timeout():
+    assert attempt_timeouts(1, 10, 2) == [10]
+    assert attempt_timeouts(3, 10, 2) == [2, 2, 6]
+    assert attempt_timeouts(2, 1, 2) == [0.5, 0.5]
+    assert attempt_timeouts(2, None, 2) == [2, None]
+
+
+class _OkHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        self.send_response(200)
+        self.send_header("Content-Length", "2")
+        self.end_headers()
+        self.wfile.write(b"ok")
+    
+    def log_message(self, *args):
+        pass
+
+
+def test_connection_fails_over_to_next_address(monkeypatch):
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _OkHandler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    try:
+        port = server.server_address[1]
+        # Pirmā adrese atsaka savienojumu (uz tās neviens neklausās), otrā strādā
+        resolver = StubResolver({"feeds.test": ([(socket.AF_INET, "127.0.0.2"), (socket.AF_INET, "127.0.0.1")], 60)})
+        monkeypatch.setattr(http_client, "dns_cache", DnsCache(resolver))
+        
+        response = create_session().get(f"http://feeds.test:{port}/", timeout=5)
+        assert response.text == "ok"
+        assert resolver.calls == ["feeds.test"]
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+class _StubDnsServer:
+    """UDP DNS serveris: zināmajiem vārdiem A ieraksts, pārējiem NXDOMAIN"""
+    
+    def __init__(self, records):
+        import dns.message
+        import dns.rcode
+        import dns.rrset
+        self.records = records
+        self.queries = []
+        self.sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        self.sock.bind(("127.0.0.1", 0))
+        self.port = self.sock.getsockname()[1]
+        
+        def serve():
+            while True:
+                try:
+                    wire, client = self.sock.recvfrom(512)
+                except OSError:
+                    return
+                query = dns.message.from_wire(wire)
+                question = query.question[0]
+                name = question.name.to_text()
+                self.queries.append(name)
+                response = dns.message.make_response(query)
+                if name in self.records and question.rdtype == dns.rdatatype.A:
+                    response.answer.append(dns.rrset.from_text(name, 30, "IN", "A", self.records[name]))
+                elif name not in self.records:
+                    response.set_rcode(dns.rcode.NXDOMAIN)
+                self.sock.sendto(response.to_wire(), client)
+        threading.Thread(target=serve, daemon=True).start()
+    
+    def close(self):
+        self.sock.close()
+
+
+def test_short_names_use_resolv_conf_search_domains(tmp_path, monkeypatch):
+    import dns.name
+    import dns.resolver
+    server = _StubDnsServer({"feeds.news.svc.cluster.local.": "10.96.0.15"})
+    resolver = dns.resolver.Resolver(configure=False)
+    resolver.nameservers = ["127.0.0.1"]
+    resolver.port = server.port
+    # Kā Kubernetes podā: search news.svc.cluster.local svc.cluster.local; options ndots:5
+    resolver.search = [dns.name.from_text("news.svc.cluster.local"), dns.name.from_text("svc.cluster.local")]
+    resolver.ndots = 5
+    monkeypatch.setattr(dns.resolver, "default_resolver", resolver)
+    monkeypatch.setattr(dns_cache_module, "hosts_file", HostsFile(str(tmp_path / "hosts")))
+    
+    def fail(*args, **kwargs):
+        raise AssertionError("sistēmas atrisinātājs nebija vajadzīgs")
+    monkeypatch.setattr(dns_cache_module.socket, "getaddrinfo", fail)
+    try:
+        addresses, ttl = dns_cache_module.dnspython_resolver("feeds.news")
+        assert addresses == [(socket.AF_INET, "10.96.0.15")]
+        assert ttl == 30
+        assert server.queries[0] == "feeds.news.news.svc.cluster.local."
+        
+        with pytest.raises(socket.gaierror):
+            dns_cache_module.dnspython_resolver("missing")
+    finally:
+        server.close()
@@ -0,0 +1,87 @@
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy.dialects import postgresql
+
+from app.api.endpoints import entries
+from app.models.database import get_async_db
+
+
+class FakeResult:
+    def all(self):
+        return []
+
+
+class FakeAsyncSession:
+    def __init__(self):
+        self.queries = []
+    
+    async def execute(self, query):
+        self.queries.append(query)
+        return FakeResult()
+
+
+@pytest.fixture
+def session():
+    return FakeAsyncSession()
+
+
+@pytest.fixture
+def client(session):
+    app = FastAPI()
+    app.include_router(entries.router, prefix="/api/entries")
+    
+    async def get_session():
+        yield session
+    app.dependency_overrides[get_async_db] = get_session
+    return TestClient(app)
+
+
+def compiled(session):
+    assert len(session.queries) == 1
+    query = session.queries[0].compile(dialect=postgresql.dialect())
+    return str(query), query.params
+
+
+def test_several_feeds_are_one_array_parameter(client, session):
+    assert client.get("/api/entries/?feed_id=3&feed_id=1&feed_id=2").status_code == 200
+    
+    sql, params = compiled(session)
+    assert "entries.feed_id = ANY (" in sql
+    assert [3, 1, 2] in params.values()
+
+
+def test_any_tag_is_one_semi_join_on_normalized_keys(client, session):
+    assert client.get("/api/entries/?tag=Politika&tag=%20sports%20&tag=politika").status_code == 200
+    
+    sql, params = compiled(session)
+    assert sql.count("EXISTS (SELECT") == 1
+    assert "tags.key = ANY (" in sql
+    assert ["politika", "sports"] in params.values()
+    assert "JOIN entry_tag" not in sql
+
+
+def test_all_tags_is_one_semi_join_per_tag(client, session):
+    assert client.get("/api/entries/?tag=politika&tag=sports&tag_mode=all").status_code == 200
+    
+    sql, params = compiled(session)
+    assert sql.count("EXISTS (SELECT") == 2
+    assert ["politika"] in params.values()
+    assert ["sports"] in params.values()
+
+
+def test_group_filter_uses_group_membership(client, session):
+    assert client.get("/api/entries/?group_id=7").status_code == 200
+    
+    sql, params = compiled(session)
+    assert "feed_group_feed.group_id" in sql
+    assert 7 in params.values()
+
+
+@pytest.mark.parametrize("path", [
+    "/api/entries/?tag_mode=some",
+    "/api/entries/?" + "&".join(f"feed_id={i}" for i in range(entries.FILTER_MAX_VALUES + 1)),
+])
+def test_invalid_filters_are_rejected(client, session, path):
+    assert client.get(path).status_code == 400
+    assert session.queries == []
@@ -0,0 +1,54 @@
+from types import SimpleNamespace
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app.api.endpoints import entries
+from app.models.database import get_async_db
+
+TAG = SimpleNamespace(id=1, name="Politika", key="politika", usage_count=3)
+
+
+class FakeResult:
+    def scalars(self):
+        return self
+    
+    def all(self):
+        return [TAG]
+    
+    def first(self):
+        return None
+
+
+class FakeAsyncSession:
+    async def execute(self, query):
+        return FakeResult()
+
+
+@pytest.fixture
+def client():
+    app = FastAPI()
+    app.include_router(entries.router, prefix="/api/entries")
+    
+    async def get_session():
+        yield FakeAsyncSession()
+    app.dependency_overrides[get_async_db] = get_session
+    return TestClient(app)
+
+
+@pytest.mark.parametrize("path", ["/api/entries/tags", "/api/entries/tags?sort=popular", "/api/entries/tags/"])
+def test_tags_are_not_shadowed_by_entry_id(client, path):
+    response = client.get(path)
+    assert response.status_code == 200
+    assert response.json()[0]["name"] == "Politika"
+
+
+def test_literal_get_routes_precede_entry_id():
+    paths = [route.path for route in entries.router.routes if "GET" in route.methods]
+    entry_route = paths.index("/{entry_id}")
+    assert all(paths.index(path) < entry_route for path in paths if "{" not in path)
+
+
+def test_unknown_entry_is_404(client):
+    assert client.get("/api/entries/nav-tada").status_code == 404
@@ -0,0 +1,44 @@
+import threading
+
+from sqlalchemy import func, select
+from sqlalchemy.orm import Session
+
+from app.models.models import RssFeed
+from app.services.feed_import import import_feeds, validate_feed_items
+
+
+def test_url_forms_of_one_feed_are_imported_once():
+    valid, invalid = validate_feed_items([
+        ("http://example.com/feed/", "A"),
+        ("https://www.example.com/feed", "B"),
+        ("https://example.com/Feed", "C"),
+        ("nav url", None),
+    ])
+    assert list(valid) == ["http://example.com/feed/", "https://example.com/Feed"]
+    assert len(invalid) == 1
+
+
+def test_concurrent_import_conflicts_on_url_key(pg_engine):
+    first = Session(pg_engine)
+    try:
+        # Pirmā transakcija pievieno barotni, bet vēl nav apstiprināta - otrā to SELECT neredz
+        first.add(RssFeed(url="http://example.com/feed"))
+        first.flush()
+        
+        result = {}
+        
+        def second_import():
+            with Session(pg_engine) as second:
+                result.update(import_feeds(second, [("https://example.com/feed/", None)], fetch=False))
+        thread = threading.Thread(target=second_import)
+        thread.start()
+        # Otrā INSERT gaida uz pirmās transakcijas unikālo url_key
+        thread.join(0.5)
+        first.commit()
+        thread.join(10)
+        
+        assert result["created"] == 0
+        assert result["existing"] == 1
+        assert first.execute(select(func.count()).select_from(RssFeed)).scalar() == 1
+    finally:
+        first.close()
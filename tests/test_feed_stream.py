@@ -0,0 +1,40 @@
+from app.services.feed_stream import parse_feed_stream
+
+VALID = b"""<?xml version="1.0"?><rss version="2.0"><channel><title>News</title>
+<item><title>Pirmais</title><guid>1</guid></item>
+<item><title>Otrais</title><guid>2</guid></item>
+</channel></rss>"""
+
+# HTML entītija RSS XML nav definēta - inkrementālais parsētājs apstājas pie otrā ieraksta
+BROKEN = VALID.replace(b"<title>Otrais</title>", b"<title>Otrais&nbsp;raksts</title>")
+
+
+def _chunks(document: bytes, size: int = 16):
+    return (document[i:i + size] for i in range(0, len(document), size))
+
+
+def test_valid_feed_is_parsed_without_refetch():
+    calls = []
+    parsed = parse_feed_stream(_chunks(VALID), refetch=lambda: calls.append(1) or [VALID])
+    assert [entry["title"] for entry in parsed.entries] == ["Pirmais", "Otrais"]
+    assert not parsed.bozo
+    assert calls == []
+
+
+def test_malformed_feed_is_refetched_for_feedparser():
+    calls = []
+    
+    def refetch():
+        calls.append(1)
+        return _chunks(BROKEN)
+    parsed = parse_feed_stream(_chunks(BROKEN), refetch=refetch)
+    assert parsed.bozo
+    assert len(parsed.entries) == 2
+    assert parsed.entries[1]["title"].startswith("Otrais")
+    assert calls == [1]
+
+
+def test_malformed_feed_without_refetch_keeps_parsed_entries():
+    parsed = parse_feed_stream(_chunks(BROKEN))
+    assert parsed.bozo
+    assert [entry["title"] for entry in parsed.entries] == ["Pirmais"]
@@ -0,0 +1,22 @@
+from app.services.feed_urls import canonicalize_url, url_key
+
+
+def test_scheme_host_and_trailing_slash_are_ignored():
+    assert url_key("HTTP://WWW.Example.com/feed/") == url_key("https://example.com/feed")
+    assert url_key("https://example.com:443/feed?utm_source=x") == url_key("https://example.com/feed")
+
+
+def test_path_and_query_keep_their_case():
+    first = "https://www.youtube.com/feeds/videos.xml?channel_id=UCabcDEF"
+    second = "https://www.youtube.com/feeds/videos.xml?channel_id=UCABCdef"
+    assert url_key(first) != url_key(second)
+    assert url_key("https://example.com/News.xml") != url_key("https://example.com/news.xml")
+
+
+def test_long_urls_are_not_truncated_into_collisions():
+    base = "https://example.com/" + "a" * 300
+    assert url_key(base + "/one") != url_key(base + "/two")
+
+
+def test_canonical_url_keeps_path_case():
+    assert canonicalize_url("HTTPS://Example.COM/Feed.xml#top") == "https://example.com/Feed.xml"
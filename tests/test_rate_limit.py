@@ -0,0 +1,52 @@
+import redis
+
+from app.services.rate_limit import DomainRateLimiter
+
+
+def test_tokens_refill_at_rate_up_to_burst(redis_client):
+    limiter = DomainRateLimiter(redis_client, rate=2.0, burst=3, prefix="test:ratelimit:")
+    assert [limiter.acquire("example.com") for _ in range(3)] == [0.0, 0.0, 0.0]
+    # Spainis tukšs: nākamais žetons pēc 1 / rate sekundēm, un tas netiek patērēts
+    assert 0.4 < limiter.acquire("example.com") <= 0.5
+    assert 0.4 < limiter.acquire("example.com") <= 0.5
+    
+    # Pirms 1 s iztukšots spainis ir atguvis 2 žetonus (rate 2/s)
+    seconds, microseconds = redis_client.time()
+    now = seconds + microseconds / 1000000
+    redis_client.hset("test:ratelimit:example.com", mapping={"tokens": 0, "ts": now - 1})
+    assert [limiter.acquire("example.com") for _ in range(2)] == [0.0, 0.0]
+    assert limiter.acquire("example.com") > 0
+    
+    # Ilga dīkstāve neuzkrāj vairāk par burst
+    redis_client.hset("test:ratelimit:example.com", mapping={"tokens": 0, "ts": now - 3600})
+    assert [limiter.acquire("example.com") for _ in range(3)] == [0.0, 0.0, 0.0]
+    assert limiter.acquire("example.com") > 0
+
+
+def test_domains_have_separate_buckets(redis_client):
+    limiter = DomainRateLimiter(redis_client, rate=1.0, burst=1, prefix="test:ratelimit:")
+    assert limiter.acquire("a.example") == 0.0
+    assert limiter.acquire("a.example") > 0
+    assert limiter.acquire("b.example") == 0.0
+
+
+class BrokenScript:
+    def __call__(self, **kwargs):
+        raise redis.ConnectionError("Redis nav pieejams")
+
+
+class BrokenRedis:
+    def register_script(self, script):
+        return BrokenScript()
+
+
+def test_limiter_fails_open_without_redis():
+    limiter = DomainRateLimiter(BrokenRedis(), rate=1.0, burst=1)
+    assert limiter.acquire("example.com") == 0.0
+
+
+def test_disabled_limiter_does_not_touch_redis():
+    limiter = DomainRateLimiter(BrokenRedis(), rate=0, burst=1)
+    assert limiter.acquire("example.com") == 0.0
+    assert limiter.acquire("") == 0.0
+    assert limiter._script is None
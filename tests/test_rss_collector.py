@@ -0,0 +1,43 @@
+from sqlalchemy.orm import Session
+
+from app.models.models import RssFeed
+from app.services import rss_collector
+from app.services.rss_collector import RssCollector, fit_feed_status
+
+
+def test_fit_feed_status_truncates_text_and_drops_long_urls():
+    row = fit_feed_status({
+        "id": 1,
+        "title": "x" * 300,
+        "site_url": "https://example.com/" + "a" * 300,
+        "description": "d" * 5000,
+        "last_error": None,
+    })
+    assert row["title"] == "x" * 255
+    # Saīsināta adrese būtu nederīga
+    assert row["site_url"] is None
+    # Text kolonnām garuma nav
+    assert row["description"] == "d" * 5000
+    assert row["last_error"] is None
+
+
+def test_status_chunk_failure_only_loses_bad_feed(pg_engine, monkeypatch):
+    with Session(pg_engine) as db:
+        feeds = [RssFeed(url=f"https://example.com/{index}.xml", title="old") for index in range(3)]
+        db.add_all(feeds)
+        db.commit()
+        ids = [feed.id for feed in feeds]
+    
+    # Bez pielāgošanas pārāk garš nosaukums izjauc bulk UPDATE
+    monkeypatch.setattr(rss_collector, "fit_feed_status", dict)
+    with Session(pg_engine) as db:
+        RssCollector(db)._update_statuses([
+            {"id": ids[0], "title": "new"},
+            {"id": ids[1], "title": "x" * 300},
+            {"id": ids[2], "title": "new"},
+        ])
+        db.commit()
+    
+    with Session(pg_engine) as db:
+        titles = {feed.id: feed.title for feed in db.query(RssFeed).all()}
+    assert titles == {ids[0]: "new", ids[1]: "old", ids[2]: "new"}
@@ -0,0 +1,159 @@
+import hashlib
+import hmac
+from types import SimpleNamespace
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app.api.endpoints import websub as websub_endpoint
+from app.models.database import get_async_db, get_db
+from app.services import payloads, websub
+
+TOPIC = "https://example.com/feed.xml"
+SECRET = "noslēpums"
+
+
+class FakeQuery:
+    def __init__(self, feed):
+        self.feed = feed
+    
+    def filter(self, *args):
+        return self
+    
+    def first(self):
+        return self.feed
+
+
+class FakeSession:
+    """Sinhronā un asinhronā sesija vienai barotnei"""
+    
+    def __init__(self, feed):
+        self.feed = feed
+        self.commits = 0
+    
+    def query(self, model):
+        return FakeQuery(self.feed)
+    
+    def commit(self):
+        self.commits += 1
+    
+    async def get(self, model, feed_id):
+        return self.feed
+
+
+@pytest.fixture
+def feed():
+    return SimpleNamespace(
+        id=1, url=TOPIC, active=True, websub_hub="https://hub.example.com/", websub_topic=TOPIC,
+        websub_secret=SECRET, websub_state=websub.NONE, websub_lease_expires=None,
+    )
+
+
+@pytest.fixture
+def pushed(monkeypatch):
+    pushed = []
+    monkeypatch.setattr(websub_endpoint, "send_task", lambda name, *args: pushed.append(args))
+    return pushed
+
+
+@pytest.fixture
+def client(feed):
+    app = FastAPI()
+    app.include_router(websub_endpoint.router, prefix="/api/websub")
+    session = FakeSession(feed)
+    app.dependency_overrides[get_db] = lambda: session
+    
+    async def get_async_session():
+        yield session
+    app.dependency_overrides[get_async_db] = get_async_session
+    return TestClient(app)
+
+
+def _verify(client, mode, **params):
+    query = {"hub.mode": mode, "hub.topic": TOPIC, "hub.challenge": "abc123", **params}
+    return client.get("/api/websub/1", params=query)
+
+
+def test_subscribe_is_confirmed_only_when_requested(client, feed):
+    assert _verify(client, "subscribe").status_code == 404
+    assert feed.websub_state == websub.NONE
+    
+    feed.websub_state = websub.PENDING
+    response = _verify(client, "subscribe", **{"hub.lease_seconds": 3600})
+    assert response.status_code == 200
+    assert response.text == "abc123"
+    assert feed.websub_state == websub.SUBSCRIBED
+
+
+@pytest.mark.parametrize("state", [websub.NONE, websub.PENDING, websub.SUBSCRIBED])
+def test_unrequested_unsubscribe_is_rejected(client, feed, state):
+    feed.websub_state = state
+    assert _verify(client, "unsubscribe").status_code == 404
+    assert feed.websub_state == state
+
+
+def test_requested_unsubscribe_is_confirmed(client, feed):
+    feed.websub_state = websub.UNSUBSCRIBING
+    response = _verify(client, "unsubscribe")
+    assert response.status_code == 200
+    assert feed.websub_state == websub.NONE
+
+
+@pytest.mark.parametrize("state", [websub.SUBSCRIBED, websub.UNSUBSCRIBING])
+def test_denied_only_applies_to_pending_subscribe(client, feed, state):
+    feed.websub_state = state
+    assert _verify(client, "denied").status_code == 404
+    assert feed.websub_state == state
+    
+    feed.websub_state = websub.PENDING
+    assert _verify(client, "denied").status_code == 200
+    assert feed.websub_state == websub.NONE
+
+
+def _signature(body: bytes, secret: str = SECRET) -> str:
+    return "sha256=" + hmac.new(secret.encode(), body, hashlib.sha256).hexdigest()
+
+
+def test_signed_push_is_accepted(client, feed, pushed, payload_redis):
+    feed.websub_state = websub.SUBSCRIBED
+    body = b"<rss><channel><title>t</title></channel></rss>"
+    response = client.post("/api/websub/1", content=body, headers={"X-Hub-Signature": _signature(body)})
+    assert response.status_code == 202
+    
+    # Uzdevumam tiek nodota tikai atslēga; ķermenis glabājas Redis ar derīguma laiku
+    [(feed_id, key)] = pushed
+    assert feed_id == 1
+    assert payloads.load_payload(key) == body
+    assert payload_redis.ttls["rss:payload:" + key] == payloads.settings.PAYLOAD_TTL
+
+
+def test_unsigned_push_is_ignored(client, feed, pushed):
+    feed.websub_state = websub.SUBSCRIBED
+    assert client.post("/api/websub/1", content=b"<rss/>").status_code == 202
+    
+    # Arī abonements bez noslēpuma nepieņem piegādes
+    feed.websub_secret = None
+    assert client.post("/api/websub/1", content=b"<rss/>", headers={"X-Hub-Signature": "sha256=00"}).status_code == 202
+    assert pushed == []
+
+
+def test_oversized_push_is_rejected(client, feed, pushed, monkeypatch):
+    feed.websub_state = websub.SUBSCRIBED
+    monkeypatch.setattr(websub_endpoint.settings, "RSS_MAX_FEED_BYTES", 16)
+    body = b"x" * 17
+    response = client.post("/api/websub/1", content=body, headers={"X-Hub-Signature": _signature(body)})
+    assert response.status_code == 413
+    
+    # Bez Content-Length (chunked) izmērs tiek pārbaudīts lasīšanas laikā
+    def chunks():
+        yield b"x" * 10
+        yield b"x" * 10
+    response = client.post("/api/websub/1", content=chunks())
+    assert response.status_code == 413
+    assert pushed == []
+
+
+def test_expired_push_payload_is_skipped(payload_redis):
+    from app.tasks.celery_tasks import ingest_websub_push
+    assert ingest_websub_push(1, "nav-tada") == {"error": "Payload expired"}